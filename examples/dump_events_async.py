@@ -0,0 +1,29 @@
+#!/usr/bin/env python
+
+#
+# Dump all replication events from a remote mysql server with asyncio
+#
+
+import asyncio
+
+from pymysqlreplication import AsyncBinLogStreamReader
+
+MYSQL_SETTINGS = {"host": "127.0.0.1", "port": 3306, "user": "root", "passwd": ""}
+
+
+async def main():
+    # server_id is your slave identifier, it should be unique.
+    # set blocking to True if you want to block and wait for the next event at
+    # the end of the stream
+    stream = AsyncBinLogStreamReader(
+        connection_settings=MYSQL_SETTINGS, server_id=3, blocking=True
+    )
+
+    async for binlogevent in stream:
+        binlogevent.dump()
+
+    stream.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -21,3 +21,5 @@ limitations under the License.
 """
 
 from .binlogstream import BinLogStreamReader
+from .async_binlogstream import AsyncBinLogStreamReader
+from .binlogfilereader import BinLogFileReader
@@ -0,0 +1,73 @@
+import asyncio
+import concurrent.futures
+
+from .binlogstream import BinLogStreamReader
+
+
+class AsyncBinLogStreamReader(BinLogStreamReader):
+    """Connect to replication stream and read event with asyncio
+
+    It takes the same arguments as BinLogStreamReader:
+
+        stream = AsyncBinLogStreamReader(connection_settings, server_id=100)
+        async for binlogevent in stream:
+            binlogevent.dump()
+        stream.close()
+
+    Each reader has its own thread, where BinLogStreamReader.fetchone reads
+    and decodes the events: the connections, the packet reads, the
+    TableMapEvent decoding and the queries of the control connection never
+    block the event loop, and every option of BinLogStreamReader applies.
+
+    A fetchone cancelled while it waits for an event does not lose it, the
+    next fetchone returns it. close() must not be called while a fetchone
+    is running.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.__executor = None
+        self.__pending = None
+
+    def close(self):
+        super().close()
+        if self.__executor is not None:
+            # Also called by fetchone in the thread at the end of the stream
+            self.__executor.shutdown(wait=False)
+            self.__executor = None
+
+    async def fetchone(self):
+        if self.__pending is None:
+            if self.__executor is None:
+                self.__executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="pymysqlreplication-async"
+                )
+            self.__pending = asyncio.get_running_loop().run_in_executor(
+                self.__executor, super().fetchone
+            )
+        pending = self.__pending
+        try:
+            binlog_event = await asyncio.shield(pending)
+        except asyncio.CancelledError:
+            # Unless the read itself was cancelled, it goes on and its event
+            # is returned by the next fetchone
+            if pending.cancelled():
+                self.__pending = None
+            raise
+        except Exception:
+            self.__pending = None
+            raise
+        self.__pending = None
+        return binlog_event
+
+    def __iter__(self):
+        raise TypeError("AsyncBinLogStreamReader is iterated with 'async for'")
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        binlog_event = await self.fetchone()
+        if binlog_event is None:
+            raise StopAsyncIteration
+        return binlog_event
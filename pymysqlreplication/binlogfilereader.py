@@ -0,0 +1,342 @@
+import collections
+import concurrent.futures
+import logging
+import mmap
+import os
+import pickle
+import re
+import struct
+import tempfile
+
+from .binlogstream import BinLogStreamReader
+from .constants.BINLOG import FORMAT_DESCRIPTION_EVENT, ROTATE_EVENT
+from .exceptions import BadMagicBytesError, EventSizeTooSmallError
+from .row_event import RowsEvent
+
+BINLOG_MAGIC = b"\xfebin"
+
+# timestamp, event_type, server_id, event_size, log_pos, flags
+EVENT_HEADER = struct.Struct("<IBIIIH")
+
+# binlog-checksum = CRC32 in the FormatDescriptionEvent
+BINLOG_CHECKSUM_ALG_CRC32 = 1
+
+
+def open_binlog_file(path):
+    """Map a binlog file in memory after checking its magic bytes"""
+    with open(path, "rb") as f:
+        magic = f.read(len(BINLOG_MAGIC))
+        if magic != BINLOG_MAGIC:
+            raise BadMagicBytesError(path, magic)
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def parse_format_description(data, position, event_size):
+    """Return the server version string, the version tuple and whether the
+    events are followed by a checksum, from the FormatDescriptionEvent at
+    position
+    """
+    # binlog_version (2) then server_version (50)
+    start = position + EVENT_HEADER.size + 2
+    server_version = bytes(data[start : start + 50]).rstrip(b"\0").decode()
+    match = re.match(r"(\d+)\.(\d+)\.(\d+)", server_version)
+    version = tuple(map(int, match.groups())) if match else (0, 0, 0)
+    # Since 5.6.1 the FormatDescriptionEvent ends with the checksum
+    # algorithm of the file and its own checksum
+    use_checksum = (
+        version >= (5, 6, 1)
+        and data[position + event_size - 5] == BINLOG_CHECKSUM_ALG_CRC32
+    )
+    return server_version, version, use_checksum
+
+
+class BinLogFilePacket(object):
+    """An event of a binlog file, in place of a packet of the replication
+    connection.
+
+    Like a network packet, the event header is preceded by one byte, which
+    is the last byte of the previous event (or of the magic bytes).
+
+    data is a copy of the event, or only of its header when the stream
+    skips its event type, and not a memoryview of the mapped file:
+    the rows of a RowsEvent are decoded from its packet when they are
+    read, possibly after the file is closed, and a mapping can not be
+    closed while views of it exist.
+    """
+
+    __slots__ = ("_data", "_position")
+
+    def __init__(self, data):
+        self._data = data
+        self._position = 0
+
+    def is_ok_packet(self):
+        return True
+
+    def is_eof_packet(self):
+        return False
+
+
+class EndOfFilesPacket(object):
+    """Returned once the events of the last file are read"""
+
+    def is_eof_packet(self):
+        return True
+
+
+class BinLogFileContext(object):
+    """Stands in for the control connection of BinLogStreamReader"""
+
+    charset = "utf8"
+
+    def __init__(self, dbms="mysql"):
+        self.dbms = dbms
+
+    def _get_dbms(self):
+        return self.dbms
+
+    def close(self):
+        pass
+
+
+class BinLogFileReader(BinLogStreamReader):
+    """Read events from local binlog or relay log files
+
+        reader = BinLogFileReader(
+            ["/var/lib/mysql/mysql-bin.000042", "/var/lib/mysql/mysql-bin.000043"],
+            only_events=[WriteRowsEvent],
+        )
+        for binlogevent in reader:
+            binlogevent.dump()
+        reader.close()
+
+    The files are mapped in memory and their events are decoded by the same
+    packet wrapper and event classes as BinLogStreamReader. It takes the
+    filtering and decoding arguments of BinLogStreamReader (only_events,
+    only_tables, skip_to_timestamp, end_log_pos, verify_checksum...), the
+    arguments of the replication connection are not used.
+
+    No server is queried: the column names and charsets come from the
+    optional metadata of the TableMapEvent, which is written with
+    binlog_row_metadata = FULL.
+
+    log_pos, if set, is the position of an event of the first file where
+    the reading starts. Otherwise with skip_to_timestamp and the
+    BinLogIndex of the first file as index, the reading starts at the last
+    transaction of the index before skip_to_timestamp. An index built from
+    another file, or from a bigger one, is ignored. The binlog checksum
+    setting and the server version are read from the FormatDescriptionEvent
+    of each file.
+    """
+
+    def __init__(self, paths, log_pos=None, index=None, **kwargs):
+        if isinstance(paths, (str, bytes, os.PathLike)):
+            paths = [paths]
+        self.paths = [os.fspath(path) for path in paths]
+        skip_to_timestamp = kwargs.get("skip_to_timestamp")
+        if index is not None and not index.matches(self.paths[0]):
+            logging.log(
+                logging.WARN,
+                f"The index of {index.log_file} does not match {self.paths[0]}, "
+                "it is ignored.",
+            )
+            index = None
+        if log_pos is None and index is not None and skip_to_timestamp:
+            log_pos = index.find_timestamp(skip_to_timestamp)
+        super().__init__(
+            {},
+            server_id=0,
+            log_file=os.path.basename(self.paths[0]),
+            log_pos=log_pos,
+            **kwargs,
+        )
+        self._ctl_connection = BinLogFileContext()
+        self._optional_meta_data = True
+        self.__start_pos = log_pos
+        self.__path_index = -1
+        self.__map = None
+        self.__pos = None
+        self.__end_pos = None
+
+    def close(self):
+        self.__close_file()
+        self.__path_index = len(self.paths)
+        super().close()
+
+    def _connect(self):
+        if self.__map is None and self.__path_index < len(self.paths) - 1:
+            self.__open_file(self.__path_index + 1)
+
+    def _is_connected(self):
+        return self.__map is not None
+
+    def _read_packet(self):
+        while self.__map is not None:
+            position = self.__pos
+            if position + EVENT_HEADER.size > self.__end_pos:
+                # End of file, or an event truncated by a crash
+                self.__close_file()
+                self._connect()
+                continue
+
+            header = EVENT_HEADER.unpack_from(self.__map, position)
+            event_size = header[3]
+            if event_size < EVENT_HEADER.size:
+                raise EventSizeTooSmallError(self.paths[self.__path_index], position)
+            if position + event_size > self.__end_pos:
+                self.__close_file()
+                self._connect()
+                continue
+
+            event_type = header[1]
+            if event_type == FORMAT_DESCRIPTION_EVENT:
+                self.__read_format_description(position, event_size)
+            self.__pos = position + event_size
+            if self.__start_pos is not None and self.__start_pos > self.__pos:
+                # Jump to log_pos after the FormatDescriptionEvent
+                self.__pos = self.__start_pos
+            self.__start_pos = None
+            end = position + event_size
+            if (
+                event_type != ROTATE_EVENT
+                and event_type not in self._stream_context().allowed_events
+            ):
+                # Skipped from its header by the packet wrapper, the body
+                # is not copied
+                end = position + EVENT_HEADER.size
+            return BinLogFilePacket(self.__map[position - 1 : end])
+        return EndOfFilesPacket()
+
+    def __open_file(self, index):
+        path = self.paths[index]
+        self.__path_index = index
+        self.__map = open_binlog_file(path)
+        self.__pos = len(BINLOG_MAGIC)
+        self.__end_pos = len(self.__map)
+        self.log_file = os.path.basename(path)
+        self.log_pos = self.__pos
+
+    def __close_file(self):
+        if self.__map is not None:
+            self.__map.close()
+            self.__map = None
+
+    def __read_format_description(self, position, event_size):
+        server_version, version, use_checksum = parse_format_description(
+            self.__map, position, event_size
+        )
+        self.mysql_version = version
+        if "MariaDB" in server_version:
+            # A new object, for the stream to create a new StreamContext
+            self._ctl_connection = BinLogFileContext("mariadb")
+        self._use_checksum = use_checksum
+
+
+def read_file_events(path, kwargs):
+    """Read the events of a file to a temporary file, run in a worker process
+
+    Return the path of the temporary file and the number of events pickled
+    in it.
+    """
+    reader = BinLogFileReader(path, **kwargs)
+    count = 0
+    try:
+        with tempfile.NamedTemporaryFile(
+            prefix="pymysqlreplication-", delete=False
+        ) as spill_file:
+            for binlog_event in reader:
+                if isinstance(binlog_event, RowsEvent):
+                    # Rows are decoded by the worker, not the reading process
+                    binlog_event.rows
+                pickle.dump(binlog_event, spill_file, pickle.HIGHEST_PROTOCOL)
+                count += 1
+    finally:
+        reader.close()
+    return spill_file.name, count
+
+
+def sink_file_events(path, sink, kwargs):
+    """Hand the events of a file to sink, run in a worker process"""
+    reader = BinLogFileReader(path, **kwargs)
+    try:
+        return sink(path, reader)
+    finally:
+        reader.close()
+
+
+class ParallelBinLogFileReader(object):
+    """Read binlog files in a pool of processes, one file per process
+
+        reader = ParallelBinLogFileReader(
+            paths, processes=32, only_events=[WriteRowsEvent]
+        )
+        for binlog_event in reader:
+            ...
+
+    Each file starts with its own FormatDescriptionEvent and table map, so
+    the files are read independently by BinLogFileReader in the worker
+    processes, with the same keyword arguments. Iterating over the reader
+    returns the events in the order of the files: a worker pickles the
+    decoded events of its file to a temporary file, which is read back once
+    the previous files are consumed. At most max_pending files are read
+    ahead.
+
+    run(sink) calls sink(path, reader) in a worker process for each file
+    instead, and returns the results of sink in the order of the files.
+    sink must be picklable, like a function of a module.
+    """
+
+    def __init__(self, paths, processes=None, max_pending=None, **kwargs):
+        if isinstance(paths, (str, bytes, os.PathLike)):
+            paths = [paths]
+        self.paths = [os.fspath(path) for path in paths]
+        self.processes = processes or os.cpu_count()
+        self.max_pending = max_pending or self.processes * 2
+        self.kwargs = kwargs
+
+    def __iter__(self):
+        with concurrent.futures.ProcessPoolExecutor(self.processes) as executor:
+            futures = self.__submit(executor, read_file_events, (self.kwargs,))
+            try:
+                for future in futures:
+                    spill_path, count = future.result()
+                    try:
+                        with open(spill_path, "rb") as spill_file:
+                            for _ in range(count):
+                                yield pickle.load(spill_file)
+                    finally:
+                        os.remove(spill_path)
+            finally:
+                futures.close()
+
+    def run(self, sink):
+        """Call sink(path, reader) for each file, return the results"""
+        with concurrent.futures.ProcessPoolExecutor(self.processes) as executor:
+            futures = self.__submit(executor, sink_file_events, (sink, self.kwargs))
+            return [future.result() for future in futures]
+
+    def __submit(self, executor, function, args):
+        # Yield the futures in file order, keeping max_pending files submitted
+        pending = collections.deque()
+        paths = iter(self.paths)
+        try:
+            while True:
+                for path in paths:
+                    pending.append(executor.submit(function, path, *args))
+                    if len(pending) >= self.max_pending:
+                        break
+                if not pending:
+                    return
+                yield pending.popleft()
+        finally:
+            for future in pending:
+                if not future.cancel() and function is read_file_events:
+                    self.__remove_spill_file(future)
+
+    @staticmethod
+    def __remove_spill_file(future):
+        try:
+            spill_path, _ = future.result()
+            os.remove(spill_path)
+        except Exception:
+            pass
@@ -0,0 +1,298 @@
+"""Sidecar index of binlog files
+
+    python -m pymysqlreplication.binlogindex /var/lib/mysql/mysql-bin.000042
+
+writes mysql-bin.000042.idx next to the binlog file. The index is built
+from the event headers, only the bodies of the GTID, query and table map
+events are looked at. Readers use it to start at a timestamp or a GTID
+without reading the events before:
+
+    index = BinLogIndex.load(index_path(path))
+    reader = BinLogFileReader(path, skip_to_timestamp=timestamp, index=index)
+    reader = BinLogFileReader(path, log_pos=index.find_gtid(gtid))
+"""
+
+import argparse
+import bisect
+import gzip
+import json
+import os
+import struct
+import uuid
+
+from .binlogfilereader import (
+    BINLOG_MAGIC,
+    EVENT_HEADER,
+    open_binlog_file,
+    parse_format_description,
+)
+from .constants.BINLOG import (
+    ANONYMOUS_GTID_LOG_EVENT,
+    FORMAT_DESCRIPTION_EVENT,
+    GTID_LOG_EVENT,
+    MARIADB_GTID_EVENT,
+    QUERY_EVENT,
+    TABLE_MAP_EVENT,
+    XA_PREPARE_EVENT,
+    XID_EVENT,
+)
+from .transaction import is_begin_query, is_commit_query
+
+INDEX_VERSION = 1
+
+# thread_id, exec_time, schema length, error_code, status_vars length
+QUERY_POST_HEADER = struct.Struct("<IIBHH")
+
+# Enough to recognize BEGIN, COMMIT, ROLLBACK and XA statements
+QUERY_PREFIX_SIZE = 64
+
+
+def index_path(path):
+    """Return the path of the sidecar index of a binlog file"""
+    return f"{path}.idx"
+
+
+class BinLogIndex(object):
+    """Positions of the events of a binlog file
+
+    :ivar log_file: str - binlog file name
+    :ivar size: int - size of the file when it was indexed
+    :ivar timestamps: list - (timestamp, position) pairs, sampled every
+        interval seconds at the start of transactions; every event before
+        position has a timestamp lower or equal to timestamp
+    :ivar gtids: list - (gtid, position) of the transactions with a GTID
+    :ivar transactions: list - (start, end) positions of the transactions
+    :ivar table_maps: dict - positions of the TableMapEvent of each table_id
+    """
+
+    def __init__(
+        self,
+        log_file,
+        size,
+        timestamps=None,
+        gtids=None,
+        transactions=None,
+        table_maps=None,
+    ):
+        self.log_file = log_file
+        self.size = size
+        self.timestamps = timestamps or []
+        self.gtids = gtids or []
+        self.transactions = transactions or []
+        self.table_maps = table_maps or {}
+        self.__sampled_timestamps = [timestamp for timestamp, _ in self.timestamps]
+        self.__gtid_positions = dict(self.gtids)
+        self.__transaction_starts = [start for start, _ in self.transactions]
+
+    def __repr__(self):
+        return f"<BinLogIndex {self.log_file} ({len(self.transactions)} transactions)>"
+
+    @classmethod
+    def build(cls, path, interval=1):
+        """Scan a binlog file and index it"""
+        data = open_binlog_file(path)
+        try:
+            return cls.__scan(path, data, interval)
+        finally:
+            data.close()
+
+    @classmethod
+    def __scan(cls, path, data, interval):
+        timestamps = []
+        gtids = []
+        transactions = []
+        table_maps = {}
+        use_checksum = False
+        # Highest timestamp of the events before position
+        max_timestamp = 0
+        start = None
+        in_block = False
+        position = len(BINLOG_MAGIC)
+        while position + EVENT_HEADER.size <= len(data):
+            timestamp, event_type, server_id, event_size, _, _ = (
+                EVENT_HEADER.unpack_from(data, position)
+            )
+            if event_size < EVENT_HEADER.size or position + event_size > len(data):
+                # Event truncated by a crash, or being written
+                break
+            body = position + EVENT_HEADER.size
+            end = position + event_size
+
+            commit = False
+            if event_type == FORMAT_DESCRIPTION_EVENT:
+                _, _, use_checksum = parse_format_description(
+                    data, position, event_size
+                )
+            elif event_type in (
+                GTID_LOG_EVENT,
+                ANONYMOUS_GTID_LOG_EVENT,
+                MARIADB_GTID_EVENT,
+            ):
+                start = position
+                in_block = False
+                if event_type == GTID_LOG_EVENT:
+                    sid = uuid.UUID(bytes=bytes(data[body + 1 : body + 17]))
+                    gno = struct.unpack_from("<Q", data, body + 17)[0]
+                    gtids.append((f"{sid}:{gno}", position))
+                elif event_type == MARIADB_GTID_EVENT:
+                    sequence, domain = struct.unpack_from("<QI", data, body)
+                    gtids.append((f"{domain}-{server_id}-{sequence}", position))
+            elif event_type == QUERY_EVENT:
+                query = cls.__read_query(data, body, end, use_checksum)
+                if is_begin_query(query):
+                    if start is None or in_block:
+                        start = position
+                    in_block = True
+                else:
+                    if start is None:
+                        start = position
+                    commit = not in_block or is_commit_query(query)
+            elif event_type == TABLE_MAP_EVENT:
+                table_id = int.from_bytes(data[body : body + 6], "little")
+                table_maps.setdefault(table_id, []).append(position)
+            elif event_type in (XID_EVENT, XA_PREPARE_EVENT):
+                commit = start is not None
+
+            if start == position and (
+                not timestamps or max_timestamp >= timestamps[-1][0] + interval
+            ):
+                timestamps.append((max_timestamp, position))
+            if commit:
+                transactions.append((start, end))
+                start = None
+                in_block = False
+            max_timestamp = max(max_timestamp, timestamp)
+            position = end
+
+        return cls(
+            os.path.basename(path),
+            position,
+            timestamps,
+            gtids,
+            transactions,
+            table_maps,
+        )
+
+    @staticmethod
+    def __read_query(data, body, end, use_checksum):
+        _, _, schema_length, _, status_vars_length = QUERY_POST_HEADER.unpack_from(
+            data, body
+        )
+        start = body + QUERY_POST_HEADER.size + status_vars_length + schema_length + 1
+        if use_checksum:
+            end -= 4
+        end = min(end, start + QUERY_PREFIX_SIZE)
+        return bytes(data[start:end]).decode("latin-1")
+
+    def matches(self, path):
+        """Return True if the index can be used with the binlog file at path:
+        the file has the indexed name and, binlog files being only appended
+        to, is not smaller than the indexed size
+        """
+        return self.log_file == os.path.basename(path) and self.size <= os.path.getsize(
+            path
+        )
+
+    def find_timestamp(self, timestamp):
+        """Return the position of the last sampled transaction before which
+        all the events are older than timestamp, None if there is none
+        """
+        i = bisect.bisect_left(self.__sampled_timestamps, timestamp)
+        if i == 0:
+            return None
+        return self.timestamps[i - 1][1]
+
+    def find_gtid(self, gtid):
+        """Return the position of the transaction of a GTID, None if it is
+        not in the file
+        """
+        return self.__gtid_positions.get(gtid)
+
+    def find_transaction(self, position):
+        """Return the (start, end) positions of the transaction containing
+        position, None if position is outside of any transaction
+        """
+        i = bisect.bisect_right(self.__transaction_starts, position)
+        if i == 0:
+            return None
+        start, end = self.transactions[i - 1]
+        if position >= end:
+            return None
+        return start, end
+
+    def find_table_map(self, table_id, position):
+        """Return the position of the last TableMapEvent of table_id before
+        position, None if there is none
+        """
+        positions = self.table_maps.get(table_id, [])
+        i = bisect.bisect_left(positions, position)
+        if i == 0:
+            return None
+        return positions[i - 1]
+
+    def to_dict(self):
+        return {
+            "version": INDEX_VERSION,
+            "log_file": self.log_file,
+            "size": self.size,
+            "timestamps": self.timestamps,
+            "gtids": self.gtids,
+            "transactions": self.transactions,
+            "table_maps": self.table_maps,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data["log_file"],
+            data["size"],
+            [tuple(timestamp) for timestamp in data["timestamps"]],
+            [tuple(gtid) for gtid in data["gtids"]],
+            [tuple(transaction) for transaction in data["transactions"]],
+            {
+                int(table_id): positions
+                for table_id, positions in data["table_maps"].items()
+            },
+        )
+
+    def save(self, path):
+        """Write the index as gzipped JSON"""
+        tmp_path = f"{path}.tmp"
+        with gzip.open(tmp_path, "wt") as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Read an index written by save(), None if there is none"""
+        try:
+            with gzip.open(path, "rt") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        if data.get("version") != INDEX_VERSION:
+            return None
+        return cls.from_dict(data)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Index binlog files")
+    parser.add_argument("paths", nargs="+", help="binlog files")
+    parser.add_argument(
+        "--interval",
+        type=int,
+        default=1,
+        help="seconds between two sampled timestamps (default: 1)",
+    )
+    args = parser.parse_args(args)
+    for path in args.paths:
+        index = BinLogIndex.build(path, args.interval)
+        index.save(index_path(path))
+        print(
+            f"{path}: {len(index.transactions)} transactions, "
+            f"{len(index.gtids)} GTIDs, {len(index.timestamps)} timestamps"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,8 @@
+import collections
+import random
 import struct
 import logging
+import time
 from packaging.version import Version
 
 import pymysql
@@ -29,9 +32,13 @@ from .event import (
     UserVarEvent,
     PreviousGtidsEvent,
 )
+from .checkpoint import Checkpoint, Checkpointer
+from .context import StreamContext
 from .exceptions import BinLogNotEnabled
-from .gtid import GtidSet
-from .packet import BinLogPacketWrapper
+from .gtid import Gtid, GtidSet
+from .packet import BinLogPacketWrapper, EventHeader
+from .parallel import RowsDecodingPool
+from .prefetch import PacketPrefetcher
 from .row_event import (
     UpdateRowsEvent,
     WriteRowsEvent,
@@ -39,6 +46,7 @@ from .row_event import (
     TableMapEvent,
     PartialUpdateRowsEvent,
 )
+from .transaction import is_begin_query, is_commit_query
 
 try:
     from pymysql.constants.COMMAND import COM_BINLOG_DUMP_GTID
@@ -49,7 +57,17 @@ except ImportError:
 
 # 2013 Connection Lost
 # 2006 MySQL server has gone away
-MYSQL_EXPECTED_ERROR_CODES = [2013, 2006]
+# 2003 Can't connect to MySQL server, while reconnecting
+MYSQL_EXPECTED_ERROR_CODES = [2013, 2006, 2003]
+
+# Seconds of difference between the start times computed from two Uptime
+# values of the same server
+SERVER_RESTART_TOLERANCE = 5
+
+# Events decoded to find the transaction boundaries
+TRANSACTION_BOUNDARY_EVENTS = frozenset(
+    [GtidEvent, MariadbGtidEvent, QueryEvent, XidEvent, XAPrepareEvent]
+)
 
 PYMYSQL_VERSION_LT_06 = Version(pymysql.__version__) < Version("0.6")
 
@@ -177,6 +195,8 @@ class BinLogStreamReader(object):
         ignored_tables=None,
         only_schemas=None,
         ignored_schemas=None,
+        only_columns=None,
+        ignored_columns=None,
         freeze_schema=False,
         skip_to_timestamp=None,
         report_slave=None,
@@ -188,6 +208,19 @@ class BinLogStreamReader(object):
         ignore_decode_errors=False,
         verify_checksum=False,
         enable_logging=True,
+        prefetch_queue_size=0,
+        prefetch_max_bytes=None,
+        row_decoding_processes=None,
+        compact_rows=False,
+        row_filters=None,
+        skim=False,
+        checkpoint_store=None,
+        checkpoint_interval=1.0,
+        checkpoint_every=1000,
+        resume_on_reconnect=False,
+        reconnect_backoff=0.1,
+        reconnect_max_backoff=30.0,
+        reconnect_max_retries=None,
     ):
         """
         Attributes:
@@ -209,9 +242,17 @@ class BinLogStreamReader(object):
             ignored_tables: An array with the tables you want to skip
             only_schemas: An array with the schemas you want to watch
             ignored_schemas: An array with the schemas you want to skip
+            only_columns: A dict of "schema.table" keys and arrays of the
+                          columns you want to decode for that table, the other
+                          columns are skipped and missing from the rows
+            ignored_columns: A dict of "schema.table" keys and arrays of the
+                             columns you want to skip for that table
             freeze_schema: If true do not support ALTER TABLE. It's faster.
             skip_to_timestamp: Ignore all events until reaching specified
-                               timestamp.
+                               timestamp. Without log_file nor auto_position,
+                               the stream starts at the last binlog file
+                               created before timestamp, found by a binary
+                               search over SHOW BINARY LOGS (MySQL only).
             report_slave: Report slave in SHOW SLAVE HOSTS.
             slave_uuid: Report slave_uuid or replica_uuid in SHOW SLAVE HOSTS(MySQL 8.0.21-) or
                         SHOW REPLICAS(MySQL 8.0.22+) depends on your MySQL version.
@@ -230,6 +271,64 @@ class BinLogStreamReader(object):
             verify_checksum: If true, verify events read from the binary log by examining checksums.
             enable_logging: When set to True, logs various details helpful for debugging and monitoring
                             When set to False, logging is disabled to enhance performance.
+            prefetch_queue_size: If set, packets are read from the network in a
+                                 background thread and up to this number of
+                                 packets are queued until fetchone decodes
+                                 them.
+            prefetch_max_bytes: Also stop the background reads when the queued
+                                packets reach this total size in bytes.
+            row_decoding_processes: If set, the rows of the rows events are
+                                    decoded by this number of worker
+                                    processes while the next events are
+                                    read. Events are still returned in the
+                                    binlog order. Only the rows are
+                                    decoded by the workers, see
+                                    RowsDecodingPool.
+            compact_rows: If true, the rows of WriteRowsEvent and
+                          DeleteRowsEvent are Row objects, and the rows of
+                          UpdateRowsEvent (before, after) tuples of Row,
+                          instead of dicts. A Row keeps its values in a
+                          tuple and is read like a dict: row["column"].
+            row_filters: A dict of "schema.table" keys and RowFilter from
+                         pymysqlreplication.row_filter. Only the rows
+                         matching the filter of their table are decoded and
+                         returned by the rows events, the columns of the
+                         filter are decoded first and the rest of the other
+                         rows is skipped.
+            skim: If true, fetchone returns an EventHeader with the
+                  timestamp, type, server_id, log_pos, size and log_file of
+                  each event instead of the event. Only the event headers
+                  are read, the control connection is not opened and
+                  positions are not checkpointed. only_events,
+                  ignored_events, skip_to_timestamp and end_log_pos apply.
+            checkpoint_store: A CheckpointStore from
+                              pymysqlreplication.checkpoint. The stream
+                              starts from its last checkpoint, and saves
+                              the position (and the executed GTID set with
+                              auto_position) after the transactions whose
+                              events have all been consumed. Implies
+                              resume_on_reconnect.
+            checkpoint_interval: Save the checkpoint at most every this
+                                 number of seconds.
+            checkpoint_every: Also save the checkpoint after this number of
+                              transactions.
+            resume_on_reconnect: When the connection is lost, resume after the
+                                 last transaction read instead of the start
+                                 position. The executed GTID set is tracked
+                                 with auto_position. The GTID, Query and
+                                 Xid events are then always decoded to find
+                                 the transaction boundaries, as with
+                                 checkpoint_store, and each connection
+                                 reads the server Uptime to detect a
+                                 restart.
+            reconnect_backoff: Delay in seconds before the first reconnection,
+                               doubled after each failed attempt, with a
+                               random jitter.
+            reconnect_max_backoff: Maximum delay in seconds between two
+                                   reconnection attempts.
+            reconnect_max_retries: Raise the error after this number of
+                                   failed reconnection attempts in a row,
+                                   retry forever if None.
         """
 
         self.__connection_settings = connection_settings
@@ -247,13 +346,24 @@ class BinLogStreamReader(object):
         self.__ignored_tables = ignored_tables
         self.__only_schemas = only_schemas
         self.__ignored_schemas = ignored_schemas
+        self.__only_columns = only_columns
+        self.__ignored_columns = ignored_columns
+        self.__compact_rows = compact_rows
+        self.__row_filters = row_filters
         self.__freeze_schema = freeze_schema
         self.__allowed_events = self._allowed_event_list(
             only_events, ignored_events, filter_non_implemented_events
         )
         self.__ignore_decode_errors = ignore_decode_errors
         self.__verify_checksum = verify_checksum
-        self.__optional_meta_data = False
+        self._optional_meta_data = False
+        self.__prefetch_queue_size = prefetch_queue_size
+        self.__prefetch_max_bytes = prefetch_max_bytes
+        self.__prefetcher = None
+        self.__row_decoding_processes = row_decoding_processes
+        self.__row_decoding_pool = None
+        self.__end_of_stream = False
+        self.__close_when_drained = False
 
         # We can't filter on packet level TABLE_MAP and rotate event because
         # we need them for handling other operations
@@ -262,7 +372,7 @@ class BinLogStreamReader(object):
         )
 
         self.__server_id = server_id
-        self.__use_checksum = False
+        self._use_checksum = False
 
         # Store table meta information
         self.table_map = {}
@@ -273,6 +383,53 @@ class BinLogStreamReader(object):
         self.skip_to_timestamp = skip_to_timestamp
         self.is_mariadb = is_mariadb
         self.__annotate_rows_event = annotate_rows_event
+
+        self.__skim = skim
+        self.__skimmed_event_types = BinLogPacketWrapper.event_types(
+            self.__allowed_events
+        )
+        self.__track_transactions = not skim and (
+            resume_on_reconnect or checkpoint_store is not None
+        )
+        self.__checkpointer = None
+        # Transaction boundaries with the number of events handled up to
+        # them, saved once these events are returned by fetchone
+        self.__pending_checkpoints = collections.deque()
+        self.__boundary_checkpoint = None
+        self.__stream_checkpoint = None
+        self.__handled_events = 0
+        self.__transaction_gtid = None
+        self.__in_transaction_block = False
+        if checkpoint_store is not None:
+            self.__checkpointer = Checkpointer(
+                checkpoint_store, checkpoint_interval, checkpoint_every
+            )
+            checkpoint = checkpoint_store.load()
+            if checkpoint is not None:
+                self.__restore_checkpoint(checkpoint)
+        if self.__track_transactions:
+            self.__allowed_events_in_packet = self.__allowed_events_in_packet.union(
+                TRANSACTION_BOUNDARY_EVENTS
+            )
+        self.__allowed_event_types = BinLogPacketWrapper.event_types(
+            self.__allowed_events_in_packet
+        )
+        # Ids of the tables which TableMapEvent is filtered out
+        self.__ignored_table_ids = set()
+        self.__context = None
+        self.__executed_gtids = self.__parse_executed_gtids()
+
+        self.__reconnect_backoff = reconnect_backoff
+        self.__reconnect_max_backoff = reconnect_max_backoff
+        self.__reconnect_max_retries = reconnect_max_retries
+        self.__reconnect_attempts = 0
+        # A stream with a checkpoint store never goes back before its
+        # last checkpoint
+        self.__resume_on_reconnect = resume_on_reconnect or (
+            checkpoint_store is not None
+        )
+        self.__stream_started = False
+        self.__server_started_at = None
         if enable_logging:
             self.__log_valid_parameters()
 
@@ -292,6 +449,14 @@ class BinLogStreamReader(object):
         self.dbms = None
 
     def close(self):
+        self.__close_when_drained = False
+        if self.__checkpointer is not None:
+            self._save_checkpoints()
+            self.__checkpointer.flush()
+        self.__stop_prefetch()
+        if self.__row_decoding_pool is not None:
+            self.__row_decoding_pool.close()
+            self.__row_decoding_pool = None
         if self.__connected_stream:
             self._stream_connection.close()
             self.__connected_stream = False
@@ -348,14 +513,12 @@ class BinLogStreamReader(object):
         # log_file (string.EOF) -- filename of the binlog on the master
         self._stream_connection = self.pymysql_wrapper(**self.__connection_settings)
 
-        self.__use_checksum = self.__checksum_enabled()
+        self.__stream_started = True
+        if self.__resume_on_reconnect:
+            self.__check_server_restart()
+        self._use_checksum = self.__checksum_enabled()
 
-        # If checksum is enabled we need to inform the server about the that
-        # we support it
-        if self.__use_checksum:
-            cur = self._stream_connection.cursor()
-            cur.execute("SET @master_binlog_checksum= @@global.binlog_checksum")
-            cur.close()
+        self.__set_dump_settings(self._stream_connection)
 
         if self.slave_uuid:
             cur = self._stream_connection.cursor()
@@ -364,35 +527,16 @@ class BinLogStreamReader(object):
             )
             cur.close()
 
-        if self.slave_heartbeat:
-            # 4294967 is documented as the max value for heartbeats
-            net_timeout = float(self.__connection_settings.get("read_timeout", 4294967))
-            # If heartbeat is too low, the connection will disconnect before,
-            # this is also the behavior in mysql
-            heartbeat = float(min(net_timeout / 2.0, self.slave_heartbeat))
-            if heartbeat > 4294967:
-                heartbeat = 4294967
-
-            # master_heartbeat_period is nanoseconds
-            heartbeat = int(heartbeat * 1000000000)
-            cur = self._stream_connection.cursor()
-            cur.execute("SET @master_heartbeat_period= %d" % heartbeat)
-            cur.close()
-
-        # When replicating from Mariadb 10.6.12 using binlog coordinates, a slave capability < 4 triggers a bug in
-        # Mariadb, when it tries to replace GTID events with dummy ones. Given that this library understands GTID
-        # events, setting the capability to 4 circumvents this error.
-        # If the DB is mysql, this won't have any effect so no need to run this in a condition
-        cur = self._stream_connection.cursor()
-        cur.execute("SET @mariadb_slave_capability=4")
-        cur.close()
-
         self._register_slave()
 
         if not self.auto_position:
             if self.is_mariadb:
                 prelude = self.__set_mariadb_settings()
             else:
+                if self.log_file is None and self.skip_to_timestamp:
+                    self.log_file = self.__find_log_file(self.skip_to_timestamp)
+                    self.log_pos = 4
+
                 # only when log_file and log_pos both provided, the position info is
                 # valid, if not, get the current position from master
                 if self.log_file is None or self.log_pos is None:
@@ -512,6 +656,108 @@ class BinLogStreamReader(object):
             self._stream_connection._next_seq_id = 1
         self.__connected_stream = True
 
+    def __set_dump_settings(self, connection):
+        """Set the session variables of a binlog dump on a connection: the
+        checksum, the heartbeat period and the MariaDB capability
+        """
+        # If checksum is enabled we need to inform the server about the that
+        # we support it
+        if self._use_checksum:
+            cur = connection.cursor()
+            cur.execute("SET @master_binlog_checksum= @@global.binlog_checksum")
+            cur.close()
+
+        if self.slave_heartbeat:
+            # 4294967 is documented as the max value for heartbeats
+            net_timeout = float(self.__connection_settings.get("read_timeout", 4294967))
+            # If heartbeat is too low, the connection will disconnect before,
+            # this is also the behavior in mysql
+            heartbeat = float(min(net_timeout / 2.0, self.slave_heartbeat))
+            if heartbeat > 4294967:
+                heartbeat = 4294967
+
+            # master_heartbeat_period is nanoseconds
+            heartbeat = int(heartbeat * 1000000000)
+            cur = connection.cursor()
+            cur.execute("SET @master_heartbeat_period= %d" % heartbeat)
+            cur.close()
+
+        # When replicating from Mariadb 10.6.12 using binlog coordinates, a slave capability < 4 triggers a bug in
+        # Mariadb, when it tries to replace GTID events with dummy ones. Given that this library understands GTID
+        # events, setting the capability to 4 circumvents this error.
+        # If the DB is mysql, this won't have any effect so no need to run this in a condition
+        cur = connection.cursor()
+        cur.execute("SET @mariadb_slave_capability=4")
+        cur.close()
+
+    def __find_log_file(self, timestamp):
+        """Return the last binlog file which first event is older than
+        timestamp, or the first binlog file
+        """
+        cur = self._stream_connection.cursor()
+        cur.execute("SHOW BINARY LOGS")
+        log_files = [row[0] for row in cur.fetchall()]
+        cur.close()
+        if not log_files:
+            raise BinLogNotEnabled()
+
+        # The events of a file are older than the first event of the next
+        # file, so the files before the found one only have events older
+        # than timestamp
+        low, high = 0, len(log_files) - 1
+        while low < high:
+            middle = (low + high + 1) // 2
+            first_timestamp = self.__first_event_timestamp(log_files[middle])
+            if first_timestamp is not None and first_timestamp < timestamp:
+                low = middle
+            else:
+                high = middle - 1
+        return log_files[low]
+
+    def __first_event_timestamp(self, log_file):
+        """Return the timestamp of the FormatDescriptionEvent of a binlog
+        file, read by a short binlog dump on its own connection, which the
+        server closes at the end of the dump
+
+        A new dump stops the running dumps with the same server_id: like
+        mysqlbinlog, it has the server_id 0, which is not the one of the
+        stream or of a replica. SHOW BINLOG EVENTS does not return the
+        timestamps of the events.
+        """
+        connection = self.pymysql_wrapper(**self.__connection_settings)
+        try:
+            self.__set_dump_settings(connection)
+
+            prelude = struct.pack("<i", len(log_file) + 11) + bytes(
+                bytearray([COM_BINLOG_DUMP])
+            )
+            prelude += struct.pack("<I", 4)
+            prelude += struct.pack("<H", 0x01)  # BINLOG_DUMP_NON_BLOCK
+            prelude += struct.pack("<I", 0)
+            prelude += log_file.encode()
+
+            if PYMYSQL_VERSION_LT_06:
+                connection.wfile.write(prelude)
+                connection.wfile.flush()
+            else:
+                connection._write_bytes(prelude)
+                connection._next_seq_id = 1
+
+            # The dump starts with an artificial RotateEvent
+            while True:
+                if PYMYSQL_VERSION_LT_06:
+                    pkt = connection.read_packet()
+                else:
+                    pkt = connection._read_packet()
+                if pkt.is_eof_packet():
+                    return None
+                # OK byte, then timestamp and event type of the event header
+                timestamp, event_type = struct.unpack_from("<IB", pkt.get_all_data(), 1)
+                if event_type == FORMAT_DESCRIPTION_EVENT:
+                    return timestamp
+        finally:
+            connection.close()
+
     def __set_mariadb_settings(self):
         # https://mariadb.com/kb/en/5-slave-registration/
         cur = self._stream_connection.cursor()
@@ -576,52 +822,262 @@ class BinLogStreamReader(object):
                         """,
                 )
             else:
-                self.__optional_meta_data = True
+                self._optional_meta_data = True
 
     def fetchone(self):
+        self._save_checkpoints()
+        if not self.__row_decoding_processes:
+            return self.__fetch_event()
+
+        if self.__row_decoding_pool is None:
+            self.__row_decoding_pool = RowsDecodingPool(self.__row_decoding_processes)
+        pool = self.__row_decoding_pool
+
+        # Read the next events while the oldest one is decoded
+        while not (pool.is_ready() or pool.is_full() or self.__end_of_stream):
+            binlog_event = self.__fetch_event()
+            if binlog_event is None:
+                self.__end_of_stream = True
+            else:
+                pool.put(binlog_event)
+
+        if not len(pool):
+            self.__end_of_stream = False
+            if self.__close_when_drained:
+                self.close()
+            return None
+        return pool.get()
+
+    def __fetch_event(self):
         while True:
+            self._save_checkpoints()
             if self.end_log_pos and self.is_past_end_log_pos:
                 return None
 
-            if not self.__connected_stream:
-                self.__connect_to_stream()
-
-            if not self.__connected_ctl:
-                self.__connect_to_ctl()
-
             try:
-                if PYMYSQL_VERSION_LT_06:
-                    pkt = self._stream_connection.read_packet()
-                else:
-                    pkt = self._stream_connection._read_packet()
+                self._connect()
+                pkt = self._read_packet()
             except pymysql.OperationalError as error:
-                code, message = error.args
-                if code in MYSQL_EXPECTED_ERROR_CODES:
-                    self._stream_connection.close()
-                    self.__connected_stream = False
-                    logging.log(
-                        logging.WARN,
-                        """
-                          A pymysql.OperationalError error occurred, Re-request the connection.
-                        """,
-                    )
+                if self._handle_connection_lost(error):
+                    time.sleep(self._reconnect_delay())
                     continue
                 raise
 
             if pkt.is_eof_packet():
-                self.close()
+                if self.__row_decoding_pool:
+                    # The events queued in the pool are returned before
+                    # the stream is closed
+                    self.__close_when_drained = True
+                else:
+                    self.close()
                 return None
 
-            if not pkt.is_ok_packet():
-                continue
+            binlog_event = self._handle_packet(pkt)
+            if binlog_event is not None:
+                return binlog_event
+
+    def _read_packet(self):
+        """Read the next packet of the stream"""
+        if PYMYSQL_VERSION_LT_06:
+            return self._stream_connection.read_packet()
+        if self.__prefetch_queue_size:
+            return self.__read_prefetched_packet()
+        return self._stream_connection._read_packet()
+
+    def __read_prefetched_packet(self):
+        if self.__prefetcher is None:
+            self.__prefetcher = PacketPrefetcher(
+                self._stream_connection._read_packet,
+                self.__prefetch_queue_size,
+                self.__prefetch_max_bytes,
+            )
+        try:
+            return self.__prefetcher.get()
+        except Exception:
+            # The reader thread stopped on this error
+            self.__stop_prefetch()
+            raise
+
+    def __stop_prefetch(self):
+        if self.__prefetcher is not None:
+            self.__prefetcher.stop()
+            self.__prefetcher = None
+
+    def _connect(self):
+        """Open the stream and control connections if they are not"""
+        if not self.__connected_stream:
+            self.__connect_to_stream()
+
+        if not self.__connected_ctl and not self.__skim:
+            self.__connect_to_ctl()
+
+    def _is_connected(self):
+        return self.__connected_stream and (self.__connected_ctl or self.__skim)
+
+    def _handle_connection_lost(self, error):
+        """Close the stream connection if the error means the server went away,
+        it is then opened again by the next fetch after _reconnect_delay().
+
+        Return False if the error is not a lost connection, if the first
+        connection failed or if reconnect_max_retries is reached.
+        """
+        code, message = error.args
+        if code not in MYSQL_EXPECTED_ERROR_CODES or not self.__stream_started:
+            return False
+        self.__reconnect_attempts += 1
+        if (
+            self.__reconnect_max_retries is not None
+            and self.__reconnect_attempts > self.__reconnect_max_retries
+        ):
+            return False
+        if self.__connected_stream:
+            self._stream_connection.close()
+            self.__connected_stream = False
+        if self.__resume_on_reconnect and self.__stream_checkpoint is not None:
+            # Read again the transaction which was interrupted
+            self.__restore_checkpoint(self.__stream_checkpoint)
+        self.__transaction_gtid = None
+        self.__in_transaction_block = False
+        logging.log(
+            logging.WARN,
+            """
+              A pymysql.OperationalError error occurred, Re-request the connection.
+            """,
+        )
+        return True
+
+    def _reconnect_delay(self):
+        """Seconds to wait before the next reconnection attempt"""
+        delay = min(
+            self.__reconnect_max_backoff,
+            self.__reconnect_backoff * 2 ** (self.__reconnect_attempts - 1),
+        )
+        return random.uniform(delay / 2, delay)
+
+    def __check_server_restart(self):
+        """Forget the table map if the server restarted, table ids are only
+        valid until a restart.
+        """
+        cur = self._stream_connection.cursor()
+        cur.execute("SHOW GLOBAL STATUS LIKE 'Uptime'")
+        result = cur.fetchone()
+        cur.close()
+        if result is None:
+            return
+        started_at = time.time() - int(result[1])
+        if (
+            self.__server_started_at is not None
+            and abs(started_at - self.__server_started_at) > SERVER_RESTART_TOLERANCE
+        ):
+            self.table_map = {}
+            self.__ignored_table_ids.clear()
+        self.__server_started_at = started_at
+
+    def _handle_packet(self, pkt):
+        """Decode a packet of the stream.
+
+        Return the event, or None if the packet has to be skipped.
+        """
+        self.__reconnect_attempts = 0
+        if not pkt.is_ok_packet():
+            return None
+
+        if self.__skim:
+            return self.__skim_packet(pkt)
+
+        binlog_event = BinLogPacketWrapper(
+            pkt, self.table_map, self._stream_context(), self.__ignored_table_ids
+        )
 
-            binlog_event = BinLogPacketWrapper(
-                pkt,
-                self.table_map,
+        if binlog_event.event_type == ROTATE_EVENT:
+            self.log_pos = binlog_event.event.position
+            self.log_file = binlog_event.event.next_binlog
+            # Table Id in binlog are NOT persistent in MySQL - they are in-memory identifiers
+            # that means that when MySQL master restarts, it will reuse same table id for different tables
+            # which will cause errors for us since our in-memory map will try to decode row data with
+            # wrong table schema.
+            # The fix is to rely on the fact that MySQL will also rotate to a new binlog file every time it
+            # restarts. That means every rotation we see *could* be a sign of restart and so potentially
+            # invalidates all our cached table id to schema mappings. This means we have to load them all
+            # again for each logfile which is potentially wasted effort but we can't really do much better
+            # without being broken in restart case
+            if binlog_event.timestamp != 0:
+                self.table_map = {}
+                self.__ignored_table_ids.clear()
+
+        elif binlog_event.log_pos:
+            self.log_pos = binlog_event.log_pos
+
+        if self.end_log_pos and self.log_pos >= self.end_log_pos:
+            # We're currently at, or past, the specified end log position.
+            self.is_past_end_log_pos = True
+
+        # This check must not occur before clearing the ``table_map`` as a
+        # result of a RotateEvent.
+        #
+        # The first RotateEvent in a binlog file has a timestamp of
+        # zero.  If the server has moved to a new log and not written a
+        # timestamped RotateEvent at the end of the previous log, the
+        # RotateEvent at the beginning of the new log will be ignored
+        # if the caller provided a positive ``skip_to_timestamp``
+        # value.  This will result in the ``table_map`` becoming
+        # corrupt.
+        #
+        # https://dev.mysql.com/doc/internals/en/event-data-for-specific-event-types.html
+        # From the MySQL Internals Manual:
+        #
+        #   ROTATE_EVENT is generated locally and written to the binary
+        #   log on the master. It is written to the relay log on the
+        #   slave when FLUSH LOGS occurs, and when receiving a
+        #   ROTATE_EVENT from the master. In the latter case, there
+        #   will be two rotate events in total originating on different
+        #   servers.
+        #
+        #   There are conditions under which the terminating
+        #   log-rotation event does not occur. For example, the server
+        #   might crash.
+        if self.__track_transactions and binlog_event.event is not None:
+            self.__track_transaction(binlog_event.event)
+
+        if self.skip_to_timestamp and binlog_event.timestamp < self.skip_to_timestamp:
+            return None
+
+        if (
+            binlog_event.event_type == TABLE_MAP_EVENT
+            and binlog_event.event is not None
+        ):
+            self.table_map[binlog_event.event.table_id] = binlog_event.event.get_table()
+
+        # event is none if we have filter it on packet level
+        # we filter also not allowed events
+        if binlog_event.event is None or (
+            binlog_event.event.__class__ not in self.__allowed_events
+        ):
+            return None
+
+        if binlog_event.event_type == FORMAT_DESCRIPTION_EVENT:
+            self.mysql_version = binlog_event.event.mysql_version
+
+        self.__handled_events += 1
+        return binlog_event.event
+
+    def _stream_context(self):
+        """Return the StreamContext of the events, created again when the
+        connection, the server version or the checksum setting changes
+        """
+        context = self.__context
+        if (
+            context is None
+            or context.ctl_connection is not self._ctl_connection
+            or context.mysql_version != self.mysql_version
+            or context.use_checksum != self._use_checksum
+            or context.optional_meta_data != self._optional_meta_data
+        ):
+            context = self.__context = StreamContext(
                 self._ctl_connection,
                 self.mysql_version,
-                self.__use_checksum,
-                self.__allowed_events_in_packet,
+                self._use_checksum,
+                self.__allowed_event_types,
                 self.__only_tables,
                 self.__ignored_tables,
                 self.__only_schemas,
@@ -629,80 +1085,122 @@ class BinLogStreamReader(object):
                 self.__freeze_schema,
                 self.__ignore_decode_errors,
                 self.__verify_checksum,
-                self.__optional_meta_data,
+                self._optional_meta_data,
+                self.__only_columns,
+                self.__ignored_columns,
+                compact_rows=self.__compact_rows,
+                row_filters=self.__row_filters,
             )
+        return context
 
-            if binlog_event.event_type == ROTATE_EVENT:
-                self.log_pos = binlog_event.event.position
-                self.log_file = binlog_event.event.next_binlog
-                # Table Id in binlog are NOT persistent in MySQL - they are in-memory identifiers
-                # that means that when MySQL master restarts, it will reuse same table id for different tables
-                # which will cause errors for us since our in-memory map will try to decode row data with
-                # wrong table schema.
-                # The fix is to rely on the fact that MySQL will also rotate to a new binlog file every time it
-                # restarts. That means every rotation we see *could* be a sign of restart and so potentially
-                # invalidates all our cached table id to schema mappings. This means we have to load them all
-                # again for each logfile which is potentially wasted effort but we can't really do much better
-                # without being broken in restart case
-                if binlog_event.timestamp != 0:
-                    self.table_map = {}
-
-            elif binlog_event.log_pos:
-                self.log_pos = binlog_event.log_pos
-
-            if self.end_log_pos and self.log_pos >= self.end_log_pos:
-                # We're currently at, or past, the specified end log position.
-                self.is_past_end_log_pos = True
-
-            # This check must not occur before clearing the ``table_map`` as a
-            # result of a RotateEvent.
-            #
-            # The first RotateEvent in a binlog file has a timestamp of
-            # zero.  If the server has moved to a new log and not written a
-            # timestamped RotateEvent at the end of the previous log, the
-            # RotateEvent at the beginning of the new log will be ignored
-            # if the caller provided a positive ``skip_to_timestamp``
-            # value.  This will result in the ``table_map`` becoming
-            # corrupt.
-            #
-            # https://dev.mysql.com/doc/internals/en/event-data-for-specific-event-types.html
-            # From the MySQL Internals Manual:
-            #
-            #   ROTATE_EVENT is generated locally and written to the binary
-            #   log on the master. It is written to the relay log on the
-            #   slave when FLUSH LOGS occurs, and when receiving a
-            #   ROTATE_EVENT from the master. In the latter case, there
-            #   will be two rotate events in total originating on different
-            #   servers.
-            #
-            #   There are conditions under which the terminating
-            #   log-rotation event does not occur. For example, the server
-            #   might crash.
-            if (
-                self.skip_to_timestamp
-                and binlog_event.timestamp < self.skip_to_timestamp
-            ):
-                continue
+    def __skim_packet(self, pkt):
+        """Return the EventHeader of a packet, its body is only read for a
+        RotateEvent
+        """
+        timestamp, event_type, server_id, event_size, log_pos, _ = (
+            BinLogPacketWrapper.read_header(pkt)
+        )
+        log_file = self.log_file
+        if event_type == ROTATE_EVENT:
+            # position (8) then the name of the next binlog file
+            body = pkt._position + 20
+            name_size = event_size - 27 - (4 if self._use_checksum else 0)
+            self.log_pos = struct.unpack_from("<Q", pkt._data, body)[0]
+            self.log_file = bytes(pkt._data[body + 8 : body + 8 + name_size]).decode()
+        elif log_pos:
+            self.log_pos = log_pos
+
+        if self.end_log_pos and self.log_pos >= self.end_log_pos:
+            self.is_past_end_log_pos = True
+
+        if self.skip_to_timestamp and timestamp < self.skip_to_timestamp:
+            return None
+        if event_type not in self.__skimmed_event_types:
+            return None
+
+        self.__handled_events += 1
+        return EventHeader(
+            timestamp, event_type, server_id, log_pos, event_size, log_file
+        )
 
-            if (
-                binlog_event.event_type == TABLE_MAP_EVENT
-                and binlog_event.event is not None
-            ):
-                self.table_map[binlog_event.event.table_id] = (
-                    binlog_event.event.get_table()
-                )
+    def __parse_executed_gtids(self):
+        if not self.__track_transactions or not self.auto_position:
+            return None
+        if self.is_mariadb:
+            # One GTID per replication domain
+            gtids = [gtid.strip() for gtid in self.auto_position.split(",")]
+            return {gtid.split("-")[0]: gtid for gtid in gtids if gtid}
+        # The GTIDs of the events have lower case UUIDs
+        return GtidSet(self.auto_position.lower())
+
+    def __restore_checkpoint(self, checkpoint):
+        if checkpoint.gtid_set:
+            self.auto_position = checkpoint.gtid_set
+        else:
+            self.log_file = checkpoint.log_file
+            self.log_pos = checkpoint.log_pos
+            self.__resume_stream = True
+
+    def __track_transaction(self, binlog_event):
+        """Record a checkpoint when binlog_event ends a transaction"""
+        if isinstance(binlog_event, (GtidEvent, MariadbGtidEvent)):
+            self.__transaction_gtid = binlog_event.gtid
+            # MariaDB does not log BEGIN, the GTID event opens the block
+            self.__in_transaction_block = (
+                isinstance(binlog_event, MariadbGtidEvent)
+                and not binlog_event.standalone
+            )
+            return
+        if isinstance(binlog_event, QueryEvent):
+            if is_begin_query(binlog_event.query):
+                self.__in_transaction_block = True
+                return
+            if self.__in_transaction_block and not is_commit_query(binlog_event.query):
+                return
+        elif not isinstance(binlog_event, (XidEvent, XAPrepareEvent)):
+            return
 
-            # event is none if we have filter it on packet level
-            # we filter also not allowed events
-            if binlog_event.event is None or (
-                binlog_event.event.__class__ not in self.__allowed_events
-            ):
-                continue
+        gtid_set = None
+        if self.__executed_gtids is not None:
+            if self.__transaction_gtid is not None:
+                self.__add_executed_gtid(self.__transaction_gtid)
+            if self.is_mariadb:
+                gtid_set = ",".join(self.__executed_gtids.values())
+            else:
+                gtid_set = str(self.__executed_gtids)
+        self.__transaction_gtid = None
+        self.__in_transaction_block = False
+        self.__stream_checkpoint = Checkpoint(self.log_file, self.log_pos, gtid_set)
+        self.__boundary_checkpoint = self.__stream_checkpoint
+
+    def __add_executed_gtid(self, gtid):
+        if self.is_mariadb:
+            self.__executed_gtids[gtid.split("-")[0]] = gtid
+        else:
+            self.__executed_gtids = self.__executed_gtids + Gtid(gtid)
 
-            if binlog_event.event_type == FORMAT_DESCRIPTION_EVENT:
-                self.mysql_version = binlog_event.event.mysql_version
+    def _save_checkpoints(self):
+        """Hand the checkpoints of the transactions whose events were all
+        returned to the checkpoint store.
 
-            return binlog_event.event
+        Called before reading the next event: the events returned by
+        fetchone have then been consumed.
+        """
+        if self.__checkpointer is None:
+            return
+        if self.__boundary_checkpoint is not None:
+            self.__pending_checkpoints.append(
+                (self.__handled_events, self.__boundary_checkpoint)
+            )
+            self.__boundary_checkpoint = None
+        consumed_events = self.__handled_events
+        if self.__row_decoding_pool is not None:
+            consumed_events -= len(self.__row_decoding_pool)
+        pending = self.__pending_checkpoints
+        while pending and pending[0][0] <= consumed_events:
+            self.__checkpointer.update(pending.popleft()[1])
+        # Also called on heartbeats and empty reads of an idle stream
+        self.__checkpointer.tick()
 
     def _allowed_event_list(
         self, only_events, ignored_events, filter_non_implemented_events
@@ -750,7 +1248,7 @@ class BinLogStreamReader(object):
         return frozenset(events)
 
     def __get_dbms(self):
-        if not self.__connected_ctl:
+        if not self.__connected_ctl and not self.__skim:
             self.__connect_to_ctl()
         if self.dbms:
             return self.dbms
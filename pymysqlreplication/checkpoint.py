@@ -0,0 +1,189 @@
+import json
+import os
+import sqlite3
+import time
+
+
+class Checkpoint(object):
+    """Position of the stream after a transaction
+
+    :ivar log_file: str - binlog file
+    :ivar log_pos: int - position of the next event in log_file
+    :ivar gtid_set: str - executed GTID set, None if the stream does not
+        use auto_position
+    """
+
+    def __init__(self, log_file=None, log_pos=None, gtid_set=None):
+        self.log_file = log_file
+        self.log_pos = log_pos
+        self.gtid_set = gtid_set
+
+    def __eq__(self, other):
+        return isinstance(other, Checkpoint) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return (
+            f"<Checkpoint log_file={self.log_file} log_pos={self.log_pos} "
+            f'gtid_set="{self.gtid_set}">'
+        )
+
+    def to_dict(self):
+        return {
+            "log_file": self.log_file,
+            "log_pos": self.log_pos,
+            "gtid_set": self.gtid_set,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get("log_file"), data.get("log_pos"), data.get("gtid_set"))
+
+
+class CheckpointStore(object):
+    """Where the checkpoints of a stream are persisted
+
+    Subclasses implement save(checkpoint) and load(), which returns the
+    last saved Checkpoint or None.
+    """
+
+    def load(self):
+        return None
+
+    def save(self, checkpoint):
+        raise NotImplementedError()
+
+    def close(self):
+        pass
+
+
+class FileCheckpointStore(CheckpointStore):
+    """Save the checkpoint as JSON in a local file
+
+    The file is written next to its final path and renamed, so a crash
+    leaves either the previous or the new checkpoint.
+    """
+
+    def __init__(self, path, fsync=True):
+        self.path = path
+        self.fsync = fsync
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                return Checkpoint.from_dict(json.load(f))
+        except FileNotFoundError:
+            return None
+
+    def save(self, checkpoint):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(checkpoint.to_dict(), f)
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        if self.fsync:
+            directory = os.open(
+                os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY
+            )
+            try:
+                os.fsync(directory)
+            finally:
+                os.close(directory)
+
+
+class SQLiteCheckpointStore(CheckpointStore):
+    """Save the checkpoint in a SQLite database, one row per name"""
+
+    def __init__(self, path, name="default"):
+        self.name = name
+        self.__connection = sqlite3.connect(path)
+        with self.__connection:
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoint ("
+                "name TEXT PRIMARY KEY, log_file TEXT, log_pos INTEGER, "
+                "gtid_set TEXT)"
+            )
+
+    def load(self):
+        row = self.__connection.execute(
+            "SELECT log_file, log_pos, gtid_set FROM checkpoint WHERE name = ?",
+            (self.name,),
+        ).fetchone()
+        if row is None:
+            return None
+        return Checkpoint(*row)
+
+    def save(self, checkpoint):
+        with self.__connection:
+            self.__connection.execute(
+                "INSERT OR REPLACE INTO checkpoint VALUES (?, ?, ?, ?)",
+                (
+                    self.name,
+                    checkpoint.log_file,
+                    checkpoint.log_pos,
+                    checkpoint.gtid_set,
+                ),
+            )
+
+    def close(self):
+        self.__connection.close()
+
+
+class CallbackCheckpointStore(CheckpointStore):
+    """Hand the checkpoints to save(checkpoint), and restore from load()"""
+
+    def __init__(self, save, load=None):
+        self.__save = save
+        self.__load = load
+
+    def load(self):
+        if self.__load is None:
+            return None
+        return self.__load()
+
+    def save(self, checkpoint):
+        self.__save(checkpoint)
+
+
+class Checkpointer(object):
+    """Coalesce the checkpoints written to a CheckpointStore
+
+    update() is called after each transaction, the last checkpoint is
+    saved once every transactions updates or every interval seconds,
+    whichever comes first, and by flush(). tick() is called while the
+    stream is idle so that the last checkpoint is still saved after
+    interval seconds.
+    """
+
+    def __init__(self, store, interval=1.0, every=1000, clock=None):
+        self.store = store
+        self.interval = interval
+        self.every = every
+        self.checkpoint = None
+        self.__clock = clock or time.monotonic
+        self.__unsaved = 0
+        self.__last_save = self.__clock()
+
+    def update(self, checkpoint):
+        self.checkpoint = checkpoint
+        self.__unsaved += 1
+        if self.every is not None and self.__unsaved >= self.every:
+            self.flush()
+        else:
+            self.tick()
+
+    def tick(self):
+        """Save the last checkpoint if it is older than interval seconds"""
+        if (
+            self.__unsaved
+            and self.interval is not None
+            and self.__clock() - self.__last_save >= self.interval
+        ):
+            self.flush()
+
+    def flush(self):
+        if self.__unsaved:
+            self.store.save(self.checkpoint)
+            self.__unsaved = 0
+        self.__last_save = self.__clock()
@@ -0,0 +1,438 @@
+"""Column-oriented decoding of rows events
+
+    batch = ColumnBatch.from_events(events)
+    batch.columns["id"].values      # array.array("i")
+    batch.to_arrow()                # pyarrow.Table, needs pyarrow
+
+The row images of consecutive rows events of one table are decoded
+straight into per column buffers, without dict or value objects for
+integer, float and string columns:
+
+- integer and float columns: an array.array, the little-endian values
+  of the packet are copied as is
+- string, binary and geometry columns: the bytes of all the values in
+  one bytearray, and an array.array of offsets
+- other columns (DECIMAL, dates and times, ENUM, SET, BIT, JSON): a list
+  of the values decoded like in the rows
+
+NULL values are recorded in a validity bitmap, with the Arrow layout.
+"""
+
+import array
+import codecs
+import sys
+
+from .bitmap import BitCount, BitGet
+from .constants import BINLOG
+from .constants import FIELD_TYPE
+from .row_decoder import (
+    build_reader,
+    build_skipper,
+    charset_to_encoding,
+    fixed_size,
+    length_prefix_size,
+)
+from .row_event import DeleteRowsEvent, UpdateRowsEvent, WriteRowsEvent
+
+# array.array typecodes of the fixed width columns, (signed, unsigned)
+ARRAY_TYPECODES = {
+    FIELD_TYPE.TINY: ("b", "B"),
+    FIELD_TYPE.SHORT: ("h", "H"),
+    FIELD_TYPE.INT24: ("i", "I"),
+    FIELD_TYPE.LONG: ("i", "I"),
+    FIELD_TYPE.LONGLONG: ("q", "Q"),
+    FIELD_TYPE.FLOAT: ("f", "f"),
+    FIELD_TYPE.DOUBLE: ("d", "d"),
+    FIELD_TYPE.YEAR: ("H", "H"),
+}
+
+BINARY_TYPES = frozenset(
+    [
+        FIELD_TYPE.VARCHAR,
+        FIELD_TYPE.STRING,
+        FIELD_TYPE.BLOB,
+        FIELD_TYPE.GEOMETRY,
+    ]
+)
+
+# Operation of each row of a batch
+INSERT = ord("I")
+UPDATE = ord("U")
+DELETE = ord("D")
+
+
+class ColumnVector(object):
+    """Values of one column of a ColumnBatch
+
+    :ivar name: str - column name
+    :ivar column: Column - metadata of the column
+    :ivar kind: str - "fixed", "binary" or "object"
+    :ivar values: array.array of the fixed columns, list of the object
+        columns. The values of NULL are 0 in an array.
+    :ivar offsets: array.array - value i of a binary column is
+        data[offsets[i]:offsets[i + 1]]
+    :ivar data: bytearray - values of a binary column
+    :ivar encoding: str - encoding of the text in data, None for binary
+        data and unknown charsets, whose values stay bytes like in the rows
+    :ivar decode_errors: str - "ignore" with ignore_decode_errors, like in
+        the rows, "strict" otherwise
+    :ivar validity: bytearray - bitmap of the values which are not None,
+        least significant bit first
+    :ivar null_count: int - number of None values
+    """
+
+    def __init__(self, name, column, ignore_decode_errors=False):
+        self.name = name
+        self.column = column
+        self.values = None
+        self.offsets = None
+        self.data = None
+        self.encoding = None
+        self.decode_errors = "ignore" if ignore_decode_errors else "strict"
+        self.validity = bytearray()
+        self.null_count = 0
+        self.__length = 0
+
+        column_type = column.type
+        if column_type in ARRAY_TYPECODES:
+            self.kind = "fixed"
+            self.values = array.array(ARRAY_TYPECODES[column_type][column.unsigned])
+            self.__read = self.__fixed_reader(column)
+        elif column_type in BINARY_TYPES:
+            self.kind = "binary"
+            self.offsets = array.array("q", [0])
+            self.data = bytearray()
+            self.encoding = self.__text_encoding(column)
+            self.__read = self.__binary_reader(column)
+        else:
+            self.kind = "object"
+            self.values = []
+            self.__read = self.__object_reader(
+                build_reader(column, ignore_decode_errors)[0]
+            )
+
+    def __len__(self):
+        return self.__length
+
+    def __fixed_reader(self, column):
+        values = self.values
+        size = fixed_size(column)
+        if sys.byteorder == "little" and values.itemsize == size:
+            # Copy the bytes of the packet without creating an int
+            def read(packet):
+                values.frombytes(packet.read_view(size))
+                return True
+
+        else:
+            decode = build_reader(column)[0]
+
+            def read(packet):
+                values.append(decode(packet))
+                return True
+
+        return read
+
+    def __binary_reader(self, column):
+        offsets = self.offsets
+        data = self.data
+        prefix_size = length_prefix_size(column)
+
+        def read(packet):
+            length = packet.read_uint_by_size(prefix_size)
+            data[len(data) :] = packet.read_view(length)
+            offsets.append(len(data))
+            return True
+
+        return read
+
+    def __object_reader(self, decode):
+        values = self.values
+
+        def read(packet):
+            value = decode(packet)
+            values.append(value)
+            return value is not None
+
+        return read
+
+    @staticmethod
+    def __text_encoding(column):
+        if column.type == FIELD_TYPE.GEOMETRY:
+            return None
+        # Same default as the rows when the charset is unknown
+        encoding = "utf-8"
+        if column.character_set_name is not None:
+            encoding = charset_to_encoding(column.character_set_name)
+        try:
+            return codecs.lookup(encoding).name
+        except LookupError:
+            return None
+
+    def __mark(self, valid):
+        length = self.__length
+        if not length & 7:
+            self.validity.append(0)
+        if valid:
+            self.validity[-1] |= 1 << (length & 7)
+        else:
+            self.null_count += 1
+        self.__length = length + 1
+
+    def append(self, packet):
+        """Decode a value from the packet cursor"""
+        self.__mark(self.__read(packet))
+
+    def append_json_diff(self, packet):
+        """Decode a partial JSON update from the packet cursor"""
+        value = packet.read_binary_json(self.column.length_size, True)
+        self.values.append(value)
+        self.__mark(value is not None)
+
+    def append_null(self):
+        if self.kind == "fixed":
+            self.values.append(0)
+        elif self.kind == "binary":
+            self.offsets.append(len(self.data))
+        else:
+            self.values.append(None)
+        self.__mark(False)
+
+    def is_valid(self, i):
+        return bool(self.validity[i >> 3] & (1 << (i & 7)))
+
+    def to_pylist(self):
+        """Return the values as a list, None for NULL"""
+        if self.kind == "binary":
+            data = bytes(self.data)
+            offsets = self.offsets
+            values = [data[offsets[i] : offsets[i + 1]] for i in range(len(self))]
+            if self.encoding is not None:
+                values = [
+                    value.decode(self.encoding, self.decode_errors) for value in values
+                ]
+        else:
+            values = list(self.values)
+        if self.null_count:
+            values = [v if self.is_valid(i) else None for i, v in enumerate(values)]
+        return values
+
+    def to_numpy(self):
+        """Return the values as a NumPy array, masked if there are NULL
+        values. The array of a fixed column shares its buffer.
+        """
+        import numpy
+
+        if self.kind != "fixed":
+            return numpy.array(self.to_pylist(), dtype=object)
+        values = numpy.frombuffer(self.values, dtype=self.values.typecode)
+        if not self.null_count:
+            return values
+        valid = numpy.unpackbits(
+            numpy.frombuffer(self.validity, dtype=numpy.uint8),
+            count=len(self),
+            bitorder="little",
+        )
+        return numpy.ma.masked_array(values, mask=valid == 0)
+
+    def to_arrow(self):
+        """Return the values as a pyarrow Array. The arrays of fixed and
+        binary columns share the buffers of the vector, which must not grow
+        while the Array is used.
+        """
+        import pyarrow
+
+        if self.kind == "object":
+            return pyarrow.array(self.values, from_pandas=False)
+        if self.encoding == "utf-8" and self.decode_errors == "ignore":
+            # The invalid bytes are dropped, the strings do not share the
+            # buffers of the vector
+            return pyarrow.array(self.to_pylist(), pyarrow.large_string())
+        validity = pyarrow.py_buffer(self.validity) if self.null_count else None
+        if self.kind == "fixed":
+            arrow_type = {
+                "b": pyarrow.int8(),
+                "B": pyarrow.uint8(),
+                "h": pyarrow.int16(),
+                "H": pyarrow.uint16(),
+                "i": pyarrow.int32(),
+                "I": pyarrow.uint32(),
+                "q": pyarrow.int64(),
+                "Q": pyarrow.uint64(),
+                "f": pyarrow.float32(),
+                "d": pyarrow.float64(),
+            }[self.values.typecode]
+            buffers = [validity, pyarrow.py_buffer(self.values)]
+        else:
+            if self.encoding == "utf-8":
+                arrow_type = pyarrow.large_string()
+            else:
+                arrow_type = pyarrow.large_binary()
+            buffers = [
+                validity,
+                pyarrow.py_buffer(self.offsets),
+                pyarrow.py_buffer(self.data),
+            ]
+        return pyarrow.Array.from_buffers(
+            arrow_type, len(self), buffers, null_count=self.null_count
+        )
+
+
+class ColumnBatch(object):
+    """Row images of rows events of one table, decoded column by column
+
+    :ivar schema: str - schema of the table
+    :ivar table: str - name of the table
+    :ivar image: str - row image of the UpdateRowsEvent: "after" or
+        "before"
+    :ivar columns: dict - ColumnVector of each decoded column, in table
+        order. Columns excluded by only_columns / ignored_columns are left
+        out.
+    :ivar ops: bytearray - INSERT, UPDATE or DELETE for each row
+    """
+
+    def __init__(self, schema, table, decoder, image="after"):
+        if image not in ("after", "before"):
+            raise ValueError(f'image must be "after" or "before", not {image!r}')
+        self.schema = schema
+        self.table = table
+        self.image = image
+        self.decoder = decoder
+        self.columns = {}
+        self.ops = bytearray()
+        # (ColumnVector or None, skip) for each column of the table
+        self.__readers = []
+        for name, column in zip(decoder.names, decoder.columns):
+            vector = None
+            if decoder.is_decoded(name):
+                vector = ColumnVector(name, column, decoder.ignore_decode_errors)
+                self.columns[name] = vector
+            self.__readers.append((vector, build_skipper(column)))
+
+    def __len__(self):
+        return len(self.ops)
+
+    def __repr__(self):
+        return f"<ColumnBatch {self.schema}.{self.table} ({len(self)} rows)>"
+
+    @classmethod
+    def from_events(cls, events, image="after"):
+        """Decode consecutive rows events of one table"""
+        batch = None
+        for binlog_event in events:
+            if batch is None:
+                batch = cls(
+                    binlog_event.schema,
+                    binlog_event.table,
+                    binlog_event._get_row_decoder(),
+                    image,
+                )
+            batch.append(binlog_event)
+        return batch
+
+    def accepts(self, binlog_event):
+        """Return True if the rows of the event can be added to the batch:
+        same table with the same columns
+        """
+        if (binlog_event.schema, binlog_event.table) != (self.schema, self.table):
+            return False
+        decoder = binlog_event._get_row_decoder()
+        return decoder is self.decoder or (
+            decoder.names == self.decoder.names
+            and decoder.columns == self.decoder.columns
+            and decoder.positions == self.decoder.positions
+        )
+
+    def append(self, binlog_event):
+        """Decode the rows of a WriteRowsEvent, UpdateRowsEvent or
+        DeleteRowsEvent from its packet, which must not be detached. The
+        rows not matching the row filter of the table are left out.
+        """
+        if not self.accepts(binlog_event):
+            raise ValueError(
+                f"{binlog_event.schema}.{binlog_event.table} rows can not be "
+                f"added to a batch of {self.schema}.{self.table}"
+            )
+        if not binlog_event.complete:
+            return
+        if isinstance(binlog_event, UpdateRowsEvent):
+            op = UPDATE
+            images = [binlog_event.columns_present_bitmap]
+            images.append(binlog_event.columns_present_bitmap2)
+            decoded = 1 if self.image == "after" else 0
+        elif isinstance(binlog_event, (WriteRowsEvent, DeleteRowsEvent)):
+            op = INSERT if isinstance(binlog_event, WriteRowsEvent) else DELETE
+            images = [binlog_event.columns_present_bitmap]
+            decoded = 0
+        else:
+            raise TypeError(f"{type(binlog_event).__name__} has no rows")
+
+        partial = binlog_event.event_type == BINLOG.PARTIAL_UPDATE_ROWS_EVENT
+        row_filter = binlog_event._get_row_filter()
+        packet = binlog_event.packet
+        packet.rewind(binlog_event._rows_start())
+        while packet.read_bytes < binlog_event.event_size:
+            if row_filter is not None:
+                position = packet.tell()
+                if not binlog_event._filter_one_row(row_filter):
+                    continue
+                packet.rewind(position)
+            for i, cols_bitmap in enumerate(images):
+                partial_bitmap = None
+                if partial and i == 1:
+                    partial_bitmap = self.__read_value_options(packet)
+                self.__read_image(packet, cols_bitmap, partial_bitmap, i != decoded)
+            self.ops.append(op)
+
+    def __read_value_options(self, packet):
+        # binlog_row_value_options of the after image of a partial update
+        options = packet.read_length_coded_binary()
+        if options & 0b10000001 == 0:
+            return None
+        return packet.read((self.decoder.json_column_count + 7) // 8)
+
+    def __read_image(self, packet, cols_bitmap, partial_bitmap, skip_image):
+        null_bitmap = packet.read((BitCount(cols_bitmap) + 7) // 8)
+        null_index = 0
+        json_index = 0
+        for i, (vector, skip) in enumerate(self.__readers):
+            is_json = vector is not None and vector.column.type == FIELD_TYPE.JSON
+            if not BitGet(cols_bitmap, i):
+                # Not in the MINIMAL row image
+                if vector is not None and not skip_image:
+                    vector.append_null()
+            elif null_bitmap[null_index >> 3] & (1 << (null_index & 7)):
+                if vector is not None and not skip_image:
+                    vector.append_null()
+                null_index += 1
+            elif vector is None or skip_image:
+                skip(packet)
+                null_index += 1
+            elif (
+                is_json
+                and partial_bitmap is not None
+                and BitGet(partial_bitmap, json_index)
+            ):
+                vector.append_json_diff(packet)
+                null_index += 1
+            else:
+                vector.append(packet)
+                null_index += 1
+            if self.decoder.columns[i].type == FIELD_TYPE.JSON:
+                json_index += 1
+
+    def to_pydict(self):
+        """Return a dict of the values of each column as lists"""
+        return {name: vector.to_pylist() for name, vector in self.columns.items()}
+
+    def to_numpy(self):
+        """Return a dict of the NumPy arrays of each column, needs numpy"""
+        return {name: vector.to_numpy() for name, vector in self.columns.items()}
+
+    def to_arrow(self):
+        """Return a pyarrow Table of the columns, needs pyarrow"""
+        import pyarrow
+
+        return pyarrow.Table.from_arrays(
+            [vector.to_arrow() for vector in self.columns.values()],
+            names=list(self.columns),
+        )
@@ -0,0 +1,145 @@
+SETTINGS = (
+    "ctl_connection",
+    "dbms",
+    "charset",
+    "mysql_version",
+    "use_checksum",
+    "verify_checksum",
+    "allowed_events",
+    "only_tables",
+    "ignored_tables",
+    "only_schemas",
+    "ignored_schemas",
+    "freeze_schema",
+    "ignore_decode_errors",
+    "optional_meta_data",
+    "only_columns",
+    "ignored_columns",
+    "compact_rows",
+    "row_filters",
+)
+
+
+class StreamContext(object):
+    """Settings of a stream shared by all the events it decodes
+
+    BinLogStreamReader creates a new context when one of them changes, like
+    the server version after a FormatDescriptionEvent, and each event only
+    keeps a reference to it. Contexts are immutable, replace() returns a
+    copy with some settings changed.
+
+    :ivar ctl_connection: connection used to query the schema of the tables
+    :ivar dbms: str - "mysql" or "mariadb"
+    :ivar charset: str - charset of the control connection
+    :ivar mysql_version: tuple - version of the server
+    :ivar use_checksum: bool - events end with a CRC32 checksum
+    :ivar verify_checksum: bool - check the checksum of the events, if
+        use_checksum
+    :ivar allowed_events: frozenset - event type codes to decode
+    :ivar compact_rows: bool - decode the row images to Row objects
+    :ivar row_filters: dict - RowFilter of the rows to decode, by
+        "schema.table"
+    """
+
+    __slots__ = SETTINGS + ("_without_connection",)
+
+    def __init__(
+        self,
+        ctl_connection=None,
+        mysql_version=(0, 0, 0),
+        use_checksum=False,
+        allowed_events=frozenset(),
+        only_tables=None,
+        ignored_tables=None,
+        only_schemas=None,
+        ignored_schemas=None,
+        freeze_schema=False,
+        ignore_decode_errors=False,
+        verify_checksum=False,
+        optional_meta_data=False,
+        only_columns=None,
+        ignored_columns=None,
+        dbms=None,
+        compact_rows=False,
+        row_filters=None,
+    ):
+        if ctl_connection is not None and dbms is None:
+            dbms = ctl_connection._get_dbms()
+        settings = {
+            "ctl_connection": ctl_connection,
+            "dbms": dbms,
+            "charset": getattr(ctl_connection, "charset", None),
+            "mysql_version": mysql_version,
+            "use_checksum": use_checksum,
+            "verify_checksum": verify_checksum,
+            "allowed_events": allowed_events,
+            "only_tables": only_tables,
+            "ignored_tables": ignored_tables,
+            "only_schemas": only_schemas,
+            "ignored_schemas": ignored_schemas,
+            "freeze_schema": freeze_schema,
+            "ignore_decode_errors": ignore_decode_errors,
+            "optional_meta_data": optional_meta_data,
+            "only_columns": only_columns,
+            "ignored_columns": ignored_columns,
+            "compact_rows": compact_rows,
+            "row_filters": row_filters,
+        }
+        for name, value in settings.items():
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, "_without_connection", None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("StreamContext is immutable, use replace()")
+
+    def __delattr__(self, name):
+        raise AttributeError("StreamContext is immutable, use replace()")
+
+    def __repr__(self):
+        return f"<StreamContext dbms={self.dbms} mysql_version={self.mysql_version}>"
+
+    def accepts_table(self, schema, table):
+        """Return False if the table is filtered out by only_tables,
+        ignored_tables, only_schemas or ignored_schemas
+        """
+        if self.only_tables is not None and table not in self.only_tables:
+            return False
+        if self.ignored_tables is not None and table in self.ignored_tables:
+            return False
+        if self.only_schemas is not None and schema not in self.only_schemas:
+            return False
+        if self.ignored_schemas is not None and schema in self.ignored_schemas:
+            return False
+        return True
+
+    def replace(self, **changes):
+        """Return a copy of the context with some settings changed"""
+        settings = {name: getattr(self, name) for name in SETTINGS if name != "charset"}
+        if "ctl_connection" in changes and "dbms" not in changes:
+            settings["dbms"] = None
+        settings.update(changes)
+        return StreamContext(**settings)
+
+    def without_connection(self):
+        """Return a copy of the context without the connection, the same
+        copy for all the events detached from this context
+        """
+        if self.ctl_connection is None:
+            return self
+        if self._without_connection is None:
+            context = self.replace(ctl_connection=None, dbms=self.dbms)
+            object.__setattr__(context, "charset", self.charset)
+            object.__setattr__(self, "_without_connection", context)
+        return self._without_connection
+
+    def __getstate__(self):
+        # Events are pickled to be decoded in another process, which has no
+        # access to the connection
+        state = {name: getattr(self, name) for name in SETTINGS}
+        state["ctl_connection"] = None
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, "_without_connection", None)
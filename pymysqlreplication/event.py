@@ -2,6 +2,7 @@ import binascii
 import struct
 import datetime
 import decimal
+import types
 import zlib
 import logging
 
@@ -12,53 +13,108 @@ from typing import Union, Optional
 import json
 
 
+def slot_names(cls):
+    """Names of the attributes of the __slots__ of a class and its bases"""
+    return [
+        name
+        for klass in cls.__mro__
+        for name, value in vars(klass).items()
+        if isinstance(value, types.MemberDescriptorType)
+    ]
+
+
 class BinLogEvent(object):
-    def __init__(
-        self,
-        from_packet,
-        event_size,
-        table_map,
-        ctl_connection,
-        mysql_version=(0, 0, 0),
-        only_tables=None,
-        ignored_tables=None,
-        only_schemas=None,
-        ignored_schemas=None,
-        freeze_schema=False,
-        ignore_decode_errors=False,
-        verify_checksum=False,
-        optional_meta_data=False,
-    ):
+    # Events only keep their decoded attributes, see detach(). Subclasses
+    # which do not declare __slots__ get a __dict__ for other attributes
+    __slots__ = (
+        "packet",
+        "table_map",
+        "event_type",
+        "timestamp",
+        "event_size",
+        "_context",
+        "mysql_version",
+        "_is_event_valid",
+        "_processed",
+        "complete",
+    )
+
+    def __init__(self, from_packet, event_size, table_map, context):
         self.packet = from_packet
         self.table_map = table_map
         self.event_type = self.packet.event_type
         self.timestamp = self.packet.timestamp
         self.event_size = event_size
-        self._ctl_connection = ctl_connection
-        self.mysql_version = mysql_version
-        self._ignore_decode_errors = ignore_decode_errors
-        self._verify_checksum = verify_checksum
+        # Settings of the stream, shared by its events
+        self._context = context
+        self.mysql_version = context.mysql_version
         self._is_event_valid = None
         # The event have been fully processed, if processed is false
         # the event will be skipped
         self._processed = True
         self.complete = True
         self._verify_event()
-        self.dbms = self._ctl_connection._get_dbms()
+
+    @property
+    def dbms(self):
+        return self._context.dbms
+
+    @property
+    def _ctl_connection(self):
+        return self._context.ctl_connection
+
+    @property
+    def _ignore_decode_errors(self):
+        return self._context.ignore_decode_errors
+
+    @property
+    def _verify_checksum(self):
+        return self._context.verify_checksum and self._context.use_checksum
+
+    def __getstate__(self):
+        # Events are pickled to be decoded in another process, their
+        # context is pickled without the connection
+        state = getattr(self, "__dict__", {}).copy()
+        for name in slot_names(type(self)):
+            try:
+                state[name] = object.__getattribute__(self, name)
+            except AttributeError:
+                # Optional attribute which is not set
+                pass
+        # Only the rows events need their table, see RowsEvent.__getstate__
+        state["table_map"] = None
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
+    def detach(self):
+        """Release the packet, the table map and the connection of the
+        event once it is decoded, for events kept in memory or handed to
+        another thread or process
+
+        The packet is replaced by a DetachedPacket with its header fields
+        (log_pos, event_size...), the decoded attributes are kept. Return
+        the event.
+        """
+        self.packet = self.packet.detach()
+        self.table_map = None
+        self._context = self._context.without_connection()
+        return self
 
     def _read_table_id(self):
-        # Table ID is 6 byte
-        # pad little-endian number
-        table_id = self.packet.read(6) + b"\x00\x00"
-        return struct.unpack("<Q", table_id)[0]
+        # Table ID is 6 byte little-endian number
+        return self.packet.read_uint48()
 
     def _verify_event(self):
         if not self._verify_checksum:
             return
 
-        self.packet.rewind(1)
-        data = self.packet.read(19 + self.event_size)
-        footer = self.packet.read(4)
+        # Header and body are checked in place, without moving the cursor
+        start = self.packet.tell() - 19
+        data = self.packet.get_bytes(start, 19 + self.event_size)
+        footer = self.packet.get_bytes(start + 19 + self.event_size, 4)
         byte_data = zlib.crc32(data).to_bytes(4, byteorder="little")
         self._is_event_valid = True if byte_data == footer else False
         if not self._is_event_valid:
@@ -66,8 +122,6 @@ class BinLogEvent(object):
                 f"An CRC32 has failed for the event type {self.event_type}, "
                 "indicating a potential integrity issue with the data."
             )
-        self.packet.read_bytes -= 19 + self.event_size + 4
-        self.packet.rewind(20)
 
     @property
     def formatted_timestamp(self) -> str:
@@ -113,8 +167,17 @@ class GtidEvent(BinLogEvent):
     :ivar sequence_number: The transaction's logical timestamp assigned at prepare phase
     """
 
-    def __init__(self, from_packet, event_size, table_map, ctl_connection, **kwargs):
-        super().__init__(from_packet, event_size, table_map, ctl_connection, **kwargs)
+    __slots__ = (
+        "commit_flag",
+        "sid",
+        "gno",
+        "lt_type",
+        "last_committed",
+        "sequence_number",
+    )
+
+    def __init__(self, from_packet, event_size, table_map, context):
+        super().__init__(from_packet, event_size, table_map, context)
 
         self.commit_flag = struct.unpack("!B", self.packet.read(1))[0] == 1
         self.sid = self.packet.read(16)
@@ -163,9 +226,11 @@ class PreviousGtidsEvent(BinLogEvent):
     Eg: [4c9e3dfc-9d25-11e9-8d2e-0242ac1cfd7e:1-100, 4c9e3dfc-9d25-11e9-8d2e-0242ac1cfd7e:1-10:20-30]
     """
 
-    def __init__(self, from_packet, event_size, table_map, ctl_connection, **kwargs):
+    __slots__ = ("_n_sid", "_gtids", "_previous_gtids")
+
+    def __init__(self, from_packet, event_size, table_map, context):
         super(PreviousGtidsEvent, self).__init__(
-            from_packet, event_size, table_map, ctl_connection, **kwargs
+            from_packet, event_size, table_map, context
         )
 
         self._n_sid = self.packet.read_int64()
@@ -211,8 +276,13 @@ class MariadbGtidEvent(BinLogEvent):
     :ivar gtid: str - The Global Transaction Identifier in the format ‘domain_id-server_id-gtid_seq_no’.
     """
 
-    def __init__(self, from_packet, event_size, table_map, ctl_connection, **kwargs):
-        super().__init__(from_packet, event_size, table_map, ctl_connection, **kwargs)
+    __slots__ = ("server_id", "gtid_seq_no", "domain_id", "flags", "gtid")
+
+    # The event group is a single statement, without BEGIN and COMMIT
+    FL_STANDALONE = 1
+
+    def __init__(self, from_packet, event_size, table_map, context):
+        super().__init__(from_packet, event_size, table_map, context)
 
         self.server_id = self.packet.server_id
         self.gtid_seq_no = self.packet.read_uint64()
@@ -220,6 +290,13 @@ class MariadbGtidEvent(BinLogEvent):
         self.flags = self.packet.read_uint8()
         self.gtid = f"{self.domain_id}-{self.server_id}-{self.gtid_seq_no}"
 
+    @property
+    def standalone(self):
+        """False if the event opens a transaction, ended by a COMMIT query
+        or a XidEvent, in place of a BEGIN query
+        """
+        return bool(self.flags & self.FL_STANDALONE)
+
     def _dump(self):
         super()._dump()
         print(f"Flags: {self.flags}")
@@ -237,9 +314,11 @@ class MariadbBinLogCheckPointEvent(BinLogEvent):
     :ivar filename: str - The name of the file saved at the checkpoint.
     """
 
-    def __init__(self, from_packet, event_size, table_map, ctl_connection, **kwargs):
+    __slots__ = ("filename",)
+
+    def __init__(self, from_packet, event_size, table_map, context):
         super(MariadbBinLogCheckPointEvent, self).__init__(
-            from_packet, event_size, table_map, ctl_connection, **kwargs
+            from_packet, event_size, table_map, context
         )
         filename_length = self.packet.read_uint32()
         self.filename = self.packet.read(filename_length).decode()
@@ -257,8 +336,10 @@ class MariadbAnnotateRowsEvent(BinLogEvent):
     :ivar sql_statement: str - The SQL statement
     """
 
-    def __init__(self, from_packet, event_size, table_map, ctl_connection, **kwargs):
-        super().__init__(from_packet, event_size, table_map, ctl_connection, **kwargs)
+    __slots__ = ("sql_statement",)
+
+    def __init__(self, from_packet, event_size, table_map, context):
+        super().__init__(from_packet, event_size, table_map, context)
         self.sql_statement = self.packet.read(event_size)
 
     def _dump(self):
@@ -281,9 +362,11 @@ class MariadbGtidListEvent(BinLogEvent):
         gtid: 'domain_id'+ 'server_id' + 'gtid_seq_no'
     """
 
-    def __init__(self, from_packet, event_size, table_map, ctl_connection, **kwargs):
+    __slots__ = ("gtid_length", "gtid_list")
+
+    def __init__(self, from_packet, event_size, table_map, context):
         super(MariadbGtidListEvent, self).__init__(
-            from_packet, event_size, table_map, ctl_connection, **kwargs
+            from_packet, event_size, table_map, context
         )
 
         class MariadbGtidObejct(BinLogEvent):
@@ -291,11 +374,11 @@ class MariadbGtidListEvent(BinLogEvent):
             Information class of elements in GTID list
             """
 
-            def __init__(
-                self, from_packet, event_size, table_map, ctl_connection, **kwargs
-            ):
+            __slots__ = ("domain_id", "server_id", "gtid_seq_no", "gtid")
+
+            def __init__(self, from_packet, event_size, table_map, context):
                 super(MariadbGtidObejct, self).__init__(
-                    from_packet, event_size, table_map, ctl_connection, **kwargs
+                    from_packet, event_size, table_map, context
                 )
                 self.domain_id = self.packet.read_uint32()
                 self.server_id = self.packet.read_uint32()
@@ -304,12 +387,15 @@ class MariadbGtidListEvent(BinLogEvent):
 
         self.gtid_length = self.packet.read_uint32()
         self.gtid_list = [
-            MariadbGtidObejct(
-                from_packet, event_size, table_map, ctl_connection, **kwargs
-            )
+            MariadbGtidObejct(from_packet, event_size, table_map, context)
             for i in range(self.gtid_length)
         ]
 
+    def detach(self):
+        for gtid in self.gtid_list:
+            gtid.detach()
+        return super().detach()
+
 
 class RotateEvent(BinLogEvent):
     """
@@ -322,8 +408,10 @@ class RotateEvent(BinLogEvent):
     :ivar next_binlog: str - Name of next binlog file
     """
 
-    def __init__(self, from_packet, event_size, table_map, ctl_connection, **kwargs):
-        super().__init__(from_packet, event_size, table_map, ctl_connection, **kwargs)
+    __slots__ = ("position", "next_binlog")
+
+    def __init__(self, from_packet, event_size, table_map, context):
+        super().__init__(from_packet, event_size, table_map, context)
         self.position = struct.unpack("<Q", self.packet.read(8))[0]
         self.next_binlog = self.packet.read(event_size - 8).decode()
 
@@ -346,8 +434,10 @@ class XAPrepareEvent(BinLogEvent):
     :ivar xid: serialized XID representation of XA transaction (xid_gtrid + xid_bqual)
     """
 
-    def __init__(self, from_packet, event_size, table_map, ctl_connection, **kwargs):
-        super().__init__(from_packet, event_size, table_map, ctl_connection, **kwargs)
+    __slots__ = ("one_phase", "xid_format_id", "xid_gtrid", "xid_bqual")
+
+    def __init__(self, from_packet, event_size, table_map, context):
+        super().__init__(from_packet, event_size, table_map, context)
 
         # one_phase is True: XA COMMIT ... ONE PHASE
         # one_phase is False: XA PREPARE
@@ -379,8 +469,18 @@ class FormatDescriptionEvent(BinLogEvent):
     :ivar mysql_version_str: str - Server's MySQL version in string format.
     """
 
-    def __init__(self, from_packet, event_size, table_map, ctl_connection, **kwargs):
-        super().__init__(from_packet, event_size, table_map, ctl_connection, **kwargs)
+    __slots__ = (
+        "binlog_version",
+        "mysql_version_str",
+        "created",
+        "common_header_len",
+        "post_header_len",
+        "server_version_split",
+        "number_of_event_types",
+    )
+
+    def __init__(self, from_packet, event_size, table_map, context):
+        super().__init__(from_packet, event_size, table_map, context)
         self.binlog_version = struct.unpack("<H", self.packet.read(2))
         self.mysql_version_str = self.packet.read(50).rstrip(b"\0").decode()
         numbers = self.mysql_version_str.split("-")[0]
@@ -408,7 +508,7 @@ class FormatDescriptionEvent(BinLogEvent):
 
 
 class StopEvent(BinLogEvent):
-    pass
+    __slots__ = ()
 
 
 class XidEvent(BinLogEvent):
@@ -420,8 +520,10 @@ class XidEvent(BinLogEvent):
     :ivar xid: uint - Transaction ID for 2 Phase Commit.
     """
 
-    def __init__(self, from_packet, event_size, table_map, ctl_connection, **kwargs):
-        super().__init__(from_packet, event_size, table_map, ctl_connection, **kwargs)
+    __slots__ = ("xid",)
+
+    def __init__(self, from_packet, event_size, table_map, context):
+        super().__init__(from_packet, event_size, table_map, context)
         self.xid = struct.unpack("<Q", self.packet.read(8))[0]
 
     def _dump(self):
@@ -453,8 +555,10 @@ class HeartbeatLogEvent(BinLogEvent):
     :ivar ident: Name of the current binlog
     """
 
-    def __init__(self, from_packet, event_size, table_map, ctl_connection, **kwargs):
-        super().__init__(from_packet, event_size, table_map, ctl_connection, **kwargs)
+    __slots__ = ("ident",)
+
+    def __init__(self, from_packet, event_size, table_map, context):
+        super().__init__(from_packet, event_size, table_map, context)
         self.ident = self.packet.read(event_size).decode()
 
     def _dump(self):
@@ -477,8 +581,42 @@ class QueryEvent(BinLogEvent):
     :ivar query: str - The query executed.
     """
 
-    def __init__(self, from_packet, event_size, table_map, ctl_connection, **kwargs):
-        super().__init__(from_packet, event_size, table_map, ctl_connection, **kwargs)
+    __slots__ = (
+        "slave_proxy_id",
+        "execution_time",
+        "schema_length",
+        "error_code",
+        "status_vars_length",
+        "schema",
+        "query",
+        # Status variables
+        "flags2",
+        "sql_mode",
+        "auto_increment_increment",
+        "auto_increment_offset",
+        "character_set_client",
+        "collation_connection",
+        "collation_server",
+        "time_zone",
+        "catalog_nz_code",
+        "lc_time_names_number",
+        "charset_database_number",
+        "table_map_for_update",
+        "user",
+        "host",
+        "mts_accessed_db_names",
+        "microseconds",
+        "explicit_defaults_ts",
+        "ddl_xid",
+        "default_collation_for_utf8mb4_number",
+        "sql_require_primary_key",
+        "default_table_encryption",
+        "hrnow",
+        "xid",
+    )
+
+    def __init__(self, from_packet, event_size, table_map, context):
+        super().__init__(from_packet, event_size, table_map, context)
 
         # Post-header
         self.slave_proxy_id = self.packet.read_uint32()
@@ -605,8 +743,10 @@ class BeginLoadQueryEvent(BinLogEvent):
     :ivar block-data: data block about "LOAD DATA INFILE"
     """
 
-    def __init__(self, from_packet, event_size, table_map, ctl_connection, **kwargs):
-        super().__init__(from_packet, event_size, table_map, ctl_connection, **kwargs)
+    __slots__ = ("file_id", "block_data")
+
+    def __init__(self, from_packet, event_size, table_map, context):
+        super().__init__(from_packet, event_size, table_map, context)
 
         # Payload
         self.file_id = self.packet.read_uint32()
@@ -636,8 +776,20 @@ class ExecuteLoadQueryEvent(BinLogEvent):
     :ivar dup_handling_flags: int - How LOAD DATA INFILE handles duplicated data (0x0: error, 0x1: ignore, 0x2: replace)
     """
 
-    def __init__(self, from_packet, event_size, table_map, ctl_connection, **kwargs):
-        super().__init__(from_packet, event_size, table_map, ctl_connection, **kwargs)
+    __slots__ = (
+        "slave_proxy_id",
+        "execution_time",
+        "schema_length",
+        "error_code",
+        "status_vars_length",
+        "file_id",
+        "start_pos",
+        "end_pos",
+        "dup_handling_flags",
+    )
+
+    def __init__(self, from_packet, event_size, table_map, context):
+        super().__init__(from_packet, event_size, table_map, context)
 
         # Post-header
         self.slave_proxy_id = self.packet.read_uint32()
@@ -675,8 +827,10 @@ class IntvarEvent(BinLogEvent):
     :ivar value: int - The value of the variable
     """
 
-    def __init__(self, from_packet, event_size, table_map, ctl_connection, **kwargs):
-        super().__init__(from_packet, event_size, table_map, ctl_connection, **kwargs)
+    __slots__ = ("type", "value")
+
+    def __init__(self, from_packet, event_size, table_map, context):
+        super().__init__(from_packet, event_size, table_map, context)
 
         # Payload
         self.type = self.packet.read_uint8()
@@ -700,8 +854,10 @@ class RandEvent(BinLogEvent):
     :ivar seed2: int - value for the second seed
     """
 
-    def __init__(self, from_packet, event_size, table_map, ctl_connection, **kwargs):
-        super().__init__(from_packet, event_size, table_map, ctl_connection, **kwargs)
+    __slots__ = ("_seed1", "_seed2")
+
+    def __init__(self, from_packet, event_size, table_map, context):
+        super().__init__(from_packet, event_size, table_map, context)
         # Payload
         self._seed1 = self.packet.read_uint64()
         self._seed2 = self.packet.read_uint64()
@@ -736,9 +892,24 @@ class UserVarEvent(BinLogEvent):
     :ivar flags: int - Extra flags associated with the user variable
     """
 
-    def __init__(self, from_packet, event_size, table_map, ctl_connection, **kwargs):
+    __slots__ = (
+        "name_len",
+        "name",
+        "is_null",
+        "type_to_codes_and_method",
+        "value",
+        "flags",
+        "temp_value_buffer",
+        "type",
+        "charset",
+        "value_len",
+        "precision",
+        "decimals",
+    )
+
+    def __init__(self, from_packet, event_size, table_map, context):
         super(UserVarEvent, self).__init__(
-            from_packet, event_size, table_map, ctl_connection, **kwargs
+            from_packet, event_size, table_map, context
         )
 
         # Payload
@@ -852,8 +1023,10 @@ class MariadbStartEncryptionEvent(BinLogEvent):
         nonce: Nonce (12 random bytes) of current binlog file.
     """
 
-    def __init__(self, from_packet, event_size, table_map, ctl_connection, **kwargs):
-        super().__init__(from_packet, event_size, table_map, ctl_connection, **kwargs)
+    __slots__ = ("schema", "key_version", "nonce")
+
+    def __init__(self, from_packet, event_size, table_map, context):
+        super().__init__(from_packet, event_size, table_map, context)
 
         self.schema = self.packet.read_uint8()
         self.key_version = self.packet.read_uint32()
@@ -875,9 +1048,11 @@ class RowsQueryLogEvent(BinLogEvent):
     :ivar query: str - The executed SQL statement
     """
 
-    def __init__(self, from_packet, event_size, table_map, ctl_connection, **kwargs):
+    __slots__ = ("query",)
+
+    def __init__(self, from_packet, event_size, table_map, context):
         super(RowsQueryLogEvent, self).__init__(
-            from_packet, event_size, table_map, ctl_connection, **kwargs
+            from_packet, event_size, table_map, context
         )
         self.packet.advance(1)
         self.query = self.packet.read_available().decode("utf-8")
@@ -894,6 +1069,8 @@ class NotImplementedEvent(BinLogEvent):
     The event referencing this class skips parsing.
     """
 
-    def __init__(self, from_packet, event_size, table_map, ctl_connection, **kwargs):
-        super().__init__(from_packet, event_size, table_map, ctl_connection, **kwargs)
+    __slots__ = ()
+
+    def __init__(self, from_packet, event_size, table_map, context):
+        super().__init__(from_packet, event_size, table_map, context)
         self.packet.advance(event_size)
@@ -22,3 +22,17 @@ class StatusVariableMismatch(Exception):
                 )
             ),
         )
+
+
+class BadMagicBytesError(Exception):
+    def __init__(self, path, magic):
+        Exception.__init__(
+            self, f"{path} is not a binlog file, its magic bytes are {magic!r}"
+        )
+
+
+class EventSizeTooSmallError(Exception):
+    def __init__(self, path, position):
+        Exception.__init__(
+            self, f"Event at position {position} of {path} is smaller than its header"
+        )
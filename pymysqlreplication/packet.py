@@ -1,3 +1,6 @@
+import collections
+import struct
+
 from pymysqlreplication import constants, event, row_event
 from pymysqlreplication.json_binary import parse_json, JsonDiff, JsonDiffOperation
 from pymysqlreplication.util.bytes import *
@@ -14,12 +17,90 @@ UNSIGNED_SHORT_LENGTH = 2
 UNSIGNED_INT24_LENGTH = 3
 UNSIGNED_INT64_LENGTH = 8
 
+# OK byte + 19 bytes common event header
+HEADER_STRUCT = struct.Struct("<cIBIIIH")
+
+INT8 = struct.Struct("<b")
+INT16 = struct.Struct("<h")
+UINT16 = struct.Struct("<H")
+UINT24 = struct.Struct("<HB")
+INT32 = struct.Struct("<i")
+UINT32 = struct.Struct("<I")
+UINT40 = struct.Struct("<BI")
+UINT48 = struct.Struct("<HHH")
+UINT56 = struct.Struct("<BHI")
+INT64 = struct.Struct("<q")
+UINT64 = struct.Struct("<Q")
+FLOAT = struct.Struct("<f")
+DOUBLE = struct.Struct("<d")
+INT16_BE = struct.Struct(">h")
+UINT24_BE = struct.Struct(">BH")
+INT32_BE = struct.Struct(">i")
+INT40_BE = struct.Struct(">IB")
+INT64_BE = struct.Struct(">q")
+
+
+# Events which body starts with a table id
+ROWS_EVENT_TYPES = frozenset(
+    [
+        BINLOG.WRITE_ROWS_EVENT_V1,
+        BINLOG.UPDATE_ROWS_EVENT_V1,
+        BINLOG.DELETE_ROWS_EVENT_V1,
+        BINLOG.WRITE_ROWS_EVENT_V2,
+        BINLOG.UPDATE_ROWS_EVENT_V2,
+        BINLOG.DELETE_ROWS_EVENT_V2,
+        BINLOG.PARTIAL_UPDATE_ROWS_EVENT,
+    ]
+)
+
+
+class EventHeader(
+    collections.namedtuple(
+        "EventHeader",
+        ["timestamp", "event_type", "server_id", "log_pos", "event_size", "log_file"],
+    )
+):
+    """Common header of an event, returned in place of the event by
+    BinLogStreamReader with skim=True
+
+    :ivar timestamp: int - timestamp of the event
+    :ivar event_type: int - event type code, see constants.BINLOG
+    :ivar server_id: int - server_id of the server which wrote the event
+    :ivar log_pos: int - position of the next event
+    :ivar event_size: int - size of the event, header included
+    :ivar log_file: str - binlog file of the event
+    """
+
+    __slots__ = ()
+
+
+class DetachedPacket(
+    collections.namedtuple(
+        "DetachedPacket",
+        ["timestamp", "event_type", "server_id", "log_pos", "event_size", "read_bytes"],
+    )
+):
+    """Header of the packet of a detached event, in place of its
+    BinLogPacketWrapper and payload. See BinLogEvent.detach()
+
+    :ivar read_bytes: int - number of bytes of the body which were decoded
+    """
+
+    __slots__ = ()
+
+    def detach(self):
+        return self
+
 
 class BinLogPacketWrapper(object):
     """
     Bin Log Packet Wrapper. It uses an existing packet object, and wraps
     around it, exposing useful variables while still providing access
     to the original packet objects variables and methods.
+
+    ignored_table_ids is the set of the ids of the tables which TableMapEvent
+    is filtered out, kept by the stream and filled by the wrappers, so that
+    the next events of these tables are skipped from their header.
     """
 
     __event_map = {
@@ -58,30 +139,15 @@ class BinLogPacketWrapper(object):
         constants.MARIADB_START_ENCRYPTION_EVENT: event.MariadbStartEncryptionEvent,
     }
 
-    def __init__(
-        self,
-        from_packet,
-        table_map,
-        ctl_connection,
-        mysql_version,
-        use_checksum,
-        allowed_events,
-        only_tables,
-        ignored_tables,
-        only_schemas,
-        ignored_schemas,
-        freeze_schema,
-        ignore_decode_errors,
-        verify_checksum,
-        optional_meta_data,
-    ):
-        # -1 because we ignore the ok byte
-        self.read_bytes = 0
-        # Used when we want to override a value in the data buffer
-        self.__data_buffer = b""
-
+    def __init__(self, from_packet, table_map, context, ignored_table_ids=None):
         self.packet = from_packet
-        self.charset = ctl_connection.charset
+        self.charset = context.charset
+
+        # Zero-copy cursor over the packet payload: every read is done at an
+        # integer offset of a single memoryview instead of slicing the bytes.
+        self.__buffer = from_packet._data
+        self.__data = memoryview(self.__buffer)
+        self.__position = from_packet._position
 
         # OK value
         # timestamp
@@ -89,7 +155,9 @@ class BinLogPacketWrapper(object):
         # server_id
         # log_pos
         # flags
-        unpack = struct.unpack("<cIBIIIH", self.packet.read(20))
+        unpack = HEADER_STRUCT.unpack_from(self.__data, self.__position)
+        self.__position += HEADER_STRUCT.size
+        self.__body_start = self.__position
 
         # Header
         self.timestamp = unpack[1]
@@ -101,65 +169,162 @@ class BinLogPacketWrapper(object):
         self.flags = unpack[6]
 
         # MySQL 5.6 and more if binlog-checksum = CRC32
-        if use_checksum:
+        if context.use_checksum:
             event_size_without_header = self.event_size - 23
         else:
-            verify_checksum = False
             event_size_without_header = self.event_size - 19
 
         self.event = None
-        event_class = self.__event_map.get(self.event_type, event.NotImplementedEvent)
-
-        if event_class not in allowed_events:
+        # allowed_events is the frozenset of event_types(), events are
+        # skipped from their header without decoding any of their body
+        if self.event_type not in context.allowed_events:
             return
+        if self.event_type in ROWS_EVENT_TYPES:
+            # Its TableMapEvent was filtered out
+            if self.__peek_table_id() not in table_map:
+                return
+        elif self.event_type == constants.TABLE_MAP_EVENT and ignored_table_ids:
+            if self.__peek_table_id() in ignored_table_ids:
+                return
 
-        self.event = event_class(
-            self,
-            event_size_without_header,
-            table_map,
-            ctl_connection,
-            mysql_version=mysql_version,
-            only_tables=only_tables,
-            ignored_tables=ignored_tables,
-            only_schemas=only_schemas,
-            ignored_schemas=ignored_schemas,
-            freeze_schema=freeze_schema,
-            ignore_decode_errors=ignore_decode_errors,
-            verify_checksum=verify_checksum,
-            optional_meta_data=optional_meta_data,
-        )
+        event_class = self.__event_map.get(self.event_type, event.NotImplementedEvent)
+        self.event = event_class(self, event_size_without_header, table_map, context)
         if not self.event._processed:
+            if (
+                ignored_table_ids is not None
+                and self.event_type == constants.TABLE_MAP_EVENT
+                and self.event.table_id not in table_map
+            ):
+                # Filtered out by only_tables, ignored_schemas...
+                ignored_table_ids.add(self.event.table_id)
             self.event = None
 
+    @classmethod
+    def event_class(cls, event_type):
+        """Return the event class decoding an event type"""
+        return cls.__event_map.get(event_type, event.NotImplementedEvent)
+
+    @classmethod
+    def event_types(cls, event_classes):
+        """Return the frozenset of the event type codes decoded by one of
+        event_classes, to be given as allowed_events
+        """
+        return frozenset(
+            event_type
+            for event_type in range(256)
+            if cls.event_class(event_type) in event_classes
+        )
+
+    def __peek_table_id(self):
+        # Table id of a table map or rows event, 6 bytes little-endian
+        low, high = struct.unpack_from("<IH", self.__data, self.__position)
+        return low | high << 32
+
+    @staticmethod
+    def read_header(from_packet):
+        """Return the timestamp, event_type, server_id, event_size, log_pos
+        and flags of the event of a packet, without reading its body
+        """
+        return HEADER_STRUCT.unpack_from(from_packet._data, from_packet._position)[1:]
+
+    def detach(self):
+        """Return the DetachedPacket of the wrapper"""
+        return DetachedPacket(
+            self.timestamp,
+            self.event_type,
+            self.server_id,
+            self.log_pos,
+            self.event_size,
+            self.read_bytes,
+        )
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # memoryview can not be pickled, it is created again from the buffer
+        del state["_BinLogPacketWrapper__data"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__data = memoryview(self.__buffer)
+
+    @property
+    def read_bytes(self):
+        """Number of bytes of the event body consumed so far"""
+        return self.__position - self.__body_start
+
+    @read_bytes.setter
+    def read_bytes(self, value):
+        self.__position = self.__body_start + value
+
     def read(self, size):
         size = int(size)
-        self.read_bytes += size
-        if len(self.__data_buffer) > 0:
-            data = self.__data_buffer[:size]
-            self.__data_buffer = self.__data_buffer[size:]
-            if len(data) == size:
-                return data
-            else:
-                return data + self.packet.read(size - len(data))
-        return self.packet.read(size)
+        position = self.__position
+        data = self.__buffer[position : position + size]
+        if len(data) != size:
+            raise AssertionError(
+                "Result length not requested length:\n"
+                f"Expected={size}.  Actual={len(data)}.  Position: {position}."
+            )
+        self.__position = position + size
+        return data
+
+    def read_view(self, size):
+        """Read size bytes as a memoryview sharing the packet buffer.
+
+        Unlike read() no bytes object is allocated, use it when the consumer
+        accepts any buffer (struct, str(), zlib...).
+        """
+        size = int(size)
+        position = self.__position
+        view = self.__data[position : position + size]
+        if len(view) != size:
+            raise AssertionError(
+                "Result length not requested length:\n"
+                f"Expected={size}.  Actual={len(view)}.  Position: {position}."
+            )
+        self.__position = position + size
+        return view
 
     def unread(self, data):
         """Push again data in data buffer. It's use when you want
         to extract a bit from a value a let the rest of the code normally
         read the datas"""
-        self.read_bytes -= len(data)
-        self.__data_buffer += data
+        size = len(data)
+        position = self.__position - size
+        if self.__data[position : self.__position] != data:
+            # The pushed back data differs from what was read: switch to a
+            # private writable copy of the payload (slow path).
+            buffer = bytearray(self.__buffer)
+            buffer[position : self.__position] = data
+            self.__buffer = bytes(buffer)
+            self.__data = memoryview(self.__buffer)
+        self.__position = position
 
     def advance(self, size):
         size = int(size)
-        self.read_bytes += size
-        buffer_len = len(self.__data_buffer)
-        if buffer_len > 0:
-            self.__data_buffer = self.__data_buffer[size:]
-            if size > buffer_len:
-                self.packet.advance(size - buffer_len)
-        else:
-            self.packet.advance(size)
+        position = self.__position + size
+        if position < 0 or position > len(self.__data):
+            raise Exception(
+                f"Invalid advance amount ({size}) for cursor.  Position={position}"
+            )
+        self.__position = position
+
+    def rewind(self, position=0):
+        """Set the cursor to an absolute position of the packet payload"""
+        if position < 0 or position > len(self.__data):
+            raise Exception(f"Invalid position to rewind cursor to: {position}.")
+        self.__position = position
+
+    def tell(self):
+        """Return the absolute position of the cursor in the packet payload"""
+        return self.__position
+
+    def get_bytes(self, position, length=1):
+        """Return a zero-copy view of length bytes starting at an absolute
+        position of the packet payload, without moving the cursor.
+        """
+        return self.__data[position : position + length]
 
     def read_length_coded_binary(self):
         """Read a 'Length Coded Binary' number from the data buffer.
@@ -169,17 +334,18 @@ class BinLogPacketWrapper(object):
 
         From PyMYSQL source code
         """
-        c = struct.unpack("!B", self.read(1))[0]
+        c = self.__data[self.__position]
+        self.__position += 1
         if c == NULL_COLUMN:
             return None
         if c < UNSIGNED_CHAR_COLUMN:
             return c
         elif c == UNSIGNED_SHORT_COLUMN:
-            return self.unpack_uint16(self.read(UNSIGNED_SHORT_LENGTH))
+            return self.read_uint16()
         elif c == UNSIGNED_INT24_COLUMN:
-            return self.unpack_int24(self.read(UNSIGNED_INT24_LENGTH))
+            return self.read_uint24()
         elif c == UNSIGNED_INT64_COLUMN:
-            return self.unpack_int64(self.read(UNSIGNED_INT64_LENGTH))
+            return self.read_uint64()
 
     def read_length_coded_string(self):
         """Read a 'Length Coded String' from the data buffer.
@@ -193,7 +359,7 @@ class BinLogPacketWrapper(object):
         length = self.read_length_coded_binary()
         if length is None:
             return None
-        return self.read(length).decode()
+        return str(self.read_view(length), "utf-8")
 
     def __getattr__(self, key):
         if hasattr(self.packet, key):
@@ -201,20 +367,25 @@ class BinLogPacketWrapper(object):
 
         raise AttributeError(f"{self.__class__} instance has no attribute '{key}'")
 
+    def __unpack(self, fmt):
+        value = fmt.unpack_from(self.__data, self.__position)[0]
+        self.__position += fmt.size
+        return value
+
     def read_int_be_by_size(self, size):
         """Read a big endian integer values based on byte number"""
         if size == 1:
-            return struct.unpack(">b", self.read(size))[0]
+            return self.__unpack(INT8)
         elif size == 2:
-            return struct.unpack(">h", self.read(size))[0]
+            return self.__unpack(INT16_BE)
         elif size == 3:
             return self.read_int24_be()
         elif size == 4:
-            return struct.unpack(">i", self.read(size))[0]
+            return self.__unpack(INT32_BE)
         elif size == 5:
             return self.read_int40_be()
         elif size == 8:
-            return struct.unpack(">l", self.read(size))[0]
+            return self.__unpack(INT64_BE)
 
     def read_uint_by_size(self, size):
         """Read a little endian integer values based on byte number"""
@@ -253,65 +424,83 @@ class BinLogPacketWrapper(object):
         length = 0
         bits_read = 0
         while byte & 0x80 != 0:
-            byte = struct.unpack("!B", self.read(1))[0]
+            byte = self.read_uint8()
             length = length | ((byte & 0x7F) << bits_read)
             bits_read = bits_read + 7
         return self.read(length)
 
     def read_int24(self):
-        a, b, c = struct.unpack("BBB", self.read(3))
-        res = a | (b << 8) | (c << 16)
+        low, high = UINT24.unpack_from(self.__data, self.__position)
+        self.__position += 3
+        res = low | (high << 16)
         if res >= 0x800000:
             res -= 0x1000000
         return res
 
     def read_int24_be(self):
-        a, b, c = struct.unpack("BBB", self.read(3))
-        res = (a << 16) | (b << 8) | c
+        high, low = UINT24_BE.unpack_from(self.__data, self.__position)
+        self.__position += 3
+        res = (high << 16) | low
         if res >= 0x800000:
             res -= 0x1000000
         return res
 
+    def read_int8(self):
+        return self.__unpack(INT8)
+
     def read_uint8(self):
-        return struct.unpack("<B", self.read(1))[0]
+        value = self.__data[self.__position]
+        self.__position += 1
+        return value
 
     def read_int16(self):
-        return struct.unpack("<h", self.read(2))[0]
+        return self.__unpack(INT16)
 
     def read_uint16(self):
-        return struct.unpack("<H", self.read(2))[0]
+        return self.__unpack(UINT16)
 
     def read_uint24(self):
-        a, b, c = struct.unpack("<BBB", self.read(3))
-        return a + (b << 8) + (c << 16)
+        low, high = UINT24.unpack_from(self.__data, self.__position)
+        self.__position += 3
+        return low + (high << 16)
 
     def read_uint32(self):
-        return struct.unpack("<I", self.read(4))[0]
+        return self.__unpack(UINT32)
 
     def read_int32(self):
-        return struct.unpack("<i", self.read(4))[0]
+        return self.__unpack(INT32)
 
     def read_uint40(self):
-        a, b = struct.unpack("<BI", self.read(5))
+        a, b = UINT40.unpack_from(self.__data, self.__position)
+        self.__position += 5
         return a + (b << 8)
 
     def read_int40_be(self):
-        a, b = struct.unpack(">IB", self.read(5))
+        a, b = INT40_BE.unpack_from(self.__data, self.__position)
+        self.__position += 5
         return b + (a << 8)
 
     def read_uint48(self):
-        a, b, c = struct.unpack("<HHH", self.read(6))
+        a, b, c = UINT48.unpack_from(self.__data, self.__position)
+        self.__position += 6
         return a + (b << 16) + (c << 32)
 
     def read_uint56(self):
-        a, b, c = struct.unpack("<BHI", self.read(7))
+        a, b, c = UINT56.unpack_from(self.__data, self.__position)
+        self.__position += 7
         return a + (b << 8) + (c << 24)
 
     def read_uint64(self):
-        return struct.unpack("<Q", self.read(8))[0]
+        return self.__unpack(UINT64)
 
     def read_int64(self):
-        return struct.unpack("<q", self.read(8))[0]
+        return self.__unpack(INT64)
+
+    def read_float(self):
+        return self.__unpack(FLOAT)
+
+    def read_double(self):
+        return self.__unpack(DOUBLE)
 
     def unpack_uint16(self, n):
         return struct.unpack("<H", n[0:2])[0]
@@ -374,17 +563,15 @@ class BinLogPacketWrapper(object):
         Returns:
             Binary string parsed from __data_buffer
         """
-        string = b""
-        while True:
-            char = self.read(1)
-            if char == b"\0":
-                break
-            string += char
-
-        return string
+        position = self.__position
+        end = self.__buffer.find(b"\0", position)
+        if end < 0:
+            raise AssertionError(f"Missing NULL terminator. Position: {position}.")
+        self.__position = end + 1
+        return self.__buffer[position:end]
 
     def bytes_to_read(self):
-        return len(self.packet._data) - self.packet._position
+        return len(self.__data) - self.__position
 
     def read_available(self):
-        return self.packet.read(self.bytes_to_read() - BINLOG.BINLOG_CHECKSUM_LEN)
+        return self.read(self.bytes_to_read() - BINLOG.BINLOG_CHECKSUM_LEN)
@@ -0,0 +1,175 @@
+import collections
+import concurrent.futures
+import pickle
+
+from .row_event import RowsEvent
+
+# Number of events read ahead per worker process
+PENDING_EVENTS_PER_PROCESS = 4
+
+
+def decode_rows(data):
+    """Decode the rows of a pickled RowsEvent, run in a worker process"""
+    return pickle.loads(data).rows
+
+
+class RowsDecodingPool(object):
+    """Decode the rows of RowsEvent in a pool of processes
+
+    Events are put in the order they are read from the stream. The rows of
+    RowsEvent are decoded by the worker processes from a pickled copy of the
+    event and its Table, while the other events are ready right away. get()
+    returns the events in their original order: it waits for the rows of the
+    oldest pending event even when newer events are already decoded.
+
+    Only the rows are offloaded: the headers of the events, the
+    TableMapEvent and the other events are still decoded by the stream. A
+    RowsEvent is sent with its whole packet, its Table and the settings of
+    its StreamContext, about 2 KB on top of its rows for a table of ten
+    columns, so the pool pays off for events of many rows or of costly
+    columns (JSON, DECIMAL, temporal types).
+    """
+
+    def __init__(self, processes, max_pending=None):
+        self.__executor = concurrent.futures.ProcessPoolExecutor(processes)
+        self.__max_pending = max_pending or processes * PENDING_EVENTS_PER_PROCESS
+        # (event, future) in stream order
+        self.__pending = collections.deque()
+
+    def __len__(self):
+        return len(self.__pending)
+
+    def put(self, binlog_event):
+        future = None
+        if isinstance(binlog_event, RowsEvent) and binlog_event.complete:
+            # The event is pickled right away so it does not depend on a
+            # table map updated by the next events
+            data = pickle.dumps(binlog_event, pickle.HIGHEST_PROTOCOL)
+            future = self.__executor.submit(decode_rows, data)
+        self.__pending.append((binlog_event, future))
+
+    def is_full(self):
+        return len(self.__pending) >= self.__max_pending
+
+    def is_ready(self):
+        """Return True if get() returns an event without waiting"""
+        if not self.__pending:
+            return False
+        future = self.__pending[0][1]
+        return future is None or future.done()
+
+    def get(self):
+        """Return the oldest pending event, or None if there is none"""
+        if not self.__pending:
+            return None
+        binlog_event, future = self.__pending.popleft()
+        if future is not None:
+            binlog_event._set_rows(future.result())
+        return binlog_event
+
+    def close(self):
+        for _, future in self.__pending:
+            if future is not None:
+                future.cancel()
+        self.__pending.clear()
+        self.__executor.shutdown(wait=False)
+
+
+class TransactionScheduler(object):
+    """Apply transactions in parallel following the MySQL logical clock
+
+        scheduler = TransactionScheduler(
+            TransactionReader(stream), apply, workers=8, on_commit=save_position
+        )
+        scheduler.run()
+
+    Like a multi-threaded replica with replica_parallel_type=LOGICAL_CLOCK,
+    a transaction is started once every transaction whose sequence_number
+    is lower or equal to its last_committed is applied. apply(transaction)
+    runs in the executor, a thread pool of workers threads by default, and
+    on_commit(transaction, result) is called in the calling thread in
+    the binlog order once a transaction and all the previous ones are
+    applied.
+
+    Transactions without logical clock (MariaDB, MySQL before 5.7) are
+    applied one after the other.
+    """
+
+    def __init__(
+        self,
+        transactions,
+        apply,
+        workers=4,
+        executor=None,
+        on_commit=None,
+        max_pending=None,
+    ):
+        self.__transactions = transactions
+        self.__apply = apply
+        self.__on_commit = on_commit
+        self.__own_executor = executor is None
+        if executor is None:
+            executor = concurrent.futures.ThreadPoolExecutor(workers)
+        self.__executor = executor
+        self.__max_pending = max_pending or workers * 2
+        # (transaction, future) in binlog order
+        self.__pending = collections.deque()
+        # All the transactions up to this sequence_number are applied
+        self.__committed_sequence_number = 0
+        self.__last_sequence_number = None
+
+    def run(self):
+        """Apply the transactions until the end of the stream"""
+        try:
+            for transaction in self.__transactions:
+                self.__wait_for_dependencies(transaction)
+                future = self.__executor.submit(self.__apply, transaction)
+                self.__pending.append((transaction, future))
+                self.__last_sequence_number = transaction.sequence_number
+            while self.__pending:
+                self.__wait()
+        finally:
+            if self.__own_executor:
+                self.__executor.shutdown(wait=True)
+
+    def __can_start(self, transaction):
+        if not self.__pending:
+            return True
+        if len(self.__pending) >= self.__max_pending:
+            return False
+        if transaction.last_committed is None or transaction.sequence_number is None:
+            return False
+        if (
+            self.__last_sequence_number is None
+            or transaction.sequence_number <= self.__last_sequence_number
+        ):
+            # The logical clock restarts in each binlog file
+            return False
+        return transaction.last_committed <= self.__committed_sequence_number
+
+    def __wait_for_dependencies(self, transaction):
+        self.__commit()
+        while not self.__can_start(transaction):
+            self.__wait()
+        if (
+            self.__last_sequence_number is not None
+            and transaction.sequence_number is not None
+            and transaction.sequence_number <= self.__last_sequence_number
+        ):
+            self.__committed_sequence_number = 0
+
+    def __wait(self):
+        concurrent.futures.wait(
+            [future for _, future in self.__pending],
+            return_when=concurrent.futures.FIRST_COMPLETED,
+        )
+        self.__commit()
+
+    def __commit(self):
+        while self.__pending and self.__pending[0][1].done():
+            transaction, future = self.__pending.popleft()
+            result = future.result()
+            if transaction.sequence_number is not None:
+                self.__committed_sequence_number = transaction.sequence_number
+            if self.__on_commit is not None:
+                self.__on_commit(transaction, result)
@@ -0,0 +1,89 @@
+import collections
+import threading
+
+
+class PacketPrefetcher(object):
+    """Read the packets of the replication connection in a background thread
+
+    Socket reads release the GIL, so reading the next packets while the
+    consumer thread decodes the current one overlaps network wait and
+    decoding. The packets are kept in a queue bounded by a number of packets
+    (max_packets) and optionally by their total size (max_bytes), the reader
+    thread waits for the consumer when the queue is full.
+
+    The reader thread stops after an EOF packet or an error, errors are
+    raised by get() in the consumer thread.
+    """
+
+    def __init__(self, read_packet, max_packets, max_bytes=None):
+        self.__read_packet = read_packet
+        self.__max_packets = max_packets
+        self.__max_bytes = max_bytes
+        self.__packets = collections.deque()
+        self.__size = 0
+        self.__stopped = False
+        self.__condition = threading.Condition()
+        self.__thread = threading.Thread(
+            target=self.__run, name="pymysqlreplication-prefetch", daemon=True
+        )
+        self.__thread.start()
+
+    @property
+    def queued_packets(self):
+        return len(self.__packets)
+
+    @property
+    def queued_bytes(self):
+        return self.__size
+
+    def __is_full(self):
+        # A packet bigger than max_bytes is still queued alone
+        if not self.__packets:
+            return False
+        if len(self.__packets) >= self.__max_packets:
+            return True
+        return self.__max_bytes is not None and self.__size >= self.__max_bytes
+
+    def __run(self):
+        while True:
+            try:
+                pkt = self.__read_packet()
+                size = len(pkt.get_all_data())
+                last = pkt.is_eof_packet()
+            except Exception as error:
+                pkt, size, last = error, 0, True
+
+            with self.__condition:
+                while self.__is_full() and not self.__stopped:
+                    self.__condition.wait()
+                if self.__stopped:
+                    return
+                self.__packets.append((pkt, size))
+                self.__size += size
+                self.__condition.notify_all()
+
+            if last:
+                return
+
+    def get(self):
+        """Return the next packet, waiting for the reader thread if needed"""
+        with self.__condition:
+            while not self.__packets:
+                self.__condition.wait()
+            pkt, size = self.__packets.popleft()
+            self.__size -= size
+            self.__condition.notify_all()
+        if isinstance(pkt, Exception):
+            raise pkt
+        return pkt
+
+    def stop(self):
+        """Stop the reader thread, it exits at its next packet.
+
+        The caller closes the connection to interrupt a pending read.
+        """
+        with self.__condition:
+            self.__stopped = True
+            self.__packets.clear()
+            self.__size = 0
+            self.__condition.notify_all()
@@ -0,0 +1,136 @@
+from collections.abc import Mapping
+
+from .constants import NONE_SOURCE
+
+
+class Row(Mapping):
+    """A row image decoded with compact_rows=True
+
+    The values are kept in a tuple in column order, the column names are
+    shared by all the rows of a table. A row is a read-only mapping:
+
+        row["id"], row.get("name"), dict(row), row == {"id": 1, ...}
+
+    The columns which are None for another reason than being NULL
+    (MINIMAL row image, out of range date...) have their reason in
+    none_sources, like the "none_sources" of the dict rows. The NULL
+    columns are only kept as a bitmask.
+
+    :ivar positions: dict - position of each column name in the values
+    :ivar values_tuple: tuple - values in column order
+    """
+
+    __slots__ = ("positions", "values_tuple", "_none_mask", "_none_reasons")
+
+    def __init__(self, positions, values, none_mask=0, none_reasons=None):
+        self.positions = positions
+        self.values_tuple = values
+        # Bit i is set if the value i is None
+        self._none_mask = none_mask
+        # Reason of the None values which are not NULL, by position
+        self._none_reasons = none_reasons
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return self.values_tuple[key]
+        return self.values_tuple[self.positions[key]]
+
+    def __iter__(self):
+        return iter(self.positions)
+
+    def __len__(self):
+        return len(self.values_tuple)
+
+    def __contains__(self, key):
+        return key in self.positions
+
+    def __repr__(self):
+        return f"Row({self.to_dict()!r})"
+
+    def __getstate__(self):
+        return (self.positions, self.values_tuple, self._none_mask, self._none_reasons)
+
+    def __setstate__(self, state):
+        (
+            self.positions,
+            self.values_tuple,
+            self._none_mask,
+            self._none_reasons,
+        ) = state
+
+    def to_dict(self):
+        """Return the values as a dict keyed by column name"""
+        return dict(zip(self.positions, self.values_tuple))
+
+    def none_source(self, key):
+        """Return why the value of a column is None, None if it is not"""
+        position = key if isinstance(key, int) else self.positions[key]
+        if not self._none_mask >> position & 1:
+            return None
+        if self._none_reasons and position in self._none_reasons:
+            return self._none_reasons[position]
+        return NONE_SOURCE.NULL
+
+    @property
+    def none_sources(self):
+        """Dict of the columns whose value is None and why"""
+        result = {}
+        mask = self._none_mask
+        for name, position in self.positions.items():
+            if mask >> position & 1:
+                result[name] = self.none_source(position)
+        return result
+
+
+class RawRow(Mapping):
+    """A row image kept as the bytes of the rows event, see
+    RowsEvent.iter_raw_rows
+
+    No value is decoded: the mapping gives the image of each column as in
+    the binlog, with the length prefix of the variable width columns, or
+    None for NULL and the columns missing from a MINIMAL row image.
+
+        row["id"]              # b"\x05\x00\x00\x00"
+        hash(row.data)         # whole row image
+
+    :ivar positions: dict - index of each column of the table in offsets
+    :ivar data: bytes - the null bitmap followed by the column images
+    :ivar offsets: tuple - (start, end) of each column image in data, None
+        for NULL and missing columns
+    :ivar partial_bitmap: bytes - for the after image of a
+        PARTIAL_UPDATE_ROWS_EVENT, the bitmap of the JSON columns
+        holding a JSON diff, else None
+    """
+
+    __slots__ = ("positions", "data", "offsets", "partial_bitmap")
+
+    def __init__(self, positions, data, offsets, partial_bitmap=None):
+        self.positions = positions
+        self.data = data
+        self.offsets = offsets
+        self.partial_bitmap = partial_bitmap
+
+    def __getitem__(self, key):
+        position = key if isinstance(key, int) else self.positions[key]
+        offset = self.offsets[position]
+        if offset is None:
+            return None
+        return self.data[offset[0] : offset[1]]
+
+    def __iter__(self):
+        return iter(self.positions)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __contains__(self, key):
+        return key in self.positions
+
+    def __repr__(self):
+        return f"RawRow({self.data!r})"
+
+    def __getstate__(self):
+        return (self.positions, self.data, self.offsets, self.partial_bitmap)
+
+    def __setstate__(self, state):
+        self.positions, self.data, self.offsets, self.partial_bitmap = state
@@ -0,0 +1,887 @@
+import codecs
+import datetime
+import operator
+import struct
+
+from pymysql.charset import charset_by_name
+
+from .constants import FIELD_TYPE
+from .constants import NONE_SOURCE
+from .bitmap import BitCount, BitGet
+from .row import RawRow, Row
+from .util.bytes import parse_decimal_from_bytes
+
+# Above this number of distinct columns-present bitmaps (binlog_row_image =
+# MINIMAL) the cached row plans of a decoder are dropped
+MAX_CACHED_PLANS = 64
+
+# struct format of the column types unpacked in bulk by FixedRowLayout,
+# (signed, unsigned)
+STRUCT_CODES = {
+    FIELD_TYPE.TINY: ("b", "B"),
+    FIELD_TYPE.SHORT: ("h", "H"),
+    FIELD_TYPE.LONG: ("i", "I"),
+    FIELD_TYPE.LONGLONG: ("q", "Q"),
+    FIELD_TYPE.FLOAT: ("f", "f"),
+    FIELD_TYPE.DOUBLE: ("d", "d"),
+    FIELD_TYPE.YEAR: ("B", "B"),
+}
+
+
+def charset_to_encoding(name):
+    charset = charset_by_name(name)
+    return charset.encoding if charset else name
+
+
+class RowDecoder(object):
+    """Decode the row images of one table.
+
+    The per column readers are resolved once from the Column metadata, so
+    decoding a row is a loop over precomputed callables without any type
+    dispatch. A decoder is built once per table structure and cached on the
+    Table objects of the table map (see Table.get_row_decoder).
+
+    Columns excluded by only_columns / ignored_columns are not decoded, the
+    cursor is moved past their value and they are left out of the rows.
+    """
+
+    def __init__(
+        self,
+        columns,
+        ignore_decode_errors=False,
+        only_columns=None,
+        ignored_columns=None,
+    ):
+        self.columns = columns
+        self.ignore_decode_errors = ignore_decode_errors
+        self.only_columns = _to_frozenset(only_columns)
+        self.ignored_columns = _to_frozenset(ignored_columns)
+        self.names = []
+        self.readers = []
+        for i, column in enumerate(columns):
+            name = column.name
+            if not name:
+                # If you are using mysql 5.7 or mysql 8, but binlog_row_metadata = "MINIMAL",
+                # we do not know the column information.
+                # If you know column information,
+                # mysql 5.7 version Users Use Under 1.0 version
+                # mysql 8.0 version Users Set binlog_row_metadata = "FULL"
+                name = "UNKNOWN_COL" + str(i)
+            self.names.append(name)
+            if self.is_decoded(name):
+                self.readers.append(build_reader(column, ignore_decode_errors))
+            else:
+                self.readers.append((build_skipper(column), None))
+        self.json_column_count = sum(
+            1 for column in columns if column.type == FIELD_TYPE.JSON
+        )
+        # Position of the decoded columns in a Row, shared by its rows
+        self.positions = {}
+        for name in self.names:
+            if self.is_decoded(name):
+                self.positions[name] = len(self.positions)
+        # Index of every column of the table in a RawRow
+        self.column_indexes = {name: i for i, name in enumerate(self.names)}
+        self.__plans = {}
+        self.__raw_plans = {}
+        self.__filter_plans = {}
+        self.__layouts = {}
+
+    def is_decoded(self, name):
+        """Return True if the column is part of the decoded rows"""
+        if self.only_columns is not None and name not in self.only_columns:
+            return False
+        if self.ignored_columns is not None and name in self.ignored_columns:
+            return False
+        return True
+
+    def has_options(self, ignore_decode_errors, only_columns, ignored_columns):
+        """Return True if the decoder was built with these options"""
+        return (
+            self.ignore_decode_errors == ignore_decode_errors
+            and self.only_columns == _to_frozenset(only_columns)
+            and self.ignored_columns == _to_frozenset(ignored_columns)
+        )
+
+    def _plan(self, cols_bitmap):
+        """Return the decoding plan of the columns present in cols_bitmap.
+
+        Each entry is (name, read, none_source, null_index, json_index,
+        read_partial): null_index is the position of the column in the row
+        null bitmap, or None when the column is not part of the row image.
+        The name of a column which is not decoded is None and read skips
+        its value.
+        """
+        cols_bitmap = bytes(cols_bitmap)
+        plan = self.__plans.get(cols_bitmap)
+        if plan is not None:
+            return plan
+
+        entries = []
+        null_index = 0
+        json_index = 0
+        for i, column in enumerate(self.columns):
+            read, none_source = self.readers[i]
+            name = self.names[i]
+            present = BitGet(cols_bitmap, i) != 0
+            if not self.is_decoded(name):
+                if present:
+                    entries.append((None, read, None, null_index, None, None))
+            elif not present:
+                entries.append((name, None, None, None, None, None))
+            elif column.type == FIELD_TYPE.JSON:
+                entries.append(
+                    (
+                        name,
+                        read,
+                        none_source,
+                        null_index,
+                        json_index,
+                        _partial_json_reader(column),
+                    )
+                )
+            else:
+                entries.append((name, read, none_source, null_index, None, None))
+            if present:
+                null_index += 1
+            if column.type == FIELD_TYPE.JSON:
+                json_index += 1
+
+        # null bitmap length = (bits set in 'columns-present-bitmap'+7)/8
+        # See http://dev.mysql.com/doc/internals/en/rows-event.html
+        plan = (tuple(entries), (BitCount(cols_bitmap) + 7) // 8)
+        if len(self.__plans) >= MAX_CACHED_PLANS:
+            self.__plans.clear()
+        self.__plans[cols_bitmap] = plan
+        return plan
+
+    def fixed_layout(self, cols_bitmaps):
+        """Return the FixedRowLayout of the rows made of one image per
+        columns-present bitmap, or None when the rows can not be unpacked
+        in bulk.
+        """
+        cols_bitmaps = tuple(bytes(cols_bitmap) for cols_bitmap in cols_bitmaps)
+        if cols_bitmaps in self.__layouts:
+            return self.__layouts[cols_bitmaps]
+        layout = None
+        if all(
+            BitGet(cols_bitmap, i)
+            for cols_bitmap in cols_bitmaps
+            for i in range(len(self.columns))
+        ) and all(column.type in STRUCT_CODES for column in self.columns):
+            layout = FixedRowLayout(self, len(cols_bitmaps))
+        if len(self.__layouts) >= MAX_CACHED_PLANS:
+            self.__layouts.clear()
+        self.__layouts[cols_bitmaps] = layout
+        return layout
+
+    def make_image(self, values, compact=False):
+        """Return the row image of a tuple of the decoded values"""
+        if compact:
+            return Row(self.positions, values)
+        return dict(zip(self.positions, values))
+
+    def _raw_plan(self, cols_bitmap):
+        """Return the (null_index, skip) of each column, null_index is None
+        when the column is not part of the row image.
+        """
+        cols_bitmap = bytes(cols_bitmap)
+        plan = self.__raw_plans.get(cols_bitmap)
+        if plan is not None:
+            return plan
+
+        entries = []
+        null_index = 0
+        for i, column in enumerate(self.columns):
+            if BitGet(cols_bitmap, i):
+                entries.append((null_index, build_skipper(column)))
+                null_index += 1
+            else:
+                entries.append((None, None))
+        plan = (tuple(entries), (BitCount(cols_bitmap) + 7) // 8)
+        if len(self.__raw_plans) >= MAX_CACHED_PLANS:
+            self.__raw_plans.clear()
+        self.__raw_plans[cols_bitmap] = plan
+        return plan
+
+    def _filter_plan(self, cols_bitmap, columns):
+        """Return the decoding plan of a RowFilter on the columns.
+
+        Each entry is (null_index, read, arg_index, json_index,
+        read_partial) for a column of the row image: read skips the value
+        when arg_index, the position of the column in the filter, is None.
+        """
+        key = (bytes(cols_bitmap), columns)
+        plan = self.__filter_plans.get(key)
+        if plan is not None:
+            return plan
+
+        arg_indexes = {name: i for i, name in enumerate(columns)}
+        entries = []
+        null_index = 0
+        json_index = 0
+        for i, column in enumerate(self.columns):
+            is_json = column.type == FIELD_TYPE.JSON
+            if BitGet(cols_bitmap, i):
+                arg_index = arg_indexes.get(self.names[i])
+                if arg_index is None:
+                    entries.append(
+                        (null_index, build_skipper(column), None, None, None)
+                    )
+                else:
+                    entries.append(
+                        (
+                            null_index,
+                            build_reader(column, self.ignore_decode_errors)[0],
+                            arg_index,
+                            json_index if is_json else None,
+                            _partial_json_reader(column) if is_json else None,
+                        )
+                    )
+                null_index += 1
+            if is_json:
+                json_index += 1
+        plan = (tuple(entries), (BitCount(cols_bitmap) + 7) // 8)
+        if len(self.__filter_plans) >= MAX_CACHED_PLANS:
+            self.__filter_plans.clear()
+        self.__filter_plans[key] = plan
+        return plan
+
+    def filter_row(self, packet, cols_bitmap, row_filter, partial_bitmap=None):
+        """Move the cursor past one row image and return True if it
+        matches the RowFilter. Only the columns of the filter are decoded.
+        """
+        entries, null_bitmap_size = self._filter_plan(cols_bitmap, row_filter.columns)
+        null_bitmap = packet.read(null_bitmap_size)
+        values = [None] * len(row_filter.columns)
+        for null_index, read, arg_index, json_index, read_partial in entries:
+            if null_bitmap[null_index >> 3] & (1 << (null_index & 7)):
+                continue
+            if arg_index is None:
+                read(packet)
+            elif (
+                json_index is not None
+                and partial_bitmap is not None
+                and BitGet(partial_bitmap, json_index)
+            ):
+                values[arg_index] = read_partial(packet)
+            else:
+                values[arg_index] = read(packet)
+        return row_filter(*values)
+
+    def read_raw_row(self, packet, cols_bitmap, partial_bitmap=None):
+        """Move the cursor past one row image and return it as a RawRow,
+        the value of each column is skipped by its size without being
+        decoded.
+        """
+        entries, null_bitmap_size = self._raw_plan(cols_bitmap)
+        start = packet.tell()
+        null_bitmap = packet.read(null_bitmap_size)
+        offsets = []
+        for null_index, skip in entries:
+            if null_index is None or null_bitmap[null_index >> 3] & (
+                1 << (null_index & 7)
+            ):
+                offsets.append(None)
+                continue
+            value_start = packet.tell() - start
+            skip(packet)
+            offsets.append((value_start, packet.tell() - start))
+        data = bytes(packet.get_bytes(start, packet.tell() - start))
+        return RawRow(self.column_indexes, data, tuple(offsets), partial_bitmap)
+
+    def read_row(self, packet, cols_bitmap, partial_bitmap=None):
+        """Decode one row image from the packet cursor.
+
+        Return a (values, none_sources) tuple of dicts keyed by column name.
+        """
+        entries, null_bitmap_size = self._plan(cols_bitmap)
+        null_bitmap = packet.read(null_bitmap_size)
+        values = {}
+        none_sources = {}
+        for name, read, none_source, null_index, json_index, read_partial in entries:
+            if null_index is None:
+                # This block is only executed when binlog_row_image = MINIMAL.
+                # When binlog_row_image = FULL, this block does not execute.
+                values[name] = None
+                none_sources[name] = NONE_SOURCE.COLS_BITMAP
+                continue
+            if null_bitmap[null_index >> 3] & (1 << (null_index & 7)):
+                if name is not None:
+                    values[name] = None
+                    none_sources[name] = NONE_SOURCE.NULL
+                continue
+            if name is None:
+                read(packet)
+                continue
+            if (
+                json_index is not None
+                and partial_bitmap is not None
+                and BitGet(partial_bitmap, json_index)
+            ):
+                value = read_partial(packet)
+                if value is None:
+                    none_sources[name] = NONE_SOURCE.JSON_PARTIAL_UPDATE
+            else:
+                value = read(packet)
+                if value is None:
+                    none_sources[name] = none_source
+            values[name] = value
+        return values, none_sources
+
+    def read_compact_row(self, packet, cols_bitmap, partial_bitmap=None):
+        """Decode one row image from the packet cursor to a Row"""
+        entries, null_bitmap_size = self._plan(cols_bitmap)
+        null_bitmap = packet.read(null_bitmap_size)
+        values = []
+        none_mask = 0
+        none_reasons = None
+        for name, read, none_source, null_index, json_index, read_partial in entries:
+            if null_index is None:
+                value = None
+                none_source = NONE_SOURCE.COLS_BITMAP
+            elif null_bitmap[null_index >> 3] & (1 << (null_index & 7)):
+                if name is None:
+                    continue
+                value = None
+                none_source = NONE_SOURCE.NULL
+            elif name is None:
+                read(packet)
+                continue
+            elif (
+                json_index is not None
+                and partial_bitmap is not None
+                and BitGet(partial_bitmap, json_index)
+            ):
+                value = read_partial(packet)
+                none_source = NONE_SOURCE.JSON_PARTIAL_UPDATE
+            else:
+                value = read(packet)
+            if value is None:
+                position = len(values)
+                none_mask |= 1 << position
+                if none_source != NONE_SOURCE.NULL:
+                    if none_reasons is None:
+                        none_reasons = {}
+                    none_reasons[position] = none_source
+            values.append(value)
+        return Row(self.positions, tuple(values), none_mask, none_reasons)
+
+
+class FixedRowLayout(object):
+    """struct layout of the rows of a table made of fixed width numbers
+
+    When every column of a full row image is a TINY, SHORT, LONG,
+    LONGLONG, FLOAT, DOUBLE or YEAR, a row without NULL values always has
+    the same size and the rows of an event are unpacked together with
+    struct.iter_unpack instead of value by value.
+
+    :ivar size: int - size of a row, all images included
+    """
+
+    def __init__(self, decoder, image_count):
+        column_count = len(decoder.columns)
+        null_bitmap_size = (column_count + 7) // 8
+        formats = []
+        year_positions = []
+        for name, column in zip(decoder.names, decoder.columns):
+            if not decoder.is_decoded(name):
+                formats.append(f"{fixed_size(column)}x")
+                continue
+            if column.type == FIELD_TYPE.YEAR:
+                year_positions.append(decoder.positions[name])
+            formats.append(STRUCT_CODES[column.type][column.unsigned])
+        # The last byte of the null bitmap is read apart: the server sets
+        # its padding bits
+        image_format = f"{null_bitmap_size - 1}sB" + "".join(formats)
+        self.__struct = struct.Struct("<" + image_format * image_count)
+        self.size = self.__struct.size
+        self.__image_count = image_count
+        self.__value_count = len(decoder.positions)
+        self.__year_positions = year_positions
+        self.__no_null = bytes(null_bitmap_size - 1)
+        self.__null_mask = (1 << (column_count % 8 or 8)) - 1
+
+    def iter_unpack(self, data):
+        """Yield a tuple of the values of each image for the rows of data,
+        which must be a multiple of size. Stop before the first row with a
+        NULL value.
+        """
+        step = self.__value_count + 2
+        no_null = self.__no_null
+        null_mask = self.__null_mask
+        year_positions = self.__year_positions
+        for record in self.__struct.iter_unpack(data):
+            images = []
+            for start in range(0, step * self.__image_count, step):
+                if record[start] != no_null or record[start + 1] & null_mask:
+                    return
+                values = record[start + 2 : start + step]
+                if year_positions:
+                    values = list(values)
+                    for position in year_positions:
+                        values[position] += 1900
+                    values = tuple(values)
+                images.append(values)
+            yield images
+
+
+def _to_frozenset(names):
+    return None if names is None else frozenset(names)
+
+
+def _partial_json_reader(column):
+    length_size = column.length_size
+
+    def read(packet):
+        return packet.read_binary_json(length_size, True)
+
+    return read
+
+
+# On-wire size of the fixed width column types
+FIXED_SIZES = {
+    FIELD_TYPE.TINY: 1,
+    FIELD_TYPE.SHORT: 2,
+    FIELD_TYPE.INT24: 3,
+    FIELD_TYPE.LONG: 4,
+    FIELD_TYPE.LONGLONG: 8,
+    FIELD_TYPE.FLOAT: 4,
+    FIELD_TYPE.DOUBLE: 8,
+    FIELD_TYPE.YEAR: 1,
+    FIELD_TYPE.DATE: 3,
+    FIELD_TYPE.TIME: 3,
+    FIELD_TYPE.DATETIME: 8,
+    FIELD_TYPE.TIMESTAMP: 4,
+    FIELD_TYPE.TIME2: 3,
+    FIELD_TYPE.TIMESTAMP2: 4,
+    FIELD_TYPE.DATETIME2: 5,
+}
+
+
+def fixed_size(column):
+    """Return the on-wire size of a column value, or None when the value
+    is prefixed by its length.
+    """
+    column_type = column.type
+    if column_type in FIXED_SIZES:
+        size = FIXED_SIZES[column_type]
+        if column_type in (
+            FIELD_TYPE.TIME2,
+            FIELD_TYPE.TIMESTAMP2,
+            FIELD_TYPE.DATETIME2,
+        ):
+            size += fsp_size(column)
+        return size
+    elif column_type == FIELD_TYPE.NEWDECIMAL:
+        return decimal_size(column)
+    elif column_type == FIELD_TYPE.ENUM or column_type == FIELD_TYPE.SET:
+        return column.size
+    elif column_type == FIELD_TYPE.BIT:
+        return column.bytes
+    return None
+
+
+def length_prefix_size(column):
+    """Return the size of the length prefix of a variable width column"""
+    column_type = column.type
+    if column_type == FIELD_TYPE.VARCHAR or column_type == FIELD_TYPE.STRING:
+        return 2 if column.max_length > 255 else 1
+    elif (
+        column_type == FIELD_TYPE.BLOB
+        or column_type == FIELD_TYPE.GEOMETRY
+        or column_type == FIELD_TYPE.JSON
+    ):
+        return column.length_size
+    raise NotImplementedError(f"Unknown MySQL column type: {column_type}")
+
+
+def build_skipper(column):
+    """Return a skip(packet) callable moving the cursor past one value of
+    the column without decoding it.
+    """
+    size = fixed_size(column)
+    if size is not None:
+
+        def skip(packet):
+            packet.advance(size)
+
+    else:
+        prefix_size = length_prefix_size(column)
+
+        def skip(packet):
+            packet.advance(packet.read_uint_by_size(prefix_size))
+
+    return skip
+
+
+def build_reader(column, ignore_decode_errors=False):
+    """Return a (read, none_source) tuple for a column.
+
+    read(packet) decodes one value of the column at the packet cursor and
+    none_source is the reason reported when it returns None.
+    """
+    none_source = NONE_SOURCE.NULL
+    column_type = column.type
+    unsigned = column.unsigned
+
+    if column_type == FIELD_TYPE.TINY:
+        read = operator.methodcaller("read_uint8" if unsigned else "read_int8")
+    elif column_type == FIELD_TYPE.SHORT:
+        read = operator.methodcaller("read_uint16" if unsigned else "read_int16")
+    elif column_type == FIELD_TYPE.LONG:
+        read = operator.methodcaller("read_uint32" if unsigned else "read_int32")
+    elif column_type == FIELD_TYPE.INT24:
+        read = operator.methodcaller("read_uint24" if unsigned else "read_int24")
+    elif column_type == FIELD_TYPE.FLOAT:
+        read = operator.methodcaller("read_float")
+    elif column_type == FIELD_TYPE.DOUBLE:
+        read = operator.methodcaller("read_double")
+    elif column_type == FIELD_TYPE.VARCHAR or column_type == FIELD_TYPE.STRING:
+        read = _string_reader(length_prefix_size(column), column, ignore_decode_errors)
+    elif column_type == FIELD_TYPE.NEWDECIMAL:
+        read = _decimal_reader(column)
+    elif column_type == FIELD_TYPE.BLOB:
+        read = _string_reader(column.length_size, column, ignore_decode_errors)
+    elif column_type == FIELD_TYPE.DATETIME:
+        read = _read_datetime
+        none_source = NONE_SOURCE.OUT_OF_DATETIME_RANGE
+    elif column_type == FIELD_TYPE.TIME:
+        read = _read_time
+    elif column_type == FIELD_TYPE.DATE:
+        read = _read_date
+        none_source = NONE_SOURCE.OUT_OF_DATE_RANGE
+    elif column_type == FIELD_TYPE.TIMESTAMP:
+
+        def read(packet):
+            return datetime.datetime.utcfromtimestamp(packet.read_uint32())
+
+    # For new date format:
+    elif column_type == FIELD_TYPE.DATETIME2:
+        read = _datetime2_reader(column)
+        none_source = NONE_SOURCE.OUT_OF_DATETIME2_RANGE
+    elif column_type == FIELD_TYPE.TIME2:
+        read = _time2_reader(column)
+    elif column_type == FIELD_TYPE.TIMESTAMP2:
+        read = _timestamp2_reader(column)
+    elif column_type == FIELD_TYPE.LONGLONG:
+        read = operator.methodcaller("read_uint64" if unsigned else "read_int64")
+    elif column_type == FIELD_TYPE.YEAR:
+
+        def read(packet):
+            return packet.read_uint8() + 1900
+
+    elif column_type == FIELD_TYPE.ENUM:
+        read = _enum_reader(column)
+    elif column_type == FIELD_TYPE.SET:
+        read = _set_reader(column)
+        none_source = NONE_SOURCE.EMPTY_SET
+    elif column_type == FIELD_TYPE.BIT:
+        read = _bit_reader(column)
+    elif column_type == FIELD_TYPE.GEOMETRY:
+        length_size = column.length_size
+
+        def read(packet):
+            return packet.read_length_coded_pascal_string(length_size)
+
+    elif column_type == FIELD_TYPE.JSON:
+        length_size = column.length_size
+
+        def read(packet):
+            return packet.read_binary_json(length_size, False)
+
+    else:
+        raise NotImplementedError(f"Unknown MySQL column type: {column_type}")
+
+    return read, none_source
+
+
+def _string_reader(size, column, ignore_decode_errors):
+    decode_errors = "ignore" if ignore_decode_errors else "strict"
+    encoding = "utf-8"
+    if column.character_set_name is not None:
+        encoding = charset_to_encoding(column.character_set_name)
+        try:
+            codecs.lookup(encoding)
+        except LookupError:
+            # python does not support Mysql encoding type ex)swe7 it will not decoding then Show origin string
+            def read_raw(packet):
+                return packet.read_length_coded_pascal_string(size)
+
+            return read_raw
+    # MYSQL 5.xx Version has no character set information,
+    # we don't know encoding type So apply Default Utf-8
+
+    def read(packet):
+        length = packet.read_uint_by_size(size)
+        return str(packet.read_view(length), encoding, decode_errors)
+
+    return read
+
+
+def decimal_size(column):
+    """Number of bytes of a NEWDECIMAL value"""
+
+    # This project was a great source of inspiration for
+    # understanding this storage format.
+    # https://github.com/jeremycole/mysql_binlog
+
+    digits_per_integer = 9
+    compressed_bytes = [0, 1, 1, 2, 2, 3, 3, 4, 4, 4]
+    integral = column.precision - column.decimals
+    uncomp_integral, comp_integral = divmod(integral, digits_per_integer)
+    uncomp_fractional, comp_fractional = divmod(column.decimals, digits_per_integer)
+    return (
+        compressed_bytes[comp_integral]
+        + (uncomp_integral + uncomp_fractional) * 4
+        + compressed_bytes[comp_fractional]
+    )
+
+
+def _decimal_reader(column):
+    """Read MySQL's new decimal format introduced in MySQL 5"""
+    size = decimal_size(column)
+    precision = column.precision
+    decimals = column.decimals
+
+    def read(packet):
+        return parse_decimal_from_bytes(packet.read(size), precision, decimals)
+
+    return read
+
+
+def fsp_size(column):
+    """Number of bytes used to store the fractional seconds of a column"""
+    fsp = column.fsp
+    if fsp == 1 or fsp == 2:
+        return 1
+    elif fsp == 3 or fsp == 4:
+        return 2
+    elif fsp == 5 or fsp == 6:
+        return 3
+    return 0
+
+
+def _fsp_reader(column):
+    """Read the fractional part of time
+    For more details about new date format:
+    http://dev.mysql.com/doc/internals/en/date-and-time-data-type-representation.html
+    """
+    size = fsp_size(column)
+    fsp = column.fsp
+    if size == 0:
+        return None
+
+    def read_fsp(packet):
+        microsecond = packet.read_int_be_by_size(size)
+        if fsp % 2:
+            microsecond = int(microsecond / 10)
+        return microsecond * (10 ** (6 - fsp))
+
+    return read_fsp
+
+
+def _read_binary_slice(binary, start, size, data_length):
+    """
+    Read a part of binary data and extract a number
+    binary: the data
+    start: From which bit (1 to X)
+    size: How many bits should be read
+    data_length: data size
+    """
+    binary = binary >> data_length - (start + size)
+    mask = (1 << size) - 1
+    return binary & mask
+
+
+def _timestamp2_reader(column):
+    read_fsp = _fsp_reader(column)
+
+    def read(packet):
+        time = datetime.datetime.utcfromtimestamp(packet.read_int_be_by_size(4))
+        if read_fsp is not None:
+            microsecond = read_fsp(packet)
+            if microsecond > 0:
+                time = time.replace(microsecond=microsecond)
+        return time
+
+    return read
+
+
+def _datetime2_reader(column):
+    """DATETIME
+
+    1 bit  sign           (1= non-negative, 0= negative)
+    17 bits year*13+month  (year 0-9999, month 0-12)
+     5 bits day            (0-31)
+     5 bits hour           (0-23)
+     6 bits minute         (0-59)
+     6 bits second         (0-59)
+    ---------------------------
+    40 bits = 5 bytes
+    """
+    read_fsp = _fsp_reader(column)
+
+    def read(packet):
+        data = packet.read_int_be_by_size(5)
+        year_month = _read_binary_slice(data, 1, 17, 40)
+        try:
+            t = datetime.datetime(
+                year=int(year_month / 13),
+                month=year_month % 13,
+                day=_read_binary_slice(data, 18, 5, 40),
+                hour=_read_binary_slice(data, 23, 5, 40),
+                minute=_read_binary_slice(data, 28, 6, 40),
+                second=_read_binary_slice(data, 34, 6, 40),
+            )
+        except ValueError:
+            if read_fsp is not None:
+                read_fsp(packet)
+            return None
+        if read_fsp is not None:
+            microsecond = read_fsp(packet)
+            if microsecond > 0:
+                t = t.replace(microsecond=microsecond)
+        return t
+
+    return read
+
+
+def _time2_reader(column):
+    """TIME encoding for nonfractional part:
+
+     1 bit sign    (1= non-negative, 0= negative)
+     1 bit unused  (reserved for future extensions)
+    10 bits hour   (0-838)
+     6 bits minute (0-59)
+     6 bits second (0-59)
+    ---------------------
+    24 bits = 3 bytes
+    """
+    read_fsp = _fsp_reader(column)
+
+    def read(packet):
+        data = packet.read_int_be_by_size(3)
+
+        sign = 1 if _read_binary_slice(data, 0, 1, 24) else -1
+        if sign == -1:
+            # negative integers are stored as 2's compliment
+            # hence take 2's compliment again to get the right value.
+            data = ~data + 1
+
+        return (
+            datetime.timedelta(
+                hours=_read_binary_slice(data, 2, 10, 24),
+                minutes=_read_binary_slice(data, 12, 6, 24),
+                seconds=_read_binary_slice(data, 18, 6, 24),
+                microseconds=read_fsp(packet) if read_fsp is not None else 0,
+            )
+            * sign
+        )
+
+    return read
+
+
+def _read_time(packet):
+    time = packet.read_uint24()
+    return datetime.timedelta(
+        hours=int(time / 10000),
+        minutes=int((time % 10000) / 100),
+        seconds=int(time % 100),
+    )
+
+
+def _read_date(packet):
+    time = packet.read_uint24()
+    if time == 0:  # nasty mysql 0000-00-00 dates
+        return None
+
+    year = (time & ((1 << 15) - 1) << 9) >> 9
+    month = (time & ((1 << 4) - 1) << 5) >> 5
+    day = time & ((1 << 5) - 1)
+    if year == 0 or month == 0 or day == 0:
+        return None
+
+    return datetime.date(year=year, month=month, day=day)
+
+
+def _read_datetime(packet):
+    value = packet.read_uint64()
+    if value == 0:  # nasty mysql 0000-00-00 dates
+        return None
+
+    date = value / 1000000
+    time = int(value % 1000000)
+
+    year = int(date / 10000)
+    month = int((date % 10000) / 100)
+    day = int(date % 100)
+    if year == 0 or month == 0 or day == 0:
+        return None
+
+    return datetime.datetime(
+        year=year,
+        month=month,
+        day=day,
+        hour=int(time / 10000),
+        minute=int((time % 10000) / 100),
+        second=int(time % 100),
+    )
+
+
+def _enum_reader(column):
+    size = column.size
+    enum_values = column.enum_values
+
+    def read(packet):
+        index = packet.read_uint_by_size(size)
+        if enum_values:
+            return enum_values[index]
+        return None
+
+    return read
+
+
+def _set_reader(column):
+    size = column.size
+    set_values = column.set_values
+
+    def read(packet):
+        bit_mask = packet.read_uint_by_size(size)
+        if set_values:
+            ret = {val for idx, val in enumerate(set_values) if bit_mask & (1 << idx)}
+            if ret:
+                return ret
+        return None
+
+    return read
+
+
+def _bit_reader(column):
+    """Read MySQL BIT type"""
+    nb_bytes = column.bytes
+    bits = column.bits
+
+    def read(packet):
+        resp = ""
+        for byte in range(0, nb_bytes):
+            current_byte = ""
+            data = packet.read_uint8()
+            if byte == 0:
+                if nb_bytes == 1:
+                    end = bits
+                else:
+                    end = bits % 8
+                    if end == 0:
+                        end = 8
+            else:
+                end = 8
+            for bit in range(0, end):
+                if data & (1 << bit):
+                    current_byte += "1"
+                else:
+                    current_byte += "0"
+            resp += current_byte[::-1]
+        return resp
+
+    return read
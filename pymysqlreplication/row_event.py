@@ -1,29 +1,51 @@
 import struct
-import decimal
-import datetime
 
-from pymysql.charset import charset_by_name
 from enum import Enum
 
 from .event import BinLogEvent
 from .constants import FIELD_TYPE
 from .constants import BINLOG
 from .constants import CHARSET
-from .constants import NONE_SOURCE
 from .column import Column
 from .table import Table
-from .bitmap import BitCount, BitGet
+from .row_decoder import charset_to_encoding
 
 
 class RowsEvent(BinLogEvent):
-    def __init__(self, from_packet, event_size, table_map, ctl_connection, **kwargs):
-        super().__init__(from_packet, event_size, table_map, ctl_connection, **kwargs)
+    __slots__ = (
+        "__rows",
+        "__rows_position",
+        "__none_sources",
+        "__row_decoder",
+        "__only_columns",
+        "__ignored_columns",
+        "__row_filter",
+        "table_id",
+        "primary_key",
+        "schema",
+        "table",
+        "flags",
+        "extra_data_length",
+        "extra_data_type",
+        "nbd_info_length",
+        "nbd_info_format",
+        "nbd_info",
+        "partition_id",
+        "source_partition_id",
+        "extra_data",
+        "number_of_columns",
+        "columns",
+        "is_partial_json_update",
+    )
+
+    def __init__(self, from_packet, event_size, table_map, context):
+        super().__init__(from_packet, event_size, table_map, context)
         self.__rows = None
-        self.__only_tables = kwargs["only_tables"]
-        self.__ignored_tables = kwargs["ignored_tables"]
-        self.__only_schemas = kwargs["only_schemas"]
-        self.__ignored_schemas = kwargs["ignored_schemas"]
+        # Position of the first row in the packet, set once it is reached
+        self.__rows_position = None
         self.__none_sources = {}
+        self.__row_decoder = None
+        self.__row_filter = None
 
         # Header
         self.table_id = self._read_table_id()
@@ -37,19 +59,7 @@ class RowsEvent(BinLogEvent):
             self._processed = False
             return
 
-        if self.__only_tables is not None and self.table not in self.__only_tables:
-            self._processed = False
-            return
-        elif self.__ignored_tables is not None and self.table in self.__ignored_tables:
-            self._processed = False
-            return
-
-        if self.__only_schemas is not None and self.schema not in self.__only_schemas:
-            self._processed = False
-            return
-        elif (
-            self.__ignored_schemas is not None and self.schema in self.__ignored_schemas
-        ):
+        if not context.accepts_table(self.schema, self.table):
             self._processed = False
             return
 
@@ -60,11 +70,10 @@ class RowsEvent(BinLogEvent):
             or self.event_type == BINLOG.UPDATE_ROWS_EVENT_V2
             or self.event_type == BINLOG.PARTIAL_UPDATE_ROWS_EVENT
         ):
-            self.flags, self.extra_data_length = struct.unpack(
-                "<HH", self.packet.read(4)
-            )
+            self.flags = self.packet.read_uint16()
+            self.extra_data_length = self.packet.read_uint16()
             if self.extra_data_length > 2:
-                self.extra_data_type = struct.unpack("<B", self.packet.read(1))[0]
+                self.extra_data_type = self.packet.read_uint8()
                 # ndb information
                 if self.extra_data_type == 0:
                     self.nbd_info_length, self.nbd_info_format = struct.unpack(
@@ -87,12 +96,42 @@ class RowsEvent(BinLogEvent):
                 else:
                     self.extra_data = self.packet.read(self.extra_data_length - 3)
         else:
-            self.flags = struct.unpack("<H", self.packet.read(2))[0]
+            self.flags = self.packet.read_uint16()
+
+        # Column projection
+        table_key = f"{self.schema}.{self.table}"
+        only_columns = context.only_columns
+        ignored_columns = context.ignored_columns
+        self.__only_columns = only_columns.get(table_key) if only_columns else None
+        self.__ignored_columns = (
+            ignored_columns.get(table_key) if ignored_columns else None
+        )
+        if context.row_filters:
+            self.__row_filter = context.row_filters.get(table_key)
 
         # Body
         self.number_of_columns = self.packet.read_length_coded_binary()
         self.columns = self.table_map[self.table_id].columns
 
+    def __getstate__(self):
+        state = super().__getstate__()
+        # Only the table of the event is needed to decode its rows
+        state["table_map"] = {self.table_id: self.table_map[self.table_id]}
+        state["_RowsEvent__row_decoder"] = None
+        return state
+
+    def detach(self):
+        # The rows are decoded before the packet is released, only the
+        # table of the event is kept
+        table_map = self.table_map
+        if self._processed:
+            self.rows
+        super().detach()
+        self.__row_decoder = None
+        if table_map is not None and self.table_id in table_map:
+            self.table_map = {self.table_id: table_map[self.table_id]}
+        return self
+
     @staticmethod
     def _is_null(null_bitmap, position):
         bit = null_bitmap[int(position / 8)]
@@ -104,425 +143,81 @@ class RowsEvent(BinLogEvent):
         """Use for WRITE, UPDATE and DELETE events.
         Return an array of column data
         """
-        self.is_partial_json_update = False
-        partial_bitmap = None
-        if (
-            self.event_type == BINLOG.PARTIAL_UPDATE_ROWS_EVENT
-            and row_image_type == RowImageType.UpdateAI
-        ):
-            binlog_row_value_option = self.packet.read_length_coded_binary()
-            self.is_partial_json_update = binlog_row_value_option & 0b10000001 != 0
-            if self.is_partial_json_update:
-                partial_bitmap = self.packet.read((self._json_column_count() + 7) / 8)
-        values = {}
-
-        # null bitmap length = (bits set in 'columns-present-bitmap'+7)/8
-        # See http://dev.mysql.com/doc/internals/en/rows-event.html
-        null_bitmap = self.packet.read((BitCount(cols_bitmap) + 7) / 8)
-
-        null_bitmap_index = 0
-        partial_bitmap_index = 0
-        nb_columns = len(self.columns)
-        for i in range(0, nb_columns):
-            is_partial = False
-            column = self.columns[i]
-            name = self.table_map[self.table_id].columns[i].name
-            unsigned = self.table_map[self.table_id].columns[i].unsigned
-
-            if (
-                self.is_partial_json_update
-                and row_image_type == RowImageType.UpdateAI
-                and column.type == FIELD_TYPE.JSON
-            ):
-                if BitGet(partial_bitmap, partial_bitmap_index) > 0:
-                    is_partial = True
-                partial_bitmap_index += 1
-
-            if not name:
-                # If you are using mysql 5.7 or mysql 8, but binlog_row_metadata = "MINIMAL",
-                # we do not know the column information.
-                # If you know column information,
-                # mysql 5.7 version Users Use Under 1.0 version
-                # mysql 8.0 version Users Set binlog_row_metadata = "FULL"
-                name = "UNKNOWN_COL" + str(i)
-            values[name] = self.__read_values_name(
-                column,
-                null_bitmap,
-                null_bitmap_index,
-                is_partial,
-                cols_bitmap,
-                unsigned,
-                i,
-            )
-
-            if BitGet(cols_bitmap, i) != 0:
-                null_bitmap_index += 1
-
+        decoder = self._get_row_decoder()
+        partial_bitmap = self._read_partial_bitmap(decoder, row_image_type)
+        self.is_partial_json_update = partial_bitmap is not None
+
+        if self._context.compact_rows:
+            return decoder.read_compact_row(self.packet, cols_bitmap, partial_bitmap)
+        values, self.__none_sources = decoder.read_row(
+            self.packet, cols_bitmap, partial_bitmap
+        )
         return values
 
-    def __read_values_name(
-        self,
-        column,
-        null_bitmap,
-        null_bitmap_index,
-        is_partial,
-        cols_bitmap,
-        unsigned,
-        i,
-    ):
-        name = self.table_map[self.table_id].columns[i].name
-        if BitGet(cols_bitmap, i) == 0:
-            # This block is only executed when binlog_row_image = MINIMAL.
-            # When binlog_row_image = FULL, this block does not execute.
-            self.__none_sources[name] = NONE_SOURCE.COLS_BITMAP
+    def _read_partial_bitmap(self, decoder, row_image_type):
+        """Read the binlog_row_value_options of the after image of a
+        PARTIAL_UPDATE_ROWS_EVENT, return the bitmap of the JSON columns
+        holding a JSON diff or None
+        """
+        if (
+            self.event_type != BINLOG.PARTIAL_UPDATE_ROWS_EVENT
+            or row_image_type != RowImageType.UpdateAI
+        ):
             return None
-
-        if self._is_null(null_bitmap, null_bitmap_index):
-            self.__none_sources[name] = NONE_SOURCE.NULL
+        binlog_row_value_option = self.packet.read_length_coded_binary()
+        if binlog_row_value_option & 0b10000001 == 0:
             return None
+        return self.packet.read((decoder.json_column_count + 7) // 8)
 
-        if column.type == FIELD_TYPE.TINY:
-            if unsigned:
-                ret = struct.unpack("<B", self.packet.read(1))[0]
-                return ret
-            else:
-                return struct.unpack("<b", self.packet.read(1))[0]
-        elif column.type == FIELD_TYPE.SHORT:
-            if unsigned:
-                ret = struct.unpack("<H", self.packet.read(2))[0]
-                return ret
-            else:
-                return struct.unpack("<h", self.packet.read(2))[0]
-        elif column.type == FIELD_TYPE.LONG:
-            if unsigned:
-                ret = struct.unpack("<I", self.packet.read(4))[0]
-                return ret
-            else:
-                return struct.unpack("<i", self.packet.read(4))[0]
-        elif column.type == FIELD_TYPE.INT24:
-            if unsigned:
-                ret = self.packet.read_uint24()
-                return ret
-            else:
-                return self.packet.read_int24()
-        elif column.type == FIELD_TYPE.FLOAT:
-            return struct.unpack("<f", self.packet.read(4))[0]
-        elif column.type == FIELD_TYPE.DOUBLE:
-            return struct.unpack("<d", self.packet.read(8))[0]
-        elif column.type == FIELD_TYPE.VARCHAR or column.type == FIELD_TYPE.STRING:
-            ret = (
-                self.__read_string(2, column)
-                if column.max_length > 255
-                else self.__read_string(1, column)
-            )
-
-            return ret
-        elif column.type == FIELD_TYPE.NEWDECIMAL:
-            return self.__read_new_decimal(column)
-        elif column.type == FIELD_TYPE.BLOB:
-            return self.__read_string(column.length_size, column)
-        elif column.type == FIELD_TYPE.DATETIME:
-            ret = self.__read_datetime()
-            if ret is None:
-                self.__none_sources[name] = NONE_SOURCE.OUT_OF_DATETIME_RANGE
-            return ret
-        elif column.type == FIELD_TYPE.TIME:
-            return self.__read_time()
-        elif column.type == FIELD_TYPE.DATE:
-            ret = self.__read_date()
-            if ret is None:
-                self.__none_sources[name] = NONE_SOURCE.OUT_OF_DATE_RANGE
-            return ret
-        elif column.type == FIELD_TYPE.TIMESTAMP:
-            return datetime.datetime.utcfromtimestamp(self.packet.read_uint32())
-
-        # For new date format:
-        elif column.type == FIELD_TYPE.DATETIME2:
-            ret = self.__read_datetime2(column)
-            if ret is None:
-                self.__none_sources[name] = NONE_SOURCE.OUT_OF_DATETIME2_RANGE
-            return ret
-        elif column.type == FIELD_TYPE.TIME2:
-            return self.__read_time2(column)
-        elif column.type == FIELD_TYPE.TIMESTAMP2:
-            return self.__add_fsp_to_time(
-                datetime.datetime.utcfromtimestamp(self.packet.read_int_be_by_size(4)),
-                column,
-            )
-        elif column.type == FIELD_TYPE.LONGLONG:
-            if unsigned:
-                ret = self.packet.read_uint64()
-                return ret
-            else:
-                return self.packet.read_int64()
-        elif column.type == FIELD_TYPE.YEAR:
-            return self.packet.read_uint8() + 1900
-        elif column.type == FIELD_TYPE.ENUM:
-            if column.enum_values:
-                return column.enum_values[self.packet.read_uint_by_size(column.size)]
-            self.packet.read_uint_by_size(column.size)
-            return None
-        elif column.type == FIELD_TYPE.SET:
-            bit_mask = self.packet.read_uint_by_size(column.size)
-            if column.set_values:
-                ret = {
-                    val
-                    for idx, val in enumerate(column.set_values)
-                    if bit_mask & (1 << idx)
-                }
-                if not ret:
-                    self.__none_sources[column.name] = NONE_SOURCE.EMPTY_SET
-                    return None
-                return ret
-            self.__none_sources[column.name] = NONE_SOURCE.EMPTY_SET
-            return None
-        elif column.type == FIELD_TYPE.BIT:
-            return self.__read_bit(column)
-        elif column.type == FIELD_TYPE.GEOMETRY:
-            return self.packet.read_length_coded_pascal_string(column.length_size)
-        elif column.type == FIELD_TYPE.JSON:
-            value = self.packet.read_binary_json(column.length_size, is_partial)
-            if not value and is_partial:
-                self.__none_sources[column.name] = NONE_SOURCE.JSON_PARTIAL_UPDATE
-            return value
-        else:
-            raise NotImplementedError(f"Unknown MySQL column type: {column.type}")
+    def _read_raw_image(self, cols_bitmap, row_image_type=None):
+        """Return the next row image as a RawRow"""
+        decoder = self._get_row_decoder()
+        partial_bitmap = self._read_partial_bitmap(decoder, row_image_type)
+        return decoder.read_raw_row(self.packet, cols_bitmap, partial_bitmap)
 
-    def __add_fsp_to_time(self, time, column):
-        """Read and add the fractional part of time
-        For more details about new date format:
-        http://dev.mysql.com/doc/internals/en/date-and-time-data-type-representation.html
+    def _read_row_filter(self, row_filter, cols_bitmap, row_image_type=None):
+        """Move the cursor past the next row image, return True if it
+        matches the RowFilter
         """
-        microsecond = self.__read_fsp(column)
-        if microsecond > 0:
-            time = time.replace(microsecond=microsecond)
-        return time
-
-    def __read_fsp(self, column):
-        read = 0
-        if column.fsp == 1 or column.fsp == 2:
-            read = 1
-        elif column.fsp == 3 or column.fsp == 4:
-            read = 2
-        elif column.fsp == 5 or column.fsp == 6:
-            read = 3
-        if read > 0:
-            microsecond = self.packet.read_int_be_by_size(read)
-            if column.fsp % 2:
-                microsecond = int(microsecond / 10)
-            return microsecond * (10 ** (6 - column.fsp))
-        return 0
+        decoder = self._get_row_decoder()
+        partial_bitmap = self._read_partial_bitmap(decoder, row_image_type)
+        return decoder.filter_row(self.packet, cols_bitmap, row_filter, partial_bitmap)
 
-    @staticmethod
-    def charset_to_encoding(name):
-        charset = charset_by_name(name)
-        return charset.encoding if charset else name
-
-    def __read_string(self, size, column):
-        string = self.packet.read_length_coded_pascal_string(size)
-        origin_string = string
-        decode_errors = "ignore" if self._ignore_decode_errors else "strict"
-        if column.character_set_name is not None:
-            encoding = self.charset_to_encoding(column.character_set_name)
-            try:
-                string = string.decode(encoding, decode_errors)
-            except LookupError:
-                # python does not support Mysql encoding type ex)swe7 it will not decoding then Show origin string
-                string = origin_string
-        else:
-            # MYSQL 5.xx Version  Goes Here
-            # We don't know encoding type So apply Default Utf-8
-            string = string.decode(errors=decode_errors)
-        return string
-
-    def __read_bit(self, column):
-        """Read MySQL BIT type"""
-        resp = ""
-        for byte in range(0, column.bytes):
-            current_byte = ""
-            data = self.packet.read_uint8()
-            if byte == 0:
-                if column.bytes == 1:
-                    end = column.bits
-                else:
-                    end = column.bits % 8
-                    if end == 0:
-                        end = 8
-            else:
-                end = 8
-            for bit in range(0, end):
-                if data & (1 << bit):
-                    current_byte += "1"
-                else:
-                    current_byte += "0"
-            resp += current_byte[::-1]
-        return resp
-
-    def __read_time(self):
-        time = self.packet.read_uint24()
-        date = datetime.timedelta(
-            hours=int(time / 10000),
-            minutes=int((time % 10000) / 100),
-            seconds=int(time % 100),
-        )
-        return date
-
-    def __read_time2(self, column):
-        """TIME encoding for nonfractional part:
-
-         1 bit sign    (1= non-negative, 0= negative)
-         1 bit unused  (reserved for future extensions)
-        10 bits hour   (0-838)
-         6 bits minute (0-59)
-         6 bits second (0-59)
-        ---------------------
-        24 bits = 3 bytes
+    def _get_row_filter(self):
+        """Return the RowFilter of the table, None if all the rows are
+        decoded
         """
-        data = self.packet.read_int_be_by_size(3)
-
-        sign = 1 if self.__read_binary_slice(data, 0, 1, 24) else -1
-        if sign == -1:
-            # negative integers are stored as 2's compliment
-            # hence take 2's compliment again to get the right value.
-            data = ~data + 1
-
-        t = (
-            datetime.timedelta(
-                hours=self.__read_binary_slice(data, 2, 10, 24),
-                minutes=self.__read_binary_slice(data, 12, 6, 24),
-                seconds=self.__read_binary_slice(data, 18, 6, 24),
-                microseconds=self.__read_fsp(column),
-            )
-            * sign
-        )
-        return t
-
-    def __read_date(self):
-        time = self.packet.read_uint24()
-        if time == 0:  # nasty mysql 0000-00-00 dates
-            return None
-
-        year = (time & ((1 << 15) - 1) << 9) >> 9
-        month = (time & ((1 << 4) - 1) << 5) >> 5
-        day = time & ((1 << 5) - 1)
-        if year == 0 or month == 0 or day == 0:
-            return None
-
-        date = datetime.date(year=year, month=month, day=day)
-        return date
-
-    def __read_datetime(self):
-        value = self.packet.read_uint64()
-        if value == 0:  # nasty mysql 0000-00-00 dates
-            return None
-
-        date = value / 1000000
-        time = int(value % 1000000)
+        return self.__row_filter
 
-        year = int(date / 10000)
-        month = int((date % 10000) / 100)
-        day = int(date % 100)
-        if year == 0 or month == 0 or day == 0:
-            return None
-
-        date = datetime.datetime(
-            year=year,
-            month=month,
-            day=day,
-            hour=int(time / 10000),
-            minute=int((time % 10000) / 100),
-            second=int(time % 100),
-        )
-        return date
-
-    def __read_datetime2(self, column):
-        """DATETIME
-
-        1 bit  sign           (1= non-negative, 0= negative)
-        17 bits year*13+month  (year 0-9999, month 0-12)
-         5 bits day            (0-31)
-         5 bits hour           (0-23)
-         6 bits minute         (0-59)
-         6 bits second         (0-59)
-        ---------------------------
-        40 bits = 5 bytes
+    def _read_key(self, cols_bitmap, row_image_type=None):
+        """Return the primary key of the next row image as a tuple, the
+        other columns are skipped. None when the image lacks a key column.
         """
-        data = self.packet.read_int_be_by_size(5)
-        year_month = self.__read_binary_slice(data, 1, 17, 40)
-        try:
-            t = datetime.datetime(
-                year=int(year_month / 13),
-                month=year_month % 13,
-                day=self.__read_binary_slice(data, 18, 5, 40),
-                hour=self.__read_binary_slice(data, 23, 5, 40),
-                minute=self.__read_binary_slice(data, 28, 6, 40),
-                second=self.__read_binary_slice(data, 34, 6, 40),
+        table = self.table_map[self.table_id]
+        decoder = table.get_key_decoder(self._ignore_decode_errors)
+        partial_bitmap = self._read_partial_bitmap(decoder, row_image_type)
+        row = decoder.read_compact_row(self.packet, cols_bitmap, partial_bitmap)
+        return table.get_key(row, cols_bitmap)
+
+    def _get_row_decoder(self):
+        """Return the RowDecoder of the table, with the column projection"""
+        if self.__row_decoder is None:
+            self.__row_decoder = self.table_map[self.table_id].get_row_decoder(
+                self._ignore_decode_errors,
+                self.__only_columns,
+                self.__ignored_columns,
             )
-        except ValueError:
-            self.__read_fsp(column)
-            return None
-        return self.__add_fsp_to_time(t, column)
-
-    def __read_new_decimal(self, column):
-        """Read MySQL's new decimal format introduced in MySQL 5"""
-
-        # This project was a great source of inspiration for
-        # understanding this storage format.
-        # https://github.com/jeremycole/mysql_binlog
-
-        digits_per_integer = 9
-        compressed_bytes = [0, 1, 1, 2, 2, 3, 3, 4, 4, 4]
-        integral = column.precision - column.decimals
-        uncomp_integral = int(integral / digits_per_integer)
-        uncomp_fractional = int(column.decimals / digits_per_integer)
-        comp_integral = integral - (uncomp_integral * digits_per_integer)
-        comp_fractional = column.decimals - (uncomp_fractional * digits_per_integer)
-
-        # Support negative
-        # The sign is encoded in the high bit of the the byte
-        # But this bit can also be used in the value
-        value = self.packet.read_uint8()
-        if value & 0x80 != 0:
-            res = ""
-            mask = 0
-        else:
-            mask = -1
-            res = "-"
-        self.packet.unread(struct.pack("<B", value ^ 0x80))
-
-        size = compressed_bytes[comp_integral]
-        if size > 0:
-            value = self.packet.read_int_be_by_size(size) ^ mask
-            res += str(value)
-
-        for i in range(0, uncomp_integral):
-            value = struct.unpack(">i", self.packet.read(4))[0] ^ mask
-            res += f"{value:09d}"
+        return self.__row_decoder
 
-        res += "."
+    def _rows_start(self):
+        """Return the position of the first row in the packet"""
+        if self.__rows_position is None:
+            self.__rows_position = self.packet.tell()
+        return self.__rows_position
 
-        for i in range(0, uncomp_fractional):
-            value = struct.unpack(">i", self.packet.read(4))[0] ^ mask
-            res += f"{value:09d}"
-
-        size = compressed_bytes[comp_fractional]
-        if size > 0:
-            value = self.packet.read_int_be_by_size(size) ^ mask
-            res += f"{value:0{comp_fractional}d}"
-
-        return decimal.Decimal(res)
-
-    def __read_binary_slice(self, binary, start, size, data_length):
-        """
-        Read a part of binary data and extract a number
-        binary: the data
-        start: From which bit (1 to X)
-        size: How many bits should be read
-        data_length: data size
-        """
-        binary = binary >> data_length - (start + size)
-        mask = (1 << size) - 1
-        return binary & mask
+    @staticmethod
+    def charset_to_encoding(name):
+        return charset_to_encoding(name)
 
     def _json_column_count(self):
         count = 0
@@ -551,13 +246,77 @@ class RowsEvent(BinLogEvent):
         )
 
     def _fetch_rows(self):
-        self.__rows = []
+        self.__rows = list(self.__decode_rows())
 
+    def __read_rows(self, fetch_one_row, position=None):
+        """Yield fetch_one_row() for each row from position, the first row
+        by default
+        """
         if not self.complete:
             return
+        if position is None:
+            position = self._rows_start()
+        row_filter = self.__row_filter
+        while True:
+            # The cursor is set again for each row, other iterators may
+            # have moved it in between
+            self.packet.rewind(position)
+            if self.packet.read_bytes >= self.event_size:
+                return
+            if row_filter is not None:
+                if not self._filter_one_row(row_filter):
+                    position = self.packet.tell()
+                    continue
+                self.packet.rewind(position)
+            row = fetch_one_row()
+            position = self.packet.tell()
+            yield row
+
+    def __decode_rows(self):
+        if not self.complete:
+            return
+        position = self._rows_start()
+        layout = self._fixed_row_layout()
+        if layout is not None:
+            # All the rows without NULL values have the same size, they are
+            # unpacked in one pass up to the first row with a NULL value
+            self.packet.rewind(position)
+            size = self.event_size - self.packet.read_bytes
+            if size % layout.size == 0:
+                data = self.packet.read_view(size)
+                for images in layout.iter_unpack(data):
+                    position += layout.size
+                    yield self._make_fixed_row(images)
+        yield from self.__read_rows(self._fetch_one_row, position)
+
+    def _row_images(self):
+        """Return the columns-present bitmap of each image of a row, empty
+        when the rows can not be unpacked by a FixedRowLayout
+        """
+        return ()
 
-        while self.packet.read_bytes < self.event_size:
-            self.__rows.append(self._fetch_one_row())
+    def _fixed_row_layout(self):
+        row_images = self._row_images()
+        if not row_images or self.__row_filter is not None:
+            return None
+        return self._get_row_decoder().fixed_layout(row_images)
+
+    def _make_fixed_row(self, images):
+        decoder = self._get_row_decoder()
+        compact = self._context.compact_rows
+        images = [decoder.make_image(values, compact) for values in images]
+        if len(images) == 2:
+            if compact:
+                return tuple(images)
+            return {
+                "before_values": images[0],
+                "before_none_sources": {},
+                "after_values": images[1],
+                "after_none_sources": {},
+            }
+        if compact:
+            return images[0]
+        return {"values": images[0], "none_sources": {}}
 
     @property
     def rows(self):
@@ -565,6 +324,61 @@ class RowsEvent(BinLogEvent):
             self._fetch_rows()
         return self.__rows
 
+    def iter_rows(self):
+        """Yield the rows of the event one by one
+
+        Unlike rows, each row is decoded from the packet when it is
+        consumed and is not kept by the event, the memory used does not
+        depend on the number of rows. If rows was already decoded, its list
+        is iterated instead.
+        """
+        if self.__rows is not None:
+            return iter(self.__rows)
+        return self.__decode_rows()
+
+    def to_columns(self, image="after"):
+        """Decode the rows of the event to a ColumnBatch, see
+        pymysqlreplication.columnar. image selects the row image of the
+        UpdateRowsEvent, "after" or "before".
+        """
+        from .columnar import ColumnBatch
+
+        return ColumnBatch.from_events([self], image)
+
+    def iter_raw_rows(self):
+        """Yield the rows of the event without decoding their values
+
+        Each row image is a RawRow holding its bytes and the offsets of the
+        columns: the rows of Write and Delete events are a RawRow, the rows
+        of Update events a (before, after) tuple. The packet of the event
+        is read again, the event must not be detached.
+        """
+        return self.__read_rows(self._fetch_one_raw_row)
+
+    def iter_keys(self):
+        """Yield a (schema, table, operation, key) tuple for each row
+
+        Only the primary key columns are decoded, the other values are
+        skipped by their size: key is the tuple of the primary key values
+        in the order of the primary key, or of all the values in column
+        order when the table has no known primary key (it is learned from
+        the optional metadata of binlog_row_metadata = FULL). operation is
+        "insert", "update" or "delete". An update changing the primary key
+        yields the key before and the key after the update. An after image
+        without all the key columns (binlog_row_image = MINIMAL) leaves the
+        key unchanged. The event must not be detached.
+        """
+        for keys in self.__read_rows(self._fetch_one_key):
+            for i, key in enumerate(keys):
+                if i == 0 or (key is not None and key != keys[0]):
+                    yield (self.schema, self.table, self.operation, key)
+
+    def _set_rows(self, rows):
+        """Set the rows when they are decoded out of the event, by a
+        RowsDecodingPool worker process
+        """
+        self.__rows = rows
+
 
 class DeleteRowsEvent(RowsEvent):
     """This event is trigger when a row in the database is removed
@@ -572,14 +386,32 @@ class DeleteRowsEvent(RowsEvent):
     For each row you have a hash with a single key: values which contain the data of the removed line.
     """
 
-    def __init__(self, from_packet, event_size, table_map, ctl_connection, **kwargs):
-        super().__init__(from_packet, event_size, table_map, ctl_connection, **kwargs)
+    __slots__ = ("columns_present_bitmap",)
+
+    operation = "delete"
+
+    def __init__(self, from_packet, event_size, table_map, context):
+        super().__init__(from_packet, event_size, table_map, context)
         if self._processed:
             self.columns_present_bitmap = self.packet.read(
                 (self.number_of_columns + 7) / 8
             )
 
+    def _row_images(self):
+        return (self.columns_present_bitmap,)
+
+    def _fetch_one_raw_row(self):
+        return self._read_raw_image(self.columns_present_bitmap)
+
+    def _fetch_one_key(self):
+        return (self._read_key(self.columns_present_bitmap),)
+
+    def _filter_one_row(self, row_filter):
+        return self._read_row_filter(row_filter, self.columns_present_bitmap)
+
     def _fetch_one_row(self):
+        if self._context.compact_rows:
+            return self._read_column_data(self.columns_present_bitmap)
         row = {}
 
         row["values"] = self._read_column_data(self.columns_present_bitmap)
@@ -591,6 +423,8 @@ class DeleteRowsEvent(RowsEvent):
         super()._dump()
         print("Values:")
         for row in self.rows:
+            if self._context.compact_rows:
+                row = {"values": row, "none_sources": row.none_sources}
             print("--")
             for key in row["values"]:
                 none_source = (
@@ -608,14 +442,32 @@ class WriteRowsEvent(RowsEvent):
     For each row you have a hash with a single key: values which contain the data of the new line.
     """
 
-    def __init__(self, from_packet, event_size, table_map, ctl_connection, **kwargs):
-        super().__init__(from_packet, event_size, table_map, ctl_connection, **kwargs)
+    __slots__ = ("columns_present_bitmap",)
+
+    operation = "insert"
+
+    def __init__(self, from_packet, event_size, table_map, context):
+        super().__init__(from_packet, event_size, table_map, context)
         if self._processed:
             self.columns_present_bitmap = self.packet.read(
                 (self.number_of_columns + 7) / 8
             )
 
+    def _row_images(self):
+        return (self.columns_present_bitmap,)
+
+    def _fetch_one_raw_row(self):
+        return self._read_raw_image(self.columns_present_bitmap)
+
+    def _fetch_one_key(self):
+        return (self._read_key(self.columns_present_bitmap),)
+
+    def _filter_one_row(self, row_filter):
+        return self._read_row_filter(row_filter, self.columns_present_bitmap)
+
     def _fetch_one_row(self):
+        if self._context.compact_rows:
+            return self._read_column_data(self.columns_present_bitmap)
         row = {}
 
         row["values"] = self._read_column_data(self.columns_present_bitmap)
@@ -627,6 +479,8 @@ class WriteRowsEvent(RowsEvent):
         super()._dump()
         print("Values:")
         for row in self.rows:
+            if self._context.compact_rows:
+                row = {"values": row, "none_sources": row.none_sources}
             print("--")
             for key in row["values"]:
                 none_source = (
@@ -649,8 +503,12 @@ class UpdateRowsEvent(RowsEvent):
     http://dev.mysql.com/doc/refman/5.6/en/replication-options-binary-log.html#sysvar_binlog_row_image
     """
 
-    def __init__(self, from_packet, event_size, table_map, ctl_connection, **kwargs):
-        super().__init__(from_packet, event_size, table_map, ctl_connection, **kwargs)
+    __slots__ = ("columns_present_bitmap", "columns_present_bitmap2")
+
+    operation = "update"
+
+    def __init__(self, from_packet, event_size, table_map, context):
+        super().__init__(from_packet, event_size, table_map, context)
 
         if self._processed:
             # Body
@@ -661,7 +519,33 @@ class UpdateRowsEvent(RowsEvent):
                 (self.number_of_columns + 7) / 8
             )
 
+    def _row_images(self):
+        return (self.columns_present_bitmap, self.columns_present_bitmap2)
+
+    def _fetch_one_raw_row(self):
+        return (
+            self._read_raw_image(self.columns_present_bitmap),
+            self._read_raw_image(self.columns_present_bitmap2),
+        )
+
+    def _fetch_one_key(self):
+        return (
+            self._read_key(self.columns_present_bitmap),
+            self._read_key(self.columns_present_bitmap2),
+        )
+
+    def _filter_one_row(self, row_filter):
+        # Both images are read to move the cursor to the next row
+        before = self._read_row_filter(row_filter, self.columns_present_bitmap)
+        after = self._read_row_filter(row_filter, self.columns_present_bitmap2)
+        return before or after
+
     def _fetch_one_row(self):
+        if self._context.compact_rows:
+            return (
+                self._read_column_data(self.columns_present_bitmap),
+                self._read_column_data(self.columns_present_bitmap2),
+            )
         row = {}
 
         row["before_values"] = self._read_column_data(self.columns_present_bitmap)
@@ -674,6 +558,14 @@ class UpdateRowsEvent(RowsEvent):
         super()._dump()
         print("Values:")
         for row in self.rows:
+            if self._context.compact_rows:
+                before, after = row
+                row = {
+                    "before_values": before,
+                    "before_none_sources": before.none_sources,
+                    "after_values": after,
+                    "after_none_sources": after.none_sources,
+                }
             print("--")
             for key in row["before_values"]:
                 if key in row["before_none_sources"]:
@@ -737,19 +629,27 @@ class TableMapEvent(BinLogEvent):
     An end user of the lib should have no usage of this
     """
 
-    def __init__(self, from_packet, event_size, table_map, ctl_connection, **kwargs):
-        super().__init__(from_packet, event_size, table_map, ctl_connection, **kwargs)
+    __slots__ = (
+        "table_id",
+        "flags",
+        "schema_length",
+        "schema",
+        "table_length",
+        "table",
+        "column_count",
+        "columns",
+        "null_bitmask",
+        "table_obj",
+        "optional_metadata",
+    )
+
+    def __init__(self, from_packet, event_size, table_map, context):
+        super().__init__(from_packet, event_size, table_map, context)
 
-        self.__only_tables = kwargs["only_tables"]
-        self.__ignored_tables = kwargs["ignored_tables"]
-        self.__only_schemas = kwargs["only_schemas"]
-        self.__ignored_schemas = kwargs["ignored_schemas"]
-        self.__freeze_schema = kwargs["freeze_schema"]
-        self.__optional_meta_data = kwargs["optional_meta_data"]
         # Post-Header
         self.table_id = self._read_table_id()
 
-        if self.table_id in table_map and self.__freeze_schema:
+        if self.table_id in table_map and context.freeze_schema:
             self._processed = False
             return
 
@@ -762,19 +662,7 @@ class TableMapEvent(BinLogEvent):
         self.table_length = struct.unpack("!B", self.packet.read(1))[0]
         self.table = self.packet.read(self.table_length).decode()
 
-        if self.__only_tables is not None and self.table not in self.__only_tables:
-            self._processed = False
-            return
-        elif self.__ignored_tables is not None and self.table in self.__ignored_tables:
-            self._processed = False
-            return
-
-        if self.__only_schemas is not None and self.schema not in self.__only_schemas:
-            self._processed = False
-            return
-        elif (
-            self.__ignored_schemas is not None and self.schema in self.__ignored_schemas
-        ):
+        if not context.accepts_table(self.schema, self.table):
             self._processed = False
             return
 
@@ -782,7 +670,6 @@ class TableMapEvent(BinLogEvent):
         self.column_count = self.packet.read_length_coded_binary()
 
         self.columns = []
-        self.dbms = self.dbms or self._ctl_connection._get_dbms()
         # Read columns meta data
         column_types = bytearray(self.packet.read(self.column_count))
         self.packet.read_length_coded_binary()
@@ -794,10 +681,25 @@ class TableMapEvent(BinLogEvent):
         # ith column is nullable if (i - 1)th bit is set to True, not nullable otherwise
         ## Refer to definition of and call to row.event._is_null() to interpret bitmap corresponding to columns
         self.null_bitmask = self.packet.read((self.column_count + 7) / 8)
-        self.table_obj = Table(self.table_id, self.schema, self.table, self.columns)
-        table_map[self.table_id] = self.table_obj
         self.optional_metadata = self._get_optional_meta_data()
-        self._sync_column_info()
+        column_name_flag = self._sync_column_info()
+        primary_key_indexes = None
+        if column_name_flag:
+            # In the order of the index, for the keys of iter_keys
+            primary_key_indexes = (
+                self.optional_metadata.simple_primary_key_list
+                or list(self.optional_metadata.primary_keys_with_prefix)
+            )
+        self.table_obj = Table(
+            self.table_id,
+            self.schema,
+            self.table,
+            self.columns,
+            column_name_flag=column_name_flag,
+            primary_key_indexes=primary_key_indexes,
+        )
+        self.table_obj.reuse_row_decoder(table_map.get(self.table_id))
+        table_map[self.table_id] = self.table_obj
 
     def get_table(self):
         return self.table_obj
@@ -808,7 +710,7 @@ class TableMapEvent(BinLogEvent):
         print(f"Schema: {self.schema}")
         print(f"Table: {self.table}")
         print(f"Columns: {self.column_count}")
-        if self.__optional_meta_data:
+        if self._context.optional_meta_data:
             self.optional_metadata.dump()
 
     def _get_optional_meta_data(self):
@@ -910,12 +812,15 @@ class TableMapEvent(BinLogEvent):
         return optional_metadata
 
     def _sync_column_info(self):
-        if not self.__optional_meta_data:
+        """Set the column information from the optional metadata, return
+        True if the column names are set
+        """
+        if not self._context.optional_meta_data:
             # If optional_meta_data is False Do not sync Event Time Column Schemas
-            return
+            return False
         if len(self.optional_metadata.column_name_list) == 0:
             # May Be Now BINLOG_ROW_METADATA = FULL But Before Action BINLOG_ROW_METADATA Mode = MINIMAL
-            return
+            return False
         charset_pos = 0
         enum_or_set_pos = 0
         enum_pos = 0
@@ -976,9 +881,7 @@ class TableMapEvent(BinLogEvent):
             ):
                 self.columns[column_idx].visibility = True
 
-        self.table_obj = Table(
-            self.table_id, self.schema, self.table, self.columns, column_name_flag=True
-        )
+        return True
 
     def _convert_include_non_numeric_column(self, signedness_bool_list):
         # The incoming order of columns in the packet represents the indices of the numeric columns.
@@ -1161,10 +1064,46 @@ class TableMapEvent(BinLogEvent):
 
 
 class PartialUpdateRowsEvent(UpdateRowsEvent):
-    def __init__(self, from_packet, event_size, table_map, ctl_connection, **kwargs):
-        super().__init__(from_packet, event_size, table_map, ctl_connection, **kwargs)
+    __slots__ = ()
+
+    def __init__(self, from_packet, event_size, table_map, context):
+        super().__init__(from_packet, event_size, table_map, context)
+
+    def _row_images(self):
+        # The after image starts with the binlog_row_value_options
+        return ()
+
+    def _fetch_one_raw_row(self):
+        return (
+            self._read_raw_image(self.columns_present_bitmap, RowImageType.UpdateBI),
+            self._read_raw_image(self.columns_present_bitmap2, RowImageType.UpdateAI),
+        )
+
+    def _fetch_one_key(self):
+        return (
+            self._read_key(self.columns_present_bitmap, RowImageType.UpdateBI),
+            self._read_key(self.columns_present_bitmap2, RowImageType.UpdateAI),
+        )
+
+    def _filter_one_row(self, row_filter):
+        before = self._read_row_filter(
+            row_filter, self.columns_present_bitmap, RowImageType.UpdateBI
+        )
+        after = self._read_row_filter(
+            row_filter, self.columns_present_bitmap2, RowImageType.UpdateAI
+        )
+        return before or after
 
     def _fetch_one_row(self):
+        if self._context.compact_rows:
+            return (
+                self._read_column_data(
+                    self.columns_present_bitmap, RowImageType.UpdateBI
+                ),
+                self._read_column_data(
+                    self.columns_present_bitmap2, RowImageType.UpdateAI
+                ),
+            )
         row = {}
         row_image_type = RowImageType.UpdateBI
         row["before_values"] = self._read_column_data(
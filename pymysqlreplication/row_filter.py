@@ -0,0 +1,34 @@
+class RowFilter(object):
+    """Predicate deciding which rows of a table are decoded
+
+        tenants = {3, 7}
+        RowFilter(["tenant_id"], lambda tenant_id: tenant_id in tenants)
+        RowFilter(["status", "id"], lambda status, id: status != "archived")
+
+    When a row image is read, only the columns of the filter are decoded
+    and given to the predicate in the same order, None for NULL values and
+    the columns missing from the table or from a MINIMAL row image. The
+    other values are skipped by their size, and the whole row is only
+    decoded when the predicate returns true. An UpdateRowsEvent row is kept
+    when its before or its after image matches.
+
+    With row_decoding_processes, the predicate is sent to the worker
+    processes and must be picklable: use a module level function rather
+    than a lambda.
+
+    :ivar columns: tuple - names of the columns given to the predicate
+    :ivar predicate: callable - called with the values of the columns,
+        the row is kept when it returns true
+    """
+
+    def __init__(self, columns, predicate):
+        if isinstance(columns, str):
+            columns = [columns]
+        self.columns = tuple(columns)
+        self.predicate = predicate
+
+    def __repr__(self):
+        return f"<RowFilter columns={self.columns}>"
+
+    def __call__(self, *values):
+        return bool(self.predicate(*values))
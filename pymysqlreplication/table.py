@@ -1,6 +1,17 @@
+from .bitmap import BitGet
+from .row_decoder import RowDecoder
+
+
 class Table(object):
     def __init__(
-        self, table_id, schema, table, columns, primary_key=None, column_name_flag=False
+        self,
+        table_id,
+        schema,
+        table,
+        columns,
+        primary_key=None,
+        column_name_flag=False,
+        primary_key_indexes=None,
     ):
         if primary_key is None:
             primary_key = [c.data["name"] for c in columns if c.data["is_primary"]]
@@ -11,6 +22,13 @@ class Table(object):
             else:
                 primary_key = tuple(primary_key)
 
+        self.__row_decoder = None
+        self.__key_decoder = None
+        self.__key_indexes = None
+        self.__key_positions = None
+        # Column indexes of the primary key in the order of the index, from
+        # the optional metadata, only used to build the keys of iter_keys
+        self.__primary_key_indexes = primary_key_indexes
         self.__dict__.update(
             {
                 "table_id": table_id,
@@ -32,5 +50,91 @@ class Table(object):
     def __ne__(self, other):
         return not self.__eq__(other)
 
+    def get_row_decoder(
+        self, ignore_decode_errors=False, only_columns=None, ignored_columns=None
+    ):
+        """Return the RowDecoder of the table, built on first use"""
+        decoder = self.__row_decoder
+        if decoder is None or not decoder.has_options(
+            ignore_decode_errors, only_columns, ignored_columns
+        ):
+            decoder = RowDecoder(
+                self.columns, ignore_decode_errors, only_columns, ignored_columns
+            )
+            self.__row_decoder = decoder
+        return decoder
+
+    def get_key_decoder(self, ignore_decode_errors=False):
+        """Return the RowDecoder of the primary key columns, the other
+        columns are skipped. Without a known primary key all the columns
+        are decoded. get_key builds the key from its rows.
+
+        The key columns are in the order of the primary key index when the
+        TableMapEvent has the optional metadata, in column order otherwise.
+        """
+        decoder = self.__key_decoder
+        if decoder is None or decoder.ignore_decode_errors != ignore_decode_errors:
+            key_indexes = self.__primary_key_indexes
+            if key_indexes is None:
+                key_indexes = [
+                    i for i, column in enumerate(self.columns) if column.is_primary
+                ]
+            key_columns = [self.columns[i].name for i in key_indexes] or None
+            decoder = RowDecoder(self.columns, ignore_decode_errors, key_columns)
+            if not key_indexes:
+                key_indexes = range(len(self.columns))
+            # The decoder returns the values in column order
+            column_order = sorted(key_indexes)
+            self.__key_indexes = tuple(key_indexes)
+            self.__key_positions = tuple(column_order.index(i) for i in key_indexes)
+            self.__key_decoder = decoder
+        return decoder
+
+    def get_key(self, row, cols_bitmap):
+        """Return the primary key of a row decoded by get_key_decoder: the
+        tuple of the values of the key columns, or None when
+        cols_bitmap, the columns-present bitmap of the row image, does not
+        have all the key columns (the after image of an update with
+        binlog_row_image = MINIMAL).
+        """
+        for i in self.__key_indexes:
+            if not BitGet(cols_bitmap, i):
+                return None
+        values = row.values_tuple
+        return tuple(values[i] for i in self.__key_positions)
+
+    def reuse_row_decoder(self, table):
+        """Share the row decoder of a previous definition of the table.
+
+        A TableMapEvent is sent before every rows event, the decoder is only
+        rebuilt when the columns metadata changed.
+        """
+        if table is None or table is self:
+            return
+        if table.columns == self.columns:
+            if table.__row_decoder is not None:
+                self.__row_decoder = table.__row_decoder
+            if (
+                table.__key_decoder is not None
+                and table.__primary_key_indexes == self.__primary_key_indexes
+            ):
+                self.__key_decoder = table.__key_decoder
+                self.__key_indexes = table.__key_indexes
+                self.__key_positions = table.__key_positions
+
+    def __getstate__(self):
+        # The row decoders hold closures, they are built again after
+        # unpickling
+        state = self.data
+        state["_Table__primary_key_indexes"] = self.__primary_key_indexes
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__row_decoder = None
+        self.__key_decoder = None
+        self.__key_indexes = None
+        self.__key_positions = None
+
     def serializable_data(self):
         return self.data
@@ -0,0 +1,195 @@
+"""Build binlog events for the tests which do not need a server"""
+
+import struct
+import zlib
+from unittest.mock import MagicMock
+
+from pymysql.protocol import MysqlPacket
+
+from pymysqlreplication.column import Column
+from pymysqlreplication.constants import FIELD_TYPE
+from pymysqlreplication.constants.BINLOG import (
+    FORMAT_DESCRIPTION_EVENT,
+    QUERY_EVENT,
+    UPDATE_ROWS_EVENT_V2,
+    WRITE_ROWS_EVENT_V2,
+)
+from pymysqlreplication.context import StreamContext
+from pymysqlreplication.packet import BinLogPacketWrapper
+from pymysqlreplication.row_event import UpdateRowsEvent, WriteRowsEvent
+from pymysqlreplication.table import Table
+
+
+def ctl_connection(dbms="mysql"):
+    connection = MagicMock(charset="utf8")
+    connection._get_dbms.return_value = dbms
+    return connection
+
+
+def packet_wrapper(
+    event_type, body, table_map=None, context=None, ignored_table_ids=None
+):
+    """Return the BinLogPacketWrapper of an event received from a server,
+    without checksum
+    """
+    header = struct.pack("<cIBIIIH", b"\x00", 0, event_type, 1, 19 + len(body), 0, 0)
+    if context is None:
+        context = StreamContext(ctl_connection())
+    if table_map is None:
+        table_map = {}
+    return BinLogPacketWrapper(
+        MysqlPacket(header + body, 0), table_map, context, ignored_table_ids
+    )
+
+
+def query(statement, schema=b"test"):
+    """Return the (event type, body) of a QueryEvent"""
+    body = struct.pack("<IIBHH", 1, 0, len(schema), 0, 0) + schema + b"\0" + statement
+    return QUERY_EVENT, body
+
+
+def binlog_file(events, checksum=True, server_version=b"8.0.33-log"):
+    """Return the content of a binlog file starting with a
+    FormatDescriptionEvent followed by the (event type, body) events, and
+    the offset of each event
+    """
+    # binlog version, server version, create timestamp, header length,
+    # post-header lengths, checksum algorithm
+    format_description = (
+        struct.pack("<H50sIB", 4, server_version, 0, 19) + bytes(41) + bytes([checksum])
+    )
+    data = bytearray(b"\xfebin")
+    offsets = []
+    events = [(FORMAT_DESCRIPTION_EVENT, format_description)] + list(events)
+    for i, (event_type, body) in enumerate(events):
+        with_checksum = checksum or event_type == FORMAT_DESCRIPTION_EVENT
+        size = 19 + len(body) + 4 * with_checksum
+        offsets.append(len(data))
+        event = (
+            struct.pack(
+                "<IBIIIH", 1700000000 + i, event_type, 1, size, len(data) + size, 0
+            )
+            + body
+        )
+        if with_checksum:
+            event += struct.pack("<I", zlib.crc32(event))
+        data += event
+    return bytes(data), offsets
+
+
+def write_binlog(path, events, checksum=True):
+    """Write a binlog file, see binlog_file"""
+    data, offsets = binlog_file(events, checksum)
+    with open(path, "wb") as f:
+        f.write(data)
+    return offsets
+
+
+def create_table(table_id=1):
+    """Return the test.t table: id INT PRIMARY KEY, name VARCHAR(20)"""
+    columns = [
+        Column(
+            type=FIELD_TYPE.LONG,
+            name="id",
+            unsigned=False,
+            is_primary=True,
+            character_set_name=None,
+        ),
+        Column(
+            type=FIELD_TYPE.VARCHAR,
+            name="name",
+            unsigned=False,
+            is_primary=False,
+            max_length=20,
+            character_set_name="utf8mb4",
+        ),
+    ]
+    return Table(table_id, "test", "t", columns)
+
+
+def table_map_body(table_id=1, primary_key=(0,)):
+    """Return the body of the TableMapEvent of create_table, with the
+    optional metadata of binlog_row_metadata = FULL and the primary_key
+    column indexes
+    """
+    # table id, flags, schema, table, column types, metadata, null bitmap
+    return (
+        struct.pack("<Q", table_id)[:6]
+        + b"\x00\x00\x04test\x00\x01t\x00\x02"
+        + bytes([FIELD_TYPE.LONG, FIELD_TYPE.VARCHAR])
+        + b"\x02"
+        + struct.pack("<H", 20)
+        + b"\x02"
+        # column charsets (utf8mb4_general_ci), column names, primary key
+        + b"\x03\x01\x2d"
+        + b"\x04\x08\x02id\x04name"
+        + bytes([8, len(primary_key)] + list(primary_key))
+    )
+
+
+def row_image(row_id, name):
+    """Return a row image of create_table, None to leave out the id. name
+    is a str, or the bytes of an invalid string.
+    """
+    if isinstance(name, str):
+        name = name.encode()
+    if row_id is None:
+        return b"\x00" + struct.pack("<B", len(name)) + name
+    return b"\x00" + struct.pack("<iB", row_id, len(name)) + name
+
+
+def write_rows_body(rows, table_id=1):
+    """Return the body of a WriteRowsEvent of (id, name) rows of
+    create_table
+    """
+    # table id, flags, extra data length, number of columns and
+    # columns-present bitmap
+    body = struct.pack("<Q", table_id)[:6] + struct.pack("<HHB", 0, 2, 2) + b"\x03"
+    for row_id, name in rows:
+        body += row_image(row_id, name)
+    return body
+
+
+def update_rows_body(rows, minimal=False, table_id=1):
+    """Return the body of an UpdateRowsEvent of ((id, name), (id, name))
+    rows of create_table. With minimal, the after images only have the
+    name, as with binlog_row_image = MINIMAL.
+    """
+    body = struct.pack("<Q", table_id)[:6] + struct.pack("<HHB", 0, 2, 2)
+    body += b"\x03\x02" if minimal else b"\x03\x03"
+    for before, (row_id, name) in rows:
+        body += row_image(*before) + row_image(None if minimal else row_id, name)
+    return body
+
+
+def _rows_event(event_class, event_type, body, table_map, **settings):
+    context = StreamContext(
+        ctl_connection(),
+        allowed_events=BinLogPacketWrapper.event_types([event_class]),
+        **settings,
+    )
+    return packet_wrapper(event_type, body, table_map, context).event
+
+
+def write_rows_event(table_map, rows, **settings):
+    """Return a WriteRowsEvent of (id, name) rows of create_table, decoded
+    with the StreamContext settings
+    """
+    return _rows_event(
+        WriteRowsEvent,
+        WRITE_ROWS_EVENT_V2,
+        write_rows_body(rows),
+        table_map,
+        **settings,
+    )
+
+
+def update_rows_event(table_map, rows, minimal=False, **settings):
+    """Return an UpdateRowsEvent, see update_rows_body"""
+    return _rows_event(
+        UpdateRowsEvent,
+        UPDATE_ROWS_EVENT_V2,
+        update_rows_body(rows, minimal),
+        table_map,
+        **settings,
+    )
@@ -0,0 +1,106 @@
+import asyncio
+import os
+import struct
+import tempfile
+import threading
+import unittest
+
+from pymysqlreplication.async_binlogstream import AsyncBinLogStreamReader
+from pymysqlreplication.binlogfilereader import BinLogFileReader
+from pymysqlreplication.constants.BINLOG import (
+    TABLE_MAP_EVENT,
+    WRITE_ROWS_EVENT_V2,
+    XID_EVENT,
+)
+from pymysqlreplication.event import QueryEvent, XidEvent
+from pymysqlreplication.row_event import WriteRowsEvent
+from pymysqlreplication.tests.packets import (
+    query,
+    table_map_body,
+    write_binlog,
+    write_rows_body,
+)
+
+__all__ = ["TestAsyncBinLogStreamReader"]
+
+
+class AsyncBinLogFileReader(AsyncBinLogStreamReader, BinLogFileReader):
+    """Read a binlog file through the AsyncBinLogStreamReader thread"""
+
+    def _handle_packet(self, pkt):
+        self.threads.add(threading.current_thread())
+        return super()._handle_packet(pkt)
+
+
+class TestAsyncBinLogStreamReader(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "mysql-bin.000001")
+        events = []
+        for i in range(10):
+            events += [
+                query(b"BEGIN"),
+                (TABLE_MAP_EVENT, table_map_body()),
+                (WRITE_ROWS_EVENT_V2, write_rows_body([(i, f"row {i}")])),
+                (XID_EVENT, struct.pack("<Q", i)),
+            ]
+        write_binlog(self.path, events)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read_events(self, **kwargs):
+        async def read():
+            stream = AsyncBinLogFileReader(self.path, **kwargs)
+            stream.threads = set()
+            try:
+                return [event async for event in stream], stream.threads
+            finally:
+                stream.close()
+
+        return asyncio.run(read())
+
+    def test_read_events(self):
+        events, threads = self.read_events(only_events=[WriteRowsEvent])
+        self.assertEqual(
+            [event.rows[0]["values"]["id"] for event in events], list(range(10))
+        )
+        # The packets are decoded in the thread of the reader
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads.pop(), threading.main_thread())
+
+        events, _ = self.read_events(
+            only_events=[WriteRowsEvent], row_decoding_processes=2
+        )
+        self.assertEqual(
+            [event.rows[0]["values"]["id"] for event in events], list(range(10))
+        )
+
+    def test_cancel(self):
+        async def read():
+            stream = AsyncBinLogFileReader(self.path, only_events=[XidEvent])
+            stream.threads = set()
+            xids = []
+            release = threading.Event()
+            handle_packet = stream._handle_packet
+
+            def blocked_handle_packet(pkt):
+                release.wait()
+                return handle_packet(pkt)
+
+            stream._handle_packet = blocked_handle_packet
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(stream.fetchone(), 0.01)
+            release.set()
+            async for binlog_event in stream:
+                xids.append(binlog_event.xid)
+            stream.close()
+            return xids
+
+        # The event read for the cancelled fetchone is not lost
+        self.assertEqual(asyncio.run(read()), list(range(10)))
+
+    def test_iterate_synchronously(self):
+        stream = AsyncBinLogFileReader(self.path, only_events=[QueryEvent])
+        with self.assertRaises(TypeError):
+            iter(stream)
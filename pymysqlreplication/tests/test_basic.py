@@ -1,13 +1,17 @@
+import asyncio
 import io
+import os
+import tempfile
 import time
 import unittest
 
 from pymysqlreplication.json_binary import JsonDiff, JsonDiffOperation
 from pymysqlreplication.tests import base
-from pymysqlreplication import BinLogStreamReader
+from pymysqlreplication import AsyncBinLogStreamReader, BinLogStreamReader
 from pymysqlreplication.gtid import GtidSet, Gtid
 from pymysqlreplication.event import *
 from pymysqlreplication.constants.BINLOG import *
+from pymysqlreplication.checkpoint import FileCheckpointStore
 from pymysqlreplication.constants.NONE_SOURCE import *
 from pymysqlreplication.row_event import *
 from pymysqlreplication.packet import BinLogPacketWrapper
@@ -143,6 +147,122 @@ class TestBasicBinLogStreamReader(base.PyMySQLReplicationTestCase):
             event = self.stream.fetchone()
             self.assertIsNotNone(event)
 
+    def test_connection_stream_lost_resume(self):
+        self.stream.close()
+        self.stream = BinLogStreamReader(
+            self.database,
+            server_id=1024,
+            only_events=[WriteRowsEvent],
+            resume_on_reconnect=True,
+            reconnect_backoff=0.01,
+        )
+
+        query = "CREATE TABLE test (id INT NOT NULL AUTO_INCREMENT, data VARCHAR (50) NOT NULL, PRIMARY KEY (id))"
+        self.execute(query)
+        for i in range(0, 100):
+            self.execute("INSERT INTO test (data) VALUES('a')")
+            self.execute("COMMIT")
+
+        ids = []
+        for event in self.stream:
+            ids.append(event.rows[0]["values"]["id"])
+            if len(ids) == 50:
+                self.conn_control.kill(self.stream._stream_connection.thread_id())
+        # The stream resumes after the last transaction it read
+        self.assertEqual(ids, list(range(1, 101)))
+
+    def test_prefetch(self):
+        self.stream.close()
+        self.stream = BinLogStreamReader(
+            self.database,
+            server_id=1024,
+            ignored_events=self.ignoredEvents(),
+            prefetch_queue_size=2,
+            prefetch_max_bytes=1024,
+        )
+
+        query = "CREATE TABLE test (id INT NOT NULL AUTO_INCREMENT, data VARCHAR (50) NOT NULL, PRIMARY KEY (id))"
+        self.execute(query)
+        for i in range(0, 100):
+            self.execute("INSERT INTO test (data) VALUES('a')")
+        self.execute("COMMIT")
+
+        self.assertIsInstance(self.stream.fetchone(), RotateEvent)
+        self.assertIsInstance(self.stream.fetchone(), FormatDescriptionEvent)
+
+        event = self.stream.fetchone()
+        self.assertIsInstance(event, QueryEvent)
+        self.assertEqual(event.query, query)
+
+        rows = [
+            row
+            for event in self.stream
+            if isinstance(event, WriteRowsEvent)
+            for row in event.rows
+        ]
+        self.assertEqual(len(rows), 100)
+
+    def test_checkpoint_store(self):
+        self.stream.close()
+        query = "CREATE TABLE test (id INT NOT NULL AUTO_INCREMENT, data VARCHAR (50) NOT NULL, PRIMARY KEY (id))"
+        self.execute(query)
+        self.execute("INSERT INTO test (data) VALUES('a')")
+        self.execute("COMMIT")
+
+        with tempfile.TemporaryDirectory() as directory:
+            store = FileCheckpointStore(os.path.join(directory, "checkpoint.json"))
+            self.stream = BinLogStreamReader(
+                self.database,
+                server_id=1024,
+                only_events=[WriteRowsEvent],
+                checkpoint_store=store,
+            )
+            self.assertEqual(len(list(self.stream)), 1)
+            self.stream.close()
+
+            checkpoint = store.load()
+            self.assertEqual(checkpoint.log_file, self.stream.log_file)
+            self.assertEqual(checkpoint.log_pos, self.stream.log_pos)
+
+            self.execute("INSERT INTO test (data) VALUES('b')")
+            self.execute("COMMIT")
+            self.stream = BinLogStreamReader(
+                self.database,
+                server_id=1024,
+                only_events=[WriteRowsEvent],
+                checkpoint_store=store,
+            )
+            event = self.stream.fetchone()
+            self.assertEqual(event.rows[0]["values"]["data"], "b")
+
+    def test_checkpoint_store_connection_lost(self):
+        self.stream.close()
+        query = "CREATE TABLE test (id INT NOT NULL AUTO_INCREMENT, data VARCHAR (50) NOT NULL, PRIMARY KEY (id))"
+        self.execute(query)
+        for i in range(0, 100):
+            self.execute("INSERT INTO test (data) VALUES('a')")
+            self.execute("COMMIT")
+
+        with tempfile.TemporaryDirectory() as directory:
+            store = FileCheckpointStore(os.path.join(directory, "checkpoint.json"))
+            self.stream = BinLogStreamReader(
+                self.database,
+                server_id=1024,
+                only_events=[WriteRowsEvent],
+                checkpoint_store=store,
+                reconnect_backoff=0.01,
+            )
+            ids = []
+            for event in self.stream:
+                ids.append(event.rows[0]["values"]["id"])
+                if len(ids) == 50:
+                    self.conn_control.kill(self.stream._stream_connection.thread_id())
+            self.stream.close()
+            # The stream resumes after its last checkpoint without
+            # resume_on_reconnect
+            self.assertEqual(ids, list(range(1, 101)))
+            self.assertEqual(store.load().log_pos, self.stream.log_pos)
+
     def test_filtering_only_events(self):
         self.stream.close()
         self.stream = BinLogStreamReader(
@@ -549,6 +669,30 @@ class TestBasicBinLogStreamReader(base.PyMySQLReplicationTestCase):
         self.assertIsInstance(event, QueryEvent)
         self.assertEqual(event.query, query2)
 
+    def test_skip_to_timestamp_log_file(self):
+        self.stream.close()
+        query = "CREATE TABLE test_1 (id INT PRIMARY KEY)"
+        self.execute(query)
+        time.sleep(1)
+        timestamp = self.execute("SELECT UNIX_TIMESTAMP();").fetchone()[0]
+        self.execute("FLUSH BINARY LOGS")
+        query2 = "CREATE TABLE test_2 (id INT PRIMARY KEY)"
+        self.execute(query2)
+        self.execute("FLUSH BINARY LOGS")
+        query3 = "CREATE TABLE test_3 (id INT PRIMARY KEY)"
+        self.execute(query3)
+
+        self.stream = BinLogStreamReader(
+            self.database,
+            server_id=1024,
+            skip_to_timestamp=timestamp,
+            only_events=[QueryEvent],
+        )
+        self.assertEqual(
+            [event.query for event in self.stream if event.query != "BEGIN"],
+            [query2, query3],
+        )
+
     def test_end_log_pos(self):
         """Test end_log_pos parameter for BinLogStreamReader
 
@@ -589,20 +733,7 @@ class TestBasicBinLogStreamReader(base.PyMySQLReplicationTestCase):
     def test_event_validation(self):
         def create_binlog_packet_wrapper(pkt):
             return BinLogPacketWrapper(
-                pkt,
-                self.stream.table_map,
-                self.stream._ctl_connection,
-                self.stream.mysql_version,
-                self.stream._BinLogStreamReader__use_checksum,
-                self.stream._BinLogStreamReader__allowed_events_in_packet,
-                self.stream._BinLogStreamReader__only_tables,
-                self.stream._BinLogStreamReader__ignored_tables,
-                self.stream._BinLogStreamReader__only_schemas,
-                self.stream._BinLogStreamReader__ignored_schemas,
-                self.stream._BinLogStreamReader__freeze_schema,
-                self.stream._BinLogStreamReader__ignore_decode_errors,
-                self.stream._BinLogStreamReader__verify_checksum,
-                self.stream._BinLogStreamReader__optional_meta_data,
+                pkt, self.stream.table_map, self.stream._stream_context()
             )
 
         self.stream.close()
@@ -702,6 +833,39 @@ class TestMultipleRowBinLogStreamReader(base.PyMySQLReplicationTestCase):
     def ignoredEvents(self):
         return [GtidEvent, PreviousGtidsEvent]
 
+    def test_row_decoding_processes(self):
+        query = "CREATE TABLE test (id INT NOT NULL AUTO_INCREMENT, data VARCHAR (50) NOT NULL, PRIMARY KEY (id))"
+        self.execute(query)
+        for i in range(0, 20):
+            self.execute(f"INSERT INTO test (data) VALUES('Hello {i}'),('World {i}')")
+            self.execute("COMMIT")
+        self.execute("UPDATE test SET data = 'Bye' WHERE id = 1")
+        self.execute("DELETE FROM test WHERE id = 2")
+        self.execute("COMMIT")
+
+        self.stream.close()
+        self.stream = BinLogStreamReader(
+            self.database,
+            server_id=1024,
+            ignored_events=self.ignoredEvents(),
+            row_decoding_processes=2,
+        )
+        events = [
+            event
+            for event in self.stream
+            if isinstance(event, (WriteRowsEvent, UpdateRowsEvent, DeleteRowsEvent))
+        ]
+
+        self.assertEqual(len(events), 22)
+        for i, event in enumerate(events[:20]):
+            self.assertIsInstance(event, WriteRowsEvent)
+            self.assertEqual(
+                [row["values"]["data"] for row in event.rows],
+                [f"Hello {i}", f"World {i}"],
+            )
+        self.assertEqual(events[20].rows[0]["after_values"]["data"], "Bye")
+        self.assertEqual(events[21].rows[0]["values"]["id"], 2)
+
     def test_insert_multiple_row_event(self):
         query = "CREATE TABLE test (id INT NOT NULL AUTO_INCREMENT, data VARCHAR (50) NOT NULL, PRIMARY KEY (id))"
         self.execute(query)
@@ -918,6 +1082,47 @@ class TestCTLConnectionSettings(base.PyMySQLReplicationTestCase):
             self.resetBinLog()
 
 
+class TestAsyncBinLogStreamReader(base.PyMySQLReplicationTestCase):
+    def read_events(self, **kwargs):
+        async def read():
+            stream = AsyncBinLogStreamReader(self.database, server_id=1024, **kwargs)
+            try:
+                return [event async for event in stream]
+            finally:
+                stream.close()
+
+        return asyncio.run(read())
+
+    def test_read_events(self):
+        query = "CREATE TABLE test (id INT NOT NULL AUTO_INCREMENT, data VARCHAR (50) NOT NULL, PRIMARY KEY (id))"
+        self.execute(query)
+        self.execute("INSERT INTO test (data) VALUES('Hello')")
+        self.execute("COMMIT")
+
+        events = self.read_events(ignored_events=self.ignoredEvents())
+        self.assertIsInstance(events[0], RotateEvent)
+        self.assertIsInstance(events[1], FormatDescriptionEvent)
+
+        queries = [event.query for event in events if isinstance(event, QueryEvent)]
+        self.assertIn(query, queries)
+
+        write_events = [event for event in events if isinstance(event, WriteRowsEvent)]
+        self.assertEqual(len(write_events), 1)
+        self.assertEqual(write_events[0].rows[0]["values"]["data"], "Hello")
+
+    def test_filtering_only_events(self):
+        query = "CREATE TABLE test (id INT NOT NULL AUTO_INCREMENT, data VARCHAR (50) NOT NULL, PRIMARY KEY (id))"
+        self.execute(query)
+
+        events = self.read_events(only_events=[QueryEvent])
+        self.assertEqual([event.query for event in events], [query])
+
+    def test_iterate_synchronously(self):
+        stream = AsyncBinLogStreamReader(self.database, server_id=1024)
+        with self.assertRaises(TypeError):
+            iter(stream)
+
+
 class TestGtidBinLogStreamReader(base.PyMySQLReplicationTestCase):
     def setUp(self):
         super().setUp()
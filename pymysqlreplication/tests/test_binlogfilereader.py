@@ -0,0 +1,348 @@
+import os
+import struct
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from pymysqlreplication.binlogfilereader import (
+    BinLogFileReader,
+    ParallelBinLogFileReader,
+)
+from pymysqlreplication.binlogindex import BinLogIndex, index_path
+from pymysqlreplication.checkpoint import CallbackCheckpointStore
+from pymysqlreplication.constants.BINLOG import (
+    MARIADB_GTID_EVENT,
+    QUERY_EVENT,
+    ROTATE_EVENT,
+    TABLE_MAP_EVENT,
+    WRITE_ROWS_EVENT_V2,
+    XID_EVENT,
+)
+from pymysqlreplication.event import (
+    FormatDescriptionEvent,
+    QueryEvent,
+    RotateEvent,
+    XidEvent,
+)
+from pymysqlreplication.exceptions import BadMagicBytesError
+from pymysqlreplication.packet import EventHeader
+from pymysqlreplication.row_event import TableMapEvent, WriteRowsEvent
+from pymysqlreplication.tests.packets import (
+    query,
+    table_map_body,
+    write_binlog,
+    write_rows_body,
+)
+
+__all__ = ["TestBinLogFileReader"]
+
+
+def count_queries(path, reader):
+    return os.path.basename(path), len(list(reader))
+
+
+class TestBinLogFileReader(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_binlog(self, name, events, checksum=True):
+        path = os.path.join(self.directory.name, name)
+        return path, write_binlog(path, events, checksum)
+
+    def test_read_files(self):
+        first, _ = self.write_binlog(
+            "mysql-bin.000001",
+            [
+                query(b"BEGIN"),
+                (XID_EVENT, struct.pack("<Q", 42)),
+                (ROTATE_EVENT, struct.pack("<Q", 4) + b"mysql-bin.000002"),
+            ],
+        )
+        second, _ = self.write_binlog(
+            "mysql-bin.000002", [query(b"CREATE TABLE test (id INT)")], False
+        )
+        reader = BinLogFileReader([first, second], verify_checksum=True)
+        events = []
+        for binlog_event in reader:
+            events.append((type(binlog_event), reader.log_file))
+        reader.close()
+        self.assertEqual(
+            events,
+            [
+                (FormatDescriptionEvent, "mysql-bin.000001"),
+                (QueryEvent, "mysql-bin.000001"),
+                (XidEvent, "mysql-bin.000001"),
+                (RotateEvent, "mysql-bin.000002"),
+                (FormatDescriptionEvent, "mysql-bin.000002"),
+                (QueryEvent, "mysql-bin.000002"),
+            ],
+        )
+
+        reader = BinLogFileReader([first, second], only_events=[QueryEvent])
+        self.assertEqual(
+            [binlog_event.query for binlog_event in reader],
+            ["BEGIN", "CREATE TABLE test (id INT)"],
+        )
+
+    def test_skim(self):
+        path, offsets = self.write_binlog(
+            "mysql-bin.000001",
+            [
+                query(b"BEGIN"),
+                (XID_EVENT, struct.pack("<Q", 42)),
+                (ROTATE_EVENT, struct.pack("<Q", 4) + b"mysql-bin.000002"),
+            ],
+        )
+        offsets.append(os.path.getsize(path))
+        event_types = [QUERY_EVENT, XID_EVENT, ROTATE_EVENT]
+        reader = BinLogFileReader(
+            path, skim=True, ignored_events=[FormatDescriptionEvent]
+        )
+        self.assertEqual(
+            list(reader),
+            [
+                EventHeader(
+                    1700000000 + i,
+                    event_type,
+                    1,
+                    offsets[i + 1],
+                    offsets[i + 1] - offsets[i],
+                    "mysql-bin.000001",
+                )
+                for i, event_type in enumerate(event_types, 1)
+            ],
+        )
+        self.assertEqual(reader.log_file, "mysql-bin.000002")
+        self.assertEqual(reader.log_pos, 4)
+
+    def test_log_pos(self):
+        path, offsets = self.write_binlog(
+            "mysql-bin.000001",
+            [query(b"BEGIN"), query(b"COMMIT"), query(b"BEGIN")],
+        )
+        reader = BinLogFileReader(path, log_pos=offsets[2], only_events=[QueryEvent])
+        self.assertEqual(
+            [binlog_event.query for binlog_event in reader], ["COMMIT", "BEGIN"]
+        )
+
+    def test_skipped_events(self):
+        path, offsets = self.write_binlog(
+            "mysql-bin.000001",
+            [
+                query(b"BEGIN"),
+                (XID_EVENT, struct.pack("<Q", 42)),
+                (ROTATE_EVENT, struct.pack("<Q", 4) + b"mysql-bin.000002"),
+            ],
+        )
+        reader = BinLogFileReader(path, only_events=[XidEvent])
+        read_packet = reader._read_packet
+        sizes = []
+
+        def record_size():
+            pkt = read_packet()
+            if not pkt.is_eof_packet():
+                sizes.append(len(pkt._data))
+            return pkt
+
+        reader._read_packet = record_size
+        self.assertEqual([binlog_event.xid for binlog_event in list(reader)], [42])
+        # Only the header of the FormatDescriptionEvent and the QueryEvent
+        # is copied, with the byte preceding it
+        self.assertEqual(sizes[:2], [20, 20])
+        offsets.append(os.path.getsize(path))
+        self.assertEqual(
+            sizes[2:], [offsets[3] - offsets[2] + 1, offsets[4] - offsets[3] + 1]
+        )
+        self.assertEqual(reader.log_file, "mysql-bin.000002")
+
+    def test_truncated_file(self):
+        path, offsets = self.write_binlog(
+            "mysql-bin.000001", [query(b"BEGIN"), query(b"COMMIT")]
+        )
+        with open(path, "r+b") as f:
+            f.truncate(offsets[2] + 10)
+        reader = BinLogFileReader(path, only_events=[QueryEvent])
+        self.assertEqual([binlog_event.query for binlog_event in reader], ["BEGIN"])
+
+    def test_bad_magic(self):
+        path = os.path.join(self.directory.name, "mysql-bin.index")
+        with open(path, "w") as f:
+            f.write("./mysql-bin.000001\n")
+        with self.assertRaises(BadMagicBytesError):
+            list(BinLogFileReader(path))
+
+    def test_index(self):
+        events = []
+        for i in range(5):
+            if i < 2:
+                # Not decoded by the reader, which starts after them
+                statement = (TABLE_MAP_EVENT, struct.pack("<Q", 100 + i)[:6])
+            else:
+                statement = query(b"INSERT INTO test VALUES (1)")
+            events += [
+                query(b"BEGIN"),
+                statement,
+                (XID_EVENT, struct.pack("<Q", i)),
+            ]
+        path, offsets = self.write_binlog("mysql-bin.000001", events)
+        BinLogIndex.build(path, interval=5).save(index_path(path))
+        index = BinLogIndex.load(index_path(path))
+        self.assertEqual(
+            index.transactions,
+            list(zip(offsets[1::3], offsets[4::3] + [index.size])),
+        )
+        self.assertEqual(index.table_maps, {100: [offsets[2]], 101: [offsets[5]]})
+        self.assertEqual(index.find_table_map(101, offsets[11]), offsets[5])
+        self.assertEqual(index.find_transaction(offsets[8]), (offsets[7], offsets[10]))
+        self.assertEqual(
+            index.timestamps,
+            [
+                (1700000000, offsets[1]),
+                (1700000006, offsets[7]),
+                (1700000012, offsets[13]),
+            ],
+        )
+        self.assertIsNone(index.find_timestamp(1700000000))
+        self.assertEqual(index.find_timestamp(1700000010), offsets[7])
+
+        reader = BinLogFileReader(
+            path, skip_to_timestamp=1700000010, index=index, only_events=[XidEvent]
+        )
+        self.assertEqual(reader.log_pos, offsets[7])
+        self.assertEqual([binlog_event.xid for binlog_event in reader], [3, 4])
+
+        # An index of another file, or of a bigger file, is ignored
+        other, _ = self.write_binlog("mysql-bin.000002", events)
+        self.assertTrue(index.matches(path))
+        self.assertFalse(index.matches(other))
+        with open(path, "r+b") as f:
+            f.truncate(offsets[-1])
+        self.assertFalse(index.matches(path))
+        with self.assertLogs(level="WARNING"):
+            reader = BinLogFileReader(
+                other, skip_to_timestamp=1700000010, index=index, only_events=[XidEvent]
+            )
+        # The reading starts at the first event
+        self.assertIsNone(reader.log_pos)
+
+    def test_row_decoding_processes(self):
+        events = []
+        for i in range(10):
+            events += [
+                query(b"BEGIN"),
+                (TABLE_MAP_EVENT, table_map_body()),
+                (WRITE_ROWS_EVENT_V2, write_rows_body([(i, f"row {i}")])),
+                (XID_EVENT, struct.pack("<Q", i)),
+            ]
+        path, _ = self.write_binlog("mysql-bin.000001", events)
+
+        def read(**kwargs):
+            reader = BinLogFileReader(
+                path,
+                only_events=[QueryEvent, TableMapEvent, WriteRowsEvent, XidEvent],
+                **kwargs,
+            )
+            read_events = []
+            for binlog_event in reader:
+                if isinstance(binlog_event, WriteRowsEvent):
+                    read_events.append([row["values"] for row in binlog_event.rows])
+                else:
+                    read_events.append(type(binlog_event))
+            reader.close()
+            return read_events
+
+        serial_events = read()
+        self.assertEqual(len(serial_events), 40)
+        self.assertEqual(serial_events[-2], [{"id": 9, "name": "row 9"}])
+        # The events still decoded in the pool at the end of the file are
+        # returned
+        self.assertEqual(read(row_decoding_processes=2), serial_events)
+
+    def test_checkpoint_idle(self):
+        path, _ = self.write_binlog(
+            "mysql-bin.000001",
+            [
+                query(b"BEGIN"),
+                query(b"INSERT INTO test VALUES (1)"),
+                (XID_EVENT, struct.pack("<Q", 42)),
+            ],
+        )
+        checkpoints = []
+        now = [0]
+        with patch("pymysqlreplication.checkpoint.time.monotonic", lambda: now[0]):
+            reader = BinLogFileReader(
+                path,
+                only_events=[XidEvent],
+                end_log_pos=os.path.getsize(path),
+                checkpoint_store=CallbackCheckpointStore(checkpoints.append),
+                checkpoint_interval=10,
+            )
+        self.assertIsInstance(reader.fetchone(), XidEvent)
+        # The transaction is consumed before interval seconds
+        now[0] = 5
+        self.assertIsNone(reader.fetchone())
+        self.assertEqual(checkpoints, [])
+        # Nothing else is read, the checkpoint is saved anyway
+        now[0] = 10
+        self.assertIsNone(reader.fetchone())
+        self.assertEqual(
+            [checkpoint.log_pos for checkpoint in checkpoints],
+            [os.path.getsize(path)],
+        )
+        reader.close()
+
+    def test_checkpoint_mariadb(self):
+        def gtid(sequence_number, flags):
+            # sequence number, domain id, flags
+            body = struct.pack("<QIB", sequence_number, 0, flags) + bytes(6)
+            return MARIADB_GTID_EVENT, body
+
+        path, offsets = self.write_binlog(
+            "mysql-bin.000001",
+            [
+                # MariaDB does not log BEGIN
+                gtid(1, 0),
+                query(b"INSERT INTO test VALUES (1)"),
+                query(b"INSERT INTO test VALUES (2)"),
+                query(b"COMMIT"),
+                gtid(2, 1),
+                query(b"CREATE TABLE test (id INT)"),
+            ],
+        )
+        checkpoints = []
+        reader = BinLogFileReader(
+            path,
+            is_mariadb=True,
+            only_events=[QueryEvent],
+            checkpoint_store=CallbackCheckpointStore(checkpoints.append),
+            checkpoint_interval=0,
+            checkpoint_every=1,
+        )
+        self.assertEqual(len(list(reader)), 4)
+        reader.close()
+        self.assertEqual(
+            [checkpoint.log_pos for checkpoint in checkpoints],
+            [offsets[5], os.path.getsize(path)],
+        )
+
+    def test_parallel(self):
+        paths = []
+        queries = []
+        for i in range(1, 6):
+            file_queries = [f"INSERT INTO test VALUES ({i}, {j})" for j in range(i)]
+            path, _ = self.write_binlog(
+                f"mysql-bin.00000{i}", [query(q.encode()) for q in file_queries]
+            )
+            paths.append(path)
+            queries += file_queries
+        reader = ParallelBinLogFileReader(
+            paths, processes=2, max_pending=2, only_events=[QueryEvent]
+        )
+        self.assertEqual([binlog_event.query for binlog_event in reader], queries)
+        self.assertEqual(
+            reader.run(count_queries),
+            [(f"mysql-bin.00000{i}", i) for i in range(1, 6)],
+        )
@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+
+from pymysqlreplication.checkpoint import (
+    CallbackCheckpointStore,
+    Checkpoint,
+    Checkpointer,
+    FileCheckpointStore,
+    SQLiteCheckpointStore,
+)
+
+__all__ = ["TestCheckpointStore"]
+
+
+class TestCheckpointStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.checkpoint = Checkpoint(
+            "mysql-bin.000002", 1234, "3e11fa47-71ca-11e1-9e33-c80aa9429562:1-5"
+        )
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_file(self):
+        path = os.path.join(self.directory.name, "checkpoint.json")
+        store = FileCheckpointStore(path)
+        self.assertIsNone(store.load())
+        store.save(Checkpoint("mysql-bin.000001", 4))
+        store.save(self.checkpoint)
+        self.assertEqual(FileCheckpointStore(path).load(), self.checkpoint)
+        self.assertEqual(os.listdir(self.directory.name), ["checkpoint.json"])
+
+    def test_sqlite(self):
+        path = os.path.join(self.directory.name, "checkpoint.db")
+        store = SQLiteCheckpointStore(path)
+        self.assertIsNone(store.load())
+        store.save(Checkpoint("mysql-bin.000001", 4))
+        store.save(self.checkpoint)
+        SQLiteCheckpointStore(path, "other").save(Checkpoint("mysql-bin.000001", 4))
+        store.close()
+        self.assertEqual(SQLiteCheckpointStore(path).load(), self.checkpoint)
+
+    def test_checkpointer(self):
+        saved = []
+        checkpointer = Checkpointer(CallbackCheckpointStore(saved.append), None, 3)
+        for log_pos in range(1, 8):
+            checkpointer.update(Checkpoint("mysql-bin.000001", log_pos))
+        self.assertEqual([c.log_pos for c in saved], [3, 6])
+        checkpointer.flush()
+        checkpointer.flush()
+        self.assertEqual([c.log_pos for c in saved], [3, 6, 7])
+
+        saved = []
+        now = [0]
+        checkpointer = Checkpointer(
+            CallbackCheckpointStore(saved.append), 10, None, clock=lambda: now[0]
+        )
+        checkpointer.update(Checkpoint("mysql-bin.000001", 1))
+        now[0] = 10
+        checkpointer.update(Checkpoint("mysql-bin.000001", 2))
+        self.assertEqual([c.log_pos for c in saved], [2])
+
+        # An idle stream saves its last checkpoint after interval seconds
+        now[0] = 15
+        checkpointer.update(Checkpoint("mysql-bin.000001", 3))
+        checkpointer.tick()
+        self.assertEqual([c.log_pos for c in saved], [2])
+        now[0] = 20
+        checkpointer.tick()
+        checkpointer.tick()
+        self.assertEqual([c.log_pos for c in saved], [2, 3])
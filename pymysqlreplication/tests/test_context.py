@@ -0,0 +1,35 @@
+import pickle
+import unittest
+
+from pymysqlreplication.context import StreamContext
+from pymysqlreplication.tests.packets import ctl_connection
+
+__all__ = ["TestStreamContext"]
+
+
+class TestStreamContext(unittest.TestCase):
+    def test_context(self):
+        connection = ctl_connection("mariadb")
+        context = StreamContext(
+            connection, (10, 6, 0), only_schemas=["test"], ignored_tables=["t2"]
+        )
+        self.assertEqual(context.dbms, "mariadb")
+        self.assertEqual(context.charset, "utf8")
+        self.assertTrue(context.accepts_table("test", "t1"))
+        self.assertFalse(context.accepts_table("test", "t2"))
+        self.assertFalse(context.accepts_table("other", "t1"))
+        with self.assertRaises(AttributeError):
+            context.mysql_version = (8, 0, 0)
+
+        copy = context.replace(use_checksum=True)
+        self.assertTrue(copy.use_checksum)
+        self.assertFalse(context.use_checksum)
+        self.assertEqual(copy.only_schemas, ["test"])
+        self.assertEqual(connection._get_dbms.call_count, 1)
+
+    def test_pickle(self):
+        context = StreamContext(ctl_connection(), dbms="mysql")
+        copy = pickle.loads(pickle.dumps(context))
+        self.assertIsNone(copy.ctl_connection)
+        self.assertEqual(copy.dbms, "mysql")
+        self.assertEqual(copy.charset, "utf8")
@@ -0,0 +1,123 @@
+import struct
+import unittest
+from unittest.mock import patch
+
+from pymysql.protocol import MysqlPacket
+
+from pymysqlreplication.constants.BINLOG import (
+    QUERY_EVENT,
+    TABLE_MAP_EVENT,
+    WRITE_ROWS_EVENT_V2,
+)
+from pymysqlreplication.context import StreamContext
+from pymysqlreplication.event import QueryEvent
+from pymysqlreplication.packet import BinLogPacketWrapper
+from pymysqlreplication.row_event import TableMapEvent, WriteRowsEvent
+from pymysqlreplication.tests.packets import ctl_connection, packet_wrapper
+
+__all__ = ["TestBinLogPacketWrapper"]
+
+
+class TestBinLogPacketWrapper(unittest.TestCase):
+    # https://mariadb.com/kb/en/query_event/#example-with-crc32
+    event_data = (
+        # OK value
+        b"\x00"
+        # Header
+        b"q\x17(Z\x02\x8c'\x00\x00U\x00\x00\x00\x01\t\x00\x00\x00\x00"
+        # Content
+        b"f\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00\x1a\x00"
+        b"\x00\x00\x00\x00\x00\x01\x00\x00\x00P\x00\x00"
+        b"\x00\x00\x06\x03std\x04\x08\x00\x08\x00\x08\x00\x00"
+        b"TRUNCATE TABLE test.t4"
+        # CRC 32, 4 Bytes
+        b"Ji\x9e\xed"
+    )
+
+    def create_binlog_packet_wrapper(self, data, allowed_events=frozenset()):
+        context = StreamContext(
+            ctl_connection(),
+            use_checksum=True,
+            allowed_events=BinLogPacketWrapper.event_types(allowed_events),
+            verify_checksum=True,
+        )
+        return BinLogPacketWrapper(MysqlPacket(data, 0), {}, context)
+
+    def test_header(self):
+        packet = self.create_binlog_packet_wrapper(self.event_data)
+        self.assertIsNone(packet.event)
+        self.assertEqual(packet.event_type, QUERY_EVENT)
+        self.assertEqual(packet.event_size, 85)
+        self.assertEqual(packet.log_pos, 2305)
+        self.assertEqual(packet.read_bytes, 0)
+
+    def test_read_view_shares_packet_buffer(self):
+        packet = self.create_binlog_packet_wrapper(self.event_data)
+        view = packet.read_view(4)
+        self.assertIsInstance(view, memoryview)
+        self.assertIs(view.obj, self.event_data)
+        self.assertEqual(view, b"f\x01\x00\x00")
+        self.assertEqual(packet.read_bytes, 4)
+        self.assertEqual(packet.read_uint32(), 0)
+        self.assertEqual(packet.read(1), b"\x00")
+
+    def test_unread_and_rewind(self):
+        packet = self.create_binlog_packet_wrapper(self.event_data)
+        self.assertEqual(packet.read_uint16(), 0x0166)
+        packet.unread(b"\x67")
+        self.assertEqual(packet.read_bytes, 1)
+        self.assertEqual(packet.read_uint8(), 0x67)
+        packet.rewind(20)
+        self.assertEqual(packet.read_bytes, 0)
+        self.assertEqual(packet.read_uint16(), 0x6766)
+        # The original packet payload is never modified
+        self.assertEqual(self.event_data[21], 0x01)
+        packet.advance(11)
+        self.assertEqual(packet.read_bytes, 13)
+
+    def test_event_uses_cursor(self):
+        packet = self.create_binlog_packet_wrapper(
+            self.event_data, frozenset([QueryEvent])
+        )
+        self.assertEqual(packet.event.query, "TRUNCATE TABLE test.t4")
+        self.assertTrue(packet.event._is_event_valid)
+        self.assertEqual(packet.bytes_to_read(), 4)
+
+    def test_filtered_table(self):
+        ignored_table_ids = set()
+        context = StreamContext(
+            ctl_connection(),
+            allowed_events=BinLogPacketWrapper.event_types(
+                [TableMapEvent, WriteRowsEvent]
+            ),
+            only_tables=["other"],
+        )
+
+        # table id, flags, schema and table names
+        table_map = struct.pack("<IHH", 42, 0, 0) + b"\x04test\x00\x01t\x00"
+        packet = packet_wrapper(
+            TABLE_MAP_EVENT,
+            table_map,
+            context=context,
+            ignored_table_ids=ignored_table_ids,
+        )
+        self.assertIsNone(packet.event)
+        self.assertEqual(ignored_table_ids, {42})
+
+        # Skipped from their header, the events are not created
+        with patch.object(TableMapEvent, "__init__") as table_map_init:
+            packet = packet_wrapper(
+                TABLE_MAP_EVENT,
+                table_map,
+                context=context,
+                ignored_table_ids=ignored_table_ids,
+            )
+        self.assertIsNone(packet.event)
+        table_map_init.assert_not_called()
+        packet = packet_wrapper(
+            WRITE_ROWS_EVENT_V2,
+            struct.pack("<IHH", 42, 0, 0),
+            context=context,
+            ignored_table_ids=ignored_table_ids,
+        )
+        self.assertIsNone(packet.event)
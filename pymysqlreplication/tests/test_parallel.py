@@ -0,0 +1,112 @@
+import pickle
+import threading
+import time
+import types
+import unittest
+
+from pymysqlreplication.parallel import RowsDecodingPool, TransactionScheduler
+from pymysqlreplication.tests.packets import create_table, write_rows_event
+
+__all__ = ["TestRowsDecodingPool", "TestTransactionScheduler"]
+
+
+class TestRowsDecodingPool(unittest.TestCase):
+    def test_pickle_table(self):
+        table = create_table()
+        table.get_row_decoder()
+        copy = pickle.loads(pickle.dumps(table))
+        self.assertEqual(copy, table)
+        self.assertIsNot(copy.get_row_decoder(), table.get_row_decoder())
+
+    def test_events_order(self):
+        table_map = {1: create_table()}
+        events = [
+            write_rows_event(table_map, [(i, "a" * i), (-i, "b")]) for i in range(10)
+        ]
+        events.insert(5, "not a rows event")
+
+        pool = RowsDecodingPool(2)
+        try:
+            for binlog_event in events:
+                pool.put(binlog_event)
+            self.assertTrue(pool.is_full())
+            self.assertEqual([pool.get() for _ in events], events)
+            self.assertIsNone(pool.get())
+        finally:
+            pool.close()
+
+        self.assertEqual(
+            events[4].rows,
+            [
+                {"values": {"id": 4, "name": "aaaa"}, "none_sources": {}},
+                {"values": {"id": -4, "name": "b"}, "none_sources": {}},
+            ],
+        )
+
+
+class TestTransactionScheduler(unittest.TestCase):
+    def transaction(self, last_committed, sequence_number):
+        return types.SimpleNamespace(
+            last_committed=last_committed, sequence_number=sequence_number
+        )
+
+    def run_scheduler(self, transactions, workers=4):
+        lock = threading.Lock()
+        running = set()
+        concurrent = []
+        committed = []
+
+        def apply(transaction):
+            with lock:
+                concurrent.append(set(running))
+                running.add(transaction.sequence_number)
+            time.sleep(0.01)
+            with lock:
+                running.discard(transaction.sequence_number)
+            return transaction.sequence_number
+
+        def on_commit(transaction, result):
+            self.assertEqual(result, transaction.sequence_number)
+            committed.append(transaction)
+
+        TransactionScheduler(transactions, apply, workers, on_commit=on_commit).run()
+        self.assertEqual(committed, transactions)
+        return concurrent
+
+    def test_independent_transactions(self):
+        transactions = [self.transaction(0, i) for i in range(1, 5)]
+        concurrent = self.run_scheduler(transactions)
+        self.assertEqual(concurrent[-1], {1, 2, 3})
+
+    def test_dependent_transactions(self):
+        transactions = [
+            self.transaction(0, 1),
+            self.transaction(0, 2),
+            self.transaction(2, 3),
+            self.transaction(2, 4),
+        ]
+        concurrent = self.run_scheduler(transactions)
+        self.assertEqual(concurrent, [set(), {1}, set(), {3}])
+
+    def test_new_binlog_file(self):
+        transactions = [
+            self.transaction(0, 1),
+            self.transaction(1, 2),
+            self.transaction(0, 1),
+            self.transaction(0, 2),
+        ]
+        concurrent = self.run_scheduler(transactions)
+        self.assertEqual(concurrent, [set(), set(), set(), {1}])
+
+    def test_without_logical_clock(self):
+        transactions = [self.transaction(None, None) for _ in range(3)]
+        concurrent = self.run_scheduler(transactions)
+        self.assertEqual(concurrent, [set(), set(), set()])
+
+    def test_error(self):
+        def apply(transaction):
+            raise ValueError(transaction.sequence_number)
+
+        scheduler = TransactionScheduler([self.transaction(0, 1)], apply)
+        with self.assertRaises(ValueError):
+            scheduler.run()
@@ -0,0 +1,69 @@
+import threading
+import unittest
+
+import pymysql
+from pymysql.protocol import MysqlPacket
+
+from pymysqlreplication.prefetch import PacketPrefetcher
+
+__all__ = ["TestPacketPrefetcher"]
+
+
+class TestPacketPrefetcher(unittest.TestCase):
+    eof_packet = b"\xfe\x00\x00\x02\x00"
+
+    def create_reader(self, payloads):
+        packets = iter([MysqlPacket(payload, "utf8") for payload in payloads])
+        self.reads = 0
+        self.read_condition = threading.Condition()
+
+        def read_packet():
+            with self.read_condition:
+                self.reads += 1
+                self.read_condition.notify_all()
+            return next(packets)
+
+        return read_packet
+
+    def wait_reads(self, reads):
+        """Wait for the reader thread to read reads packets"""
+        with self.read_condition:
+            self.assertTrue(
+                self.read_condition.wait_for(lambda: self.reads >= reads, 10)
+            )
+
+    def test_packets_order(self):
+        payloads = [b"\x00" + bytes([i]) for i in range(10)] + [self.eof_packet]
+        prefetcher = PacketPrefetcher(self.create_reader(payloads), 3)
+        for payload in payloads:
+            self.assertEqual(prefetcher.get().get_all_data(), payload)
+
+    def test_queue_limits(self):
+        payloads = [b"\x00" * 100] * 10 + [self.eof_packet]
+
+        # The reader thread reads a packet once the previous one is queued,
+        # and holds the next packet until there is room
+        prefetcher = PacketPrefetcher(self.create_reader(payloads), 3)
+        self.wait_reads(4)
+        self.assertEqual(prefetcher.queued_packets, 3)
+        self.assertEqual(self.reads, 4)
+        prefetcher.stop()
+
+        prefetcher = PacketPrefetcher(self.create_reader(payloads), 10, 250)
+        self.wait_reads(4)
+        self.assertEqual(prefetcher.queued_packets, 3)
+        self.assertEqual(prefetcher.queued_bytes, 300)
+        prefetcher.get()
+        self.wait_reads(5)
+        self.assertEqual(prefetcher.queued_packets, 3)
+        self.assertEqual(prefetcher.queued_bytes, 300)
+        self.assertEqual(self.reads, 5)
+        prefetcher.stop()
+
+    def test_error(self):
+        def read_packet():
+            raise pymysql.OperationalError(2013, "Lost connection")
+
+        prefetcher = PacketPrefetcher(read_packet, 3)
+        with self.assertRaises(pymysql.OperationalError):
+            prefetcher.get()
@@ -0,0 +1,145 @@
+import pickle
+import struct
+import unittest
+
+from pymysqlreplication.column import Column
+from pymysqlreplication.constants import FIELD_TYPE, NONE_SOURCE
+from pymysqlreplication.constants.BINLOG import QUERY_EVENT
+from pymysqlreplication.row import Row
+from pymysqlreplication.table import Table
+from pymysqlreplication.tests.packets import create_table, packet_wrapper
+
+__all__ = ["TestRowDecoder"]
+
+
+class TestRowDecoder(unittest.TestCase):
+    def create_packet(self, body):
+        # Event which is not decoded, the cursor is left at the start of
+        # the body
+        return packet_wrapper(QUERY_EVENT, body)
+
+    def test_read_row(self):
+        decoder = create_table().get_row_decoder()
+        packet = self.create_packet(
+            b"\x00" + struct.pack("<i", -5) + b"\x03abc\x02" + struct.pack("<i", 7)
+        )
+        self.assertEqual(
+            decoder.read_row(packet, b"\x03"), ({"id": -5, "name": "abc"}, {})
+        )
+        self.assertEqual(
+            decoder.read_row(packet, b"\x03"),
+            ({"id": 7, "name": None}, {"name": NONE_SOURCE.NULL}),
+        )
+        self.assertEqual(packet.bytes_to_read(), 0)
+
+    def test_read_row_minimal_image(self):
+        decoder = create_table().get_row_decoder()
+        packet = self.create_packet(b"\x00" + struct.pack("<i", 3))
+        self.assertEqual(
+            decoder.read_row(packet, b"\x01"),
+            ({"id": 3, "name": None}, {"name": NONE_SOURCE.COLS_BITMAP}),
+        )
+
+    def test_read_row_projection(self):
+        table = create_table()
+        body = b"\x00" + struct.pack("<i", -5) + b"\x03abc\x02" + struct.pack("<i", 7)
+
+        decoder = table.get_row_decoder(only_columns=["id"])
+        packet = self.create_packet(body)
+        self.assertEqual(decoder.read_row(packet, b"\x03"), ({"id": -5}, {}))
+        self.assertEqual(decoder.read_row(packet, b"\x03"), ({"id": 7}, {}))
+        self.assertEqual(packet.bytes_to_read(), 0)
+
+        decoder = table.get_row_decoder(ignored_columns=["id"])
+        packet = self.create_packet(body)
+        self.assertEqual(decoder.read_row(packet, b"\x03"), ({"name": "abc"}, {}))
+        self.assertEqual(
+            decoder.read_row(packet, b"\x03"),
+            ({"name": None}, {"name": NONE_SOURCE.NULL}),
+        )
+        self.assertEqual(packet.bytes_to_read(), 0)
+
+    def test_read_compact_row(self):
+        decoder = create_table().get_row_decoder()
+        packet = self.create_packet(
+            b"\x00"
+            + struct.pack("<i", -5)
+            + b"\x03abc\x02"
+            + struct.pack("<i", 7)
+            + b"\x00"
+            + struct.pack("<i", 3)
+        )
+        row = decoder.read_compact_row(packet, b"\x03")
+        self.assertIsInstance(row, Row)
+        self.assertEqual(row["id"], -5)
+        self.assertEqual(row[1], "abc")
+        self.assertEqual(row, {"id": -5, "name": "abc"})
+        self.assertEqual(row.none_sources, {})
+
+        row = decoder.read_compact_row(packet, b"\x03")
+        self.assertEqual(row.to_dict(), {"id": 7, "name": None})
+        self.assertEqual(row.none_source("name"), NONE_SOURCE.NULL)
+        self.assertIsNone(row.none_source("id"))
+
+        row = decoder.read_compact_row(packet, b"\x01")
+        self.assertEqual(row.none_sources, {"name": NONE_SOURCE.COLS_BITMAP})
+        self.assertEqual(packet.bytes_to_read(), 0)
+
+        copy = pickle.loads(pickle.dumps(row))
+        self.assertEqual(copy, row)
+        self.assertEqual(copy.none_sources, row.none_sources)
+
+    def test_fixed_layout(self):
+        columns = create_table().columns
+        decoder = Table(1, "test", "t", columns).get_row_decoder()
+        self.assertIsNone(decoder.fixed_layout([b"\x03"]))
+
+        columns[1] = Column(
+            type=FIELD_TYPE.YEAR,
+            name="year",
+            unsigned=False,
+            is_primary=False,
+            character_set_name=None,
+        )
+        decoder = Table(1, "test", "t", columns).get_row_decoder()
+        self.assertIsNone(decoder.fixed_layout([b"\x01"]))
+        layout = decoder.fixed_layout([b"\x03", b"\x03"])
+        self.assertIs(decoder.fixed_layout([b"\x03", b"\x03"]), layout)
+        self.assertEqual(layout.size, 12)
+
+        # The second row has a NULL value in its after image
+        data = b"\x00" + struct.pack("<iB", 1, 120)
+        data += b"\x00" + struct.pack("<iB", 2, 121)
+        data += b"\x00" + struct.pack("<iB", 3, 0)
+        data += b"\x02" + struct.pack("<i", 4) + b"\x00"
+        self.assertEqual(
+            list(layout.iter_unpack(data)),
+            [[(1, 2020), (2, 2021)]],
+        )
+
+        # The server sets the padding bits of the null bitmap
+        data = b"\xfc" + struct.pack("<iB", 1, 120)
+        data += b"\xfc" + struct.pack("<iB", 2, 121)
+        data += b"\xfc" + struct.pack("<iB", 3, 0)
+        data += b"\xfe" + struct.pack("<i", 4) + b"\x00"
+        self.assertEqual(
+            list(layout.iter_unpack(data)),
+            [[(1, 2020), (2, 2021)]],
+        )
+
+    def test_reuse_row_decoder(self):
+        table = create_table()
+        decoder = table.get_row_decoder()
+
+        same_table = create_table()
+        same_table.reuse_row_decoder(table)
+        self.assertIs(same_table.get_row_decoder(), decoder)
+        self.assertEqual(same_table, table)
+
+        columns = create_table().columns
+        columns[0].unsigned = True
+        altered_table = Table(1, "test", "t", columns)
+        altered_table.reuse_row_decoder(table)
+        self.assertIsNot(altered_table.get_row_decoder(), decoder)
+
+        self.assertIsNot(table.get_row_decoder(True), decoder)
@@ -0,0 +1,217 @@
+import array
+import pickle
+import struct
+import unittest
+
+from pymysqlreplication.columnar import ColumnBatch
+from pymysqlreplication.constants.BINLOG import TABLE_MAP_EVENT
+from pymysqlreplication.context import StreamContext
+from pymysqlreplication.packet import BinLogPacketWrapper, DetachedPacket
+from pymysqlreplication.row import RawRow
+from pymysqlreplication.row_event import TableMapEvent
+from pymysqlreplication.row_filter import RowFilter
+from pymysqlreplication.table import Table
+from pymysqlreplication.tests.packets import (
+    create_table,
+    ctl_connection,
+    packet_wrapper,
+    table_map_body,
+    update_rows_event,
+    write_rows_event,
+)
+
+__all__ = ["TestRowsEvent"]
+
+
+class TestRowsEvent(unittest.TestCase):
+    def test_iter_rows(self):
+        table_map = {1: create_table()}
+        rows = [(i, "a" * i) for i in range(5)]
+        binlog_event = write_rows_event(table_map, rows)
+        expected = [
+            {"values": {"id": i, "name": name}, "none_sources": {}} for i, name in rows
+        ]
+
+        first = binlog_event.iter_rows()
+        second = binlog_event.iter_rows()
+        self.assertEqual(next(first), expected[0])
+        self.assertEqual(list(second), expected)
+        self.assertEqual(list(first), expected[1:])
+        self.assertIsNone(binlog_event._RowsEvent__rows)
+
+        self.assertEqual(binlog_event.rows, expected)
+        self.assertIs(next(binlog_event.iter_rows()), binlog_event.rows[0])
+
+    def test_compact_rows(self):
+        table_map = {1: create_table()}
+        binlog_event = write_rows_event(
+            table_map, [(1, "a"), (2, "b")], compact_rows=True
+        )
+        self.assertEqual(
+            binlog_event.rows, [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}]
+        )
+        self.assertEqual(binlog_event.rows[1]["name"], "b")
+        self.assertIs(binlog_event.rows[0].positions, binlog_event.rows[1].positions)
+
+    def test_iter_raw_rows(self):
+        table_map = {1: create_table()}
+        binlog_event = write_rows_event(table_map, [(1, "a"), (2, "bc")])
+        rows = list(binlog_event.iter_raw_rows())
+        self.assertEqual(len(rows), 2)
+        self.assertIsInstance(rows[0], RawRow)
+        self.assertEqual(rows[1].data, b"\x00" + struct.pack("<iB", 2, 2) + b"bc")
+        self.assertEqual(rows[1].offsets, ((1, 5), (5, 8)))
+        self.assertEqual(rows[1]["id"], struct.pack("<i", 2))
+        self.assertEqual(rows[1][1], b"\x02bc")
+        self.assertEqual(list(rows[0]), ["id", "name"])
+
+        self.assertEqual(binlog_event.rows[1]["values"], {"id": 2, "name": "bc"})
+        self.assertEqual(pickle.loads(pickle.dumps(rows[0])), rows[0])
+
+    def test_iter_keys(self):
+        table = create_table()
+        binlog_event = write_rows_event({1: table}, [(1, "a"), (2, "b")])
+        self.assertEqual(
+            list(binlog_event.iter_keys()),
+            [("test", "t", "insert", (1,)), ("test", "t", "insert", (2,))],
+        )
+        self.assertEqual(list(table.get_key_decoder().positions), ["id"])
+
+        table.columns[0].is_primary = False
+        table = Table(1, "test", "t", table.columns)
+        binlog_event = write_rows_event({1: table}, [(1, "a")])
+        self.assertEqual(
+            list(binlog_event.iter_keys()), [("test", "t", "insert", (1, "a"))]
+        )
+
+    def test_iter_keys_primary_key_order(self):
+        # PRIMARY KEY (name, id)
+        context = StreamContext(
+            ctl_connection(),
+            allowed_events=BinLogPacketWrapper.event_types([TableMapEvent]),
+            optional_meta_data=True,
+        )
+        table_map = {}
+        # The optional metadata is read up to the checksum
+        body = table_map_body(primary_key=(1, 0)) + bytes(4)
+        table_map_event = packet_wrapper(
+            TABLE_MAP_EVENT, body, table_map, context
+        ).event
+        self.assertIs(table_map[1], table_map_event.table_obj)
+        binlog_event = write_rows_event(table_map, [(1, "a")])
+        self.assertEqual(
+            list(binlog_event.iter_keys()), [("test", "t", "insert", ("a", 1))]
+        )
+        # RowsEvent.primary_key keeps the column order
+        self.assertEqual(binlog_event.primary_key, ("id", "name"))
+        table_map = {1: pickle.loads(pickle.dumps(table_map[1]))}
+        binlog_event = write_rows_event(table_map, [(1, "a")])
+        self.assertEqual(next(binlog_event.iter_keys())[3], ("a", 1))
+
+    def test_iter_keys_update(self):
+        table_map = {1: create_table()}
+        rows = [((1, "a"), (1, "b")), ((2, "a"), (3, "a"))]
+        binlog_event = update_rows_event(table_map, rows)
+        self.assertEqual(
+            list(binlog_event.iter_keys()),
+            [
+                ("test", "t", "update", (1,)),
+                ("test", "t", "update", (2,)),
+                ("test", "t", "update", (3,)),
+            ],
+        )
+
+        # The after images of binlog_row_image = MINIMAL only have the
+        # changed name: the key is unchanged
+        binlog_event = update_rows_event(
+            table_map, [((1, "a"), (None, "b")), ((2, "a"), (None, "c"))], minimal=True
+        )
+        self.assertEqual(
+            list(binlog_event.iter_keys()),
+            [("test", "t", "update", (1,)), ("test", "t", "update", (2,))],
+        )
+
+    def test_row_filters(self):
+        table_map = {1: create_table()}
+        row_filter = RowFilter("name", lambda name: name != "archived")
+        binlog_event = write_rows_event(
+            table_map,
+            [(1, "a"), (2, "archived"), (3, "b")],
+            row_filters={"test.t": row_filter},
+        )
+        self.assertEqual(
+            binlog_event.rows,
+            [
+                {"values": {"id": 1, "name": "a"}, "none_sources": {}},
+                {"values": {"id": 3, "name": "b"}, "none_sources": {}},
+            ],
+        )
+        self.assertEqual(
+            [key for _, _, _, key in binlog_event.iter_keys()], [(1,), (3,)]
+        )
+        self.assertEqual(binlog_event.to_columns().to_pydict()["id"], [1, 3])
+
+        binlog_event = write_rows_event(
+            table_map, [(1, "a")], row_filters={"test.other": row_filter}
+        )
+        self.assertEqual(len(binlog_event.rows), 1)
+
+    def test_column_batch(self):
+        table_map = {1: create_table()}
+        events = [
+            write_rows_event(table_map, [(1, "a"), (-2, "")]),
+            write_rows_event(table_map, [(3, "ccc")]),
+        ]
+        batch = ColumnBatch.from_events(events)
+        self.assertEqual(len(batch), 3)
+        self.assertEqual(batch.ops, b"III")
+        self.assertEqual(batch.columns["id"].values, array.array("i", [1, -2, 3]))
+        self.assertEqual(batch.columns["name"].offsets, array.array("q", [0, 1, 1, 4]))
+        self.assertEqual(batch.columns["name"].data, b"accc")
+        self.assertEqual(batch.columns["name"].validity, b"\x07")
+        self.assertEqual(
+            batch.to_pydict(), {"id": [1, -2, 3], "name": ["a", "", "ccc"]}
+        )
+
+        self.assertEqual(
+            events[1].to_columns().to_pydict(), {"id": [3], "name": ["ccc"]}
+        )
+        self.assertEqual(events[0].rows[1]["values"], {"id": -2, "name": ""})
+
+    def test_column_batch_decode_errors(self):
+        table_map = {1: create_table()}
+        rows = [(1, b"caf\xe9"), (2, "b")]
+        binlog_event = write_rows_event(table_map, rows)
+        with self.assertRaises(UnicodeDecodeError):
+            binlog_event.to_columns().to_pydict()
+
+        # The invalid bytes are dropped like in the rows
+        binlog_event = write_rows_event(table_map, rows, ignore_decode_errors=True)
+        self.assertEqual(binlog_event.rows[0]["values"]["name"], "caf")
+        self.assertEqual(
+            binlog_event.to_columns().to_pydict(),
+            {"id": [1, 2], "name": ["caf", "b"]},
+        )
+
+    def test_detach(self):
+        table_map = {1: create_table(), 2: create_table()}
+        binlog_event = write_rows_event(table_map, [(1, "a"), (2, "b")])
+        log_pos = binlog_event.packet.log_pos
+        self.assertFalse(hasattr(binlog_event, "__dict__"))
+
+        self.assertIs(binlog_event.detach(), binlog_event)
+        self.assertIsInstance(binlog_event.packet, DetachedPacket)
+        self.assertEqual(binlog_event.packet.log_pos, log_pos)
+        self.assertEqual(binlog_event.packet.read_bytes, binlog_event.event_size)
+        self.assertEqual(list(binlog_event.table_map), [1])
+        self.assertIsNone(binlog_event._ctl_connection)
+        self.assertEqual(binlog_event.dbms, "mysql")
+        rows = [
+            {"values": {"id": 1, "name": "a"}, "none_sources": {}},
+            {"values": {"id": 2, "name": "b"}, "none_sources": {}},
+        ]
+        self.assertEqual(binlog_event.rows, rows)
+
+        copy = pickle.loads(pickle.dumps(binlog_event.detach()))
+        self.assertEqual(copy.rows, rows)
+        self.assertEqual(copy.packet, binlog_event.packet)
@@ -0,0 +1,164 @@
+import pickle
+import types
+import unittest
+
+from pymysqlreplication.context import StreamContext
+from pymysqlreplication.event import (
+    GtidEvent,
+    MariadbGtidEvent,
+    QueryEvent,
+    RotateEvent,
+    XAPrepareEvent,
+    XidEvent,
+)
+from pymysqlreplication.row_event import UpdateRowsEvent, WriteRowsEvent
+from pymysqlreplication.table import Table
+from pymysqlreplication.tests.packets import create_table
+from pymysqlreplication.transaction import TransactionReader
+
+__all__ = ["TestTransactionReader"]
+
+
+class TestTransactionReader(unittest.TestCase):
+    def setUp(self):
+        self.log_pos = 4
+
+    def create_event(self, event_class, event_size=50, **attributes):
+        self.log_pos += event_size + 19
+        binlog_event = event_class.__new__(event_class)
+        for name, value in attributes.items():
+            setattr(binlog_event, name, value)
+        binlog_event.packet = types.SimpleNamespace(
+            log_pos=self.log_pos, event_size=event_size + 19
+        )
+        binlog_event.event_size = event_size
+        binlog_event.timestamp = self.log_pos
+        binlog_event._context = StreamContext()
+        return binlog_event
+
+    def gtid(self, sequence_number):
+        return self.create_event(
+            GtidEvent,
+            sid=bytes.fromhex("3E11FA4771CA11E19E33C80AA9429562"),
+            gno=sequence_number,
+            last_committed=sequence_number - 1,
+            sequence_number=sequence_number,
+        )
+
+    def test_transactions(self):
+        events = [
+            self.create_event(RotateEvent),
+            self.gtid(1),
+            self.create_event(QueryEvent, query="BEGIN"),
+            self.create_event(WriteRowsEvent),
+            self.create_event(UpdateRowsEvent),
+            self.create_event(XidEvent, xid=10),
+            self.gtid(2),
+            self.create_event(QueryEvent, query="CREATE TABLE test (id INT)"),
+            self.gtid(3),
+            self.create_event(QueryEvent, query="BEGIN"),
+            self.create_event(QueryEvent, query="INSERT INTO test VALUES (1)"),
+            self.create_event(QueryEvent, query="COMMIT"),
+        ]
+        transactions = list(TransactionReader(events))
+        self.assertEqual([len(t) for t in transactions], [5, 2, 4])
+        self.assertEqual([t.sequence_number for t in transactions], [1, 2, 3])
+        self.assertEqual(transactions[1].gtid, "3e11fa47-71ca-11e1-9e33-c80aa9429562:2")
+
+        transaction = transactions[0]
+        self.assertEqual(transaction.xid, 10)
+        self.assertEqual(transaction.start_log_pos, 73)
+        self.assertEqual(transaction.end_log_pos, 418)
+        self.assertEqual(transaction.timestamp, 418)
+        self.assertEqual(len(transaction.rows_events), 2)
+        self.assertEqual(len(transaction.queries), 1)
+        self.assertIsInstance(transaction.events[-1], XidEvent)
+
+    def test_without_gtid(self):
+        events = [
+            self.create_event(QueryEvent, query="BEGIN"),
+            self.create_event(WriteRowsEvent),
+            self.create_event(XidEvent, xid=10),
+            self.create_event(QueryEvent, query="DROP TABLE test", ddl_xid=11),
+            self.create_event(XidEvent, xid=12),
+        ]
+        transactions = list(TransactionReader(events))
+        self.assertEqual([len(t) for t in transactions], [3, 1])
+        self.assertEqual([t.gtid for t in transactions], [None, None])
+        self.assertEqual([t.xid for t in transactions], [10, 11])
+
+    def test_mariadb(self):
+        events = [
+            self.create_event(MariadbGtidEvent, gtid="0-1-1", flags=0),
+            self.create_event(QueryEvent, query="INSERT INTO test VALUES (1)"),
+            self.create_event(QueryEvent, query="INSERT INTO test VALUES (2)"),
+            self.create_event(QueryEvent, query="COMMIT"),
+            self.create_event(MariadbGtidEvent, gtid="0-1-2", flags=0),
+            self.create_event(WriteRowsEvent),
+            self.create_event(XidEvent, xid=10),
+            self.create_event(
+                MariadbGtidEvent, gtid="0-1-3", flags=MariadbGtidEvent.FL_STANDALONE
+            ),
+            self.create_event(QueryEvent, query="CREATE TABLE test (id INT)"),
+        ]
+        transactions = list(TransactionReader(events))
+        self.assertEqual([len(t) for t in transactions], [4, 3, 2])
+        self.assertEqual([t.gtid for t in transactions], ["0-1-1", "0-1-2", "0-1-3"])
+
+    def test_xa(self):
+        events = [
+            self.gtid(1),
+            self.create_event(QueryEvent, query="XA START X'31',X'',1"),
+            self.create_event(WriteRowsEvent),
+            self.create_event(QueryEvent, query="XA END X'31',X'',1"),
+            self.create_event(XAPrepareEvent),
+            self.gtid(2),
+            self.create_event(QueryEvent, query="XA COMMIT X'31',X'',1"),
+        ]
+        transactions = list(TransactionReader(events))
+        self.assertEqual([len(t) for t in transactions], [5, 2])
+
+    def test_spill(self):
+        table = Table(1, "test", "t", [])
+        events = [self.gtid(1), self.create_event(QueryEvent, query="BEGIN")]
+        for _ in range(10):
+            events.append(
+                self.create_event(
+                    WriteRowsEvent, 1000, table_id=1, table_map={1: table}
+                )
+            )
+        events.append(self.create_event(XidEvent, xid=10))
+
+        (transaction,) = TransactionReader(events, max_memory=2500)
+        self.assertTrue(transaction.spilled)
+        self.assertEqual(len(transaction), 13)
+        self.assertEqual(
+            [e.packet.log_pos for e in transaction],
+            [e.packet.log_pos for e in events],
+        )
+        self.assertEqual(len(pickle.loads(pickle.dumps(transaction)).events), 13)
+        transaction.close()
+        self.assertFalse(transaction.spilled)
+
+    def test_spill_size(self):
+        # The context and the tables are not written with each event
+        context = StreamContext(only_columns={f"test.t{i}": ["id"] for i in range(100)})
+        table_map = {i: create_table(i) for i in range(100)}
+        events = [self.gtid(1), self.create_event(QueryEvent, query="BEGIN")]
+        for i in range(100):
+            binlog_event = self.create_event(
+                QueryEvent, query=f"INSERT INTO test VALUES ({i})", table_map=table_map
+            )
+            binlog_event._context = context
+            events.append(binlog_event)
+        events.append(self.create_event(QueryEvent, query="COMMIT"))
+
+        (transaction,) = TransactionReader(events, max_memory=0)
+        spill_file = transaction._Transaction__spill_file
+        spill_file.seek(0, 2)
+        self.assertLess(spill_file.tell(), 300 * len(transaction))
+        spilled_events = transaction.events
+        self.assertEqual(
+            [e.query for e in spilled_events[2:-1]], [e.query for e in events[2:-1]]
+        )
+        self.assertIs(spilled_events[2]._context, context)
@@ -0,0 +1,244 @@
+import pickle
+import tempfile
+
+from .context import StreamContext
+from .event import (
+    GtidEvent,
+    MariadbGtidEvent,
+    QueryEvent,
+    XAPrepareEvent,
+    XidEvent,
+)
+from .row_event import RowsEvent
+from .table import Table
+
+
+def is_begin_query(query):
+    """Return True if the query opens a transaction block"""
+    query = query.strip().upper()
+    return query == "BEGIN" or query.startswith("XA START")
+
+
+def is_commit_query(query):
+    """Return True if the query ends a transaction block"""
+    query = query.strip().upper()
+    return query in ("COMMIT", "ROLLBACK") or query.startswith(
+        ("XA PREPARE", "XA COMMIT", "XA ROLLBACK")
+    )
+
+
+class Transaction(object):
+    """Events of a transaction, from its first event to its commit
+
+    The events are kept in memory until their total size goes over
+    max_memory, they are then pickled to a temporary file. Their context
+    and tables stay in memory, shared by the events. Iterate over the
+    transaction to read its events one by one whatever their storage.
+
+    :ivar gtid: str - GTID of the transaction, None without GTID
+    :ivar last_committed: int - sequence_number of the last transaction
+        this one depends on, None before MySQL 5.7 and with MariaDB
+    :ivar sequence_number: int - logical timestamp of the transaction in
+        its binlog file, None before MySQL 5.7 and with MariaDB
+    :ivar log_file: str - binlog file of the transaction
+    :ivar start_log_pos: int - position of the first event of the transaction
+    :ivar end_log_pos: int - position after the last event of the transaction
+    :ivar timestamp: int - timestamp of the commit event
+    :ivar xid: int - XID of the transaction, None if it has none
+    """
+
+    def __init__(self, first_event, log_file=None, max_memory=None):
+        self.gtid = None
+        self.last_committed = None
+        self.sequence_number = None
+        if isinstance(first_event, (GtidEvent, MariadbGtidEvent)):
+            self.gtid = first_event.gtid
+            self.last_committed = getattr(first_event, "last_committed", None)
+            self.sequence_number = getattr(first_event, "sequence_number", None)
+        self.log_file = log_file
+        self.start_log_pos = first_event.packet.log_pos - first_event.packet.event_size
+        self.end_log_pos = None
+        self.timestamp = None
+        self.xid = None
+        self.max_memory = max_memory
+        self.__events = []
+        self.__size = 0
+        self.__count = 0
+        self.__spill_file = None
+        # Contexts and tables of the spilled events
+        self.__shared = []
+        self.append(first_event)
+
+    def __repr__(self):
+        return f'<Transaction "{self.gtid}" ({self.__count} events)>'
+
+    def __len__(self):
+        return self.__count
+
+    def __iter__(self):
+        if self.__spill_file is not None:
+            self.__spill_file.seek(0)
+            for _ in range(self.__count - len(self.__events)):
+                unpickler = pickle.Unpickler(self.__spill_file)
+                unpickler.persistent_load = self.__shared.__getitem__
+                yield unpickler.load()
+        yield from self.__events
+
+    def __getstate__(self):
+        # Transactions are pickled to be applied in another process
+        state = self.__dict__.copy()
+        state["_Transaction__events"] = list(self)
+        state["_Transaction__spill_file"] = None
+        state["_Transaction__shared"] = []
+        return state
+
+    @property
+    def spilled(self):
+        """True if the events are stored in a temporary file"""
+        return self.__spill_file is not None
+
+    @property
+    def events(self):
+        """List of all the events, loaded from the temporary file if needed"""
+        return list(self)
+
+    @property
+    def rows_events(self):
+        return [e for e in self if isinstance(e, RowsEvent)]
+
+    @property
+    def queries(self):
+        return [e for e in self if isinstance(e, QueryEvent)]
+
+    def append(self, binlog_event):
+        self.end_log_pos = binlog_event.packet.log_pos
+        self.timestamp = binlog_event.timestamp
+        self.__count += 1
+        self.__events.append(binlog_event)
+        self.__size += binlog_event.event_size
+        if self.max_memory is not None and self.__size > self.max_memory:
+            self.__spill()
+
+    def __spill(self):
+        if self.__spill_file is None:
+            self.__spill_file = tempfile.TemporaryFile(prefix="pymysqlreplication-")
+        self.__spill_file.seek(0, 2)
+        pickler = pickle.Pickler(self.__spill_file, pickle.HIGHEST_PROTOCOL)
+        pickler.persistent_id = self.__persistent_id
+        for binlog_event in self.__events:
+            pickler.dump(binlog_event)
+            # Each event is loaded by its own unpickler
+            pickler.clear_memo()
+        self.__events = []
+        self.__size = 0
+
+    def __persistent_id(self, obj):
+        """Keep the context and the tables of the events out of the
+        temporary file, they are pickled once per event otherwise
+        """
+        if not isinstance(obj, (StreamContext, Table)):
+            return None
+        for i, shared in enumerate(self.__shared):
+            if shared is obj:
+                return i
+        self.__shared.append(obj)
+        return len(self.__shared) - 1
+
+    def close(self):
+        """Remove the temporary file of the events"""
+        if self.__spill_file is not None:
+            self.__spill_file.close()
+            self.__spill_file = None
+        self.__events = []
+        self.__shared = []
+        self.__count = 0
+
+
+class TransactionReader(object):
+    """Group the events of a BinLogStreamReader into Transaction objects
+
+        for transaction in TransactionReader(stream, max_memory=64 * 1024**2):
+            for binlog_event in transaction:
+                ...
+            transaction.close()
+
+    A transaction starts with a GtidEvent, a MariadbGtidEvent or a BEGIN
+    query without GTID, and ends with:
+
+    - a XidEvent
+    - a COMMIT or ROLLBACK query
+    - a XA PREPARE (XAPrepareEvent with MySQL, query with MariaDB)
+    - a statement logged on its own, like DDL, which xid is set if it is
+      logged with Q_DDL_LOGGED_WITH_XID
+
+    A MariadbGtidEvent without the FL_STANDALONE flag opens the transaction
+    block in place of a BEGIN query.
+
+    The stream must not filter out these events. Events outside of a
+    transaction, for example when the stream starts in the middle of one,
+    are skipped. Transactions bigger than max_memory bytes are spilled to
+    a temporary file.
+
+    With detach=True, the events are detached (see BinLogEvent.detach())
+    as they are read: the rows are decoded right away and the buffered
+    events do not keep their packet.
+    """
+
+    def __init__(self, stream, max_memory=None, detach=False):
+        self.stream = stream
+        self.max_memory = max_memory
+        self.detach = detach
+
+    def __iter__(self):
+        transaction = None
+        in_block = False
+        # The block was opened by a MariadbGtidEvent, not a BEGIN query
+        gtid_block = False
+        for binlog_event in self.stream:
+            if self.detach:
+                binlog_event.detach()
+            if isinstance(binlog_event, (GtidEvent, MariadbGtidEvent)):
+                transaction = self.__start(binlog_event)
+                gtid_block = in_block = (
+                    isinstance(binlog_event, MariadbGtidEvent)
+                    and not binlog_event.standalone
+                )
+                continue
+
+            if isinstance(binlog_event, QueryEvent):
+                if is_begin_query(binlog_event.query):
+                    if transaction is None or (in_block and not gtid_block):
+                        transaction = self.__start(binlog_event)
+                    else:
+                        transaction.append(binlog_event)
+                    in_block = True
+                    gtid_block = False
+                    continue
+                if transaction is None:
+                    # Statement without GTID
+                    transaction = self.__start(binlog_event)
+                else:
+                    transaction.append(binlog_event)
+                if in_block and not is_commit_query(binlog_event.query):
+                    continue
+                transaction.xid = getattr(
+                    binlog_event, "ddl_xid", getattr(binlog_event, "xid", None)
+                )
+            elif transaction is None:
+                continue
+            else:
+                transaction.append(binlog_event)
+                if isinstance(binlog_event, XidEvent):
+                    transaction.xid = binlog_event.xid
+                elif not isinstance(binlog_event, XAPrepareEvent):
+                    continue
+
+            yield transaction
+            transaction = None
+            in_block = False
+            gtid_block = False
+
+    def __start(self, binlog_event):
+        return Transaction(
+            binlog_event, getattr(self.stream, "log_file", None), self.max_memory
+        )